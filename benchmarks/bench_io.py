@@ -0,0 +1,69 @@
+"""
+Compare the "stream" and "mmap" I/O backends of FreesurferStats on a synthetic
+tree of stats files.
+
+Usage::
+
+    python benchmarks/bench_io.py --n-files 50000 --tree /tmp/fs-bench
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from freesurfer_statistics.cortical_stats import CorticalStats
+from freesurfer_statistics.utils import advise_willneed
+
+TEMPLATE = Path(__file__).parent.parent / "tests" / "data" / "lh.aparc.stats"
+
+
+def make_tree(root: Path, n_files: int) -> list:
+    """
+    Write *n_files* copies of the template stats file, one per subject.
+    """
+    template = TEMPLATE.read_text()
+    paths = []
+    for i in range(n_files):
+        subject = f"sub-{i:06d}"
+        path = root / subject / "stats" / "lh.aparc.stats"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(template.replace("sub-01", subject))
+        paths.append(path)
+    return paths
+
+
+def run(paths: list, io_backend: str, batch_size: int) -> float:
+    """
+    Parse every file's structural measurements, returning the elapsed time (seconds).
+    """
+    start = time.perf_counter()
+    for i in range(0, len(paths), batch_size):
+        batch = paths[i : i + batch_size]
+        advise_willneed(batch)
+        for path in batch:
+            CorticalStats(path, check_mtime=False, io_backend=io_backend).structural_measurements
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n-files", type=int, default=50000)
+    parser.add_argument("--tree", type=Path, default=None, help="Directory of the synthetic tree (kept between runs).")
+    parser.add_argument("--batch-size", type=int, default=64, help="Number of files read ahead together.")
+    args = parser.parse_args()
+
+    root = args.tree or Path(tempfile.mkdtemp(prefix="fs-bench-"))
+    try:
+        paths = make_tree(root, args.n_files)
+        for io_backend in ("stream", "mmap"):
+            elapsed = run(paths, io_backend, args.batch_size)
+            print(f"{io_backend:>6}: {elapsed:8.2f} s ({len(paths) / elapsed:8.0f} files/s)")
+    finally:
+        if args.tree is None:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from synthetic import write_cohort
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--cohort-size",
+        type=int,
+        default=20,
+        help="Number of synthetic subjects in the cohort benchmarks (default: 20).",
+    )
+
+
+@pytest.fixture(scope="session")
+def cohort_size(request) -> int:
+    return request.config.getoption("--cohort-size")
+
+
+@pytest.fixture(scope="session")
+def subjects_dir(tmp_path_factory, cohort_size) -> Path:
+    subjects_dir = tmp_path_factory.mktemp("subjects")
+    write_cohort(subjects_dir, cohort_size)
+    return subjects_dir
+
+
+@pytest.fixture(scope="session")
+def subject_dir(subjects_dir) -> Path:
+    return subjects_dir / "sub-000001" / "stats"
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    Benchmark a callable, recording its peak (traced) memory in the benchmark's extra info.
+    """
+
+    def run(func, *args, **kwargs):
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            benchmark.extra_info["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return benchmark(func, *args, **kwargs)
+
+    return run
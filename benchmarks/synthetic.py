@@ -0,0 +1,179 @@
+"""
+Generate synthetic Freesurfer $SUBJECTS_DIR trees for benchmarking.
+
+The headers are taken from the test data, so that generated files go through
+the exact same parsing paths as real ones; the data rows are random but
+plausible, one per region of the atlas.
+
+Usage::
+
+    python benchmarks/synthetic.py /tmp/subjects --n-subjects 1000
+"""
+import argparse
+import random
+from pathlib import Path
+from typing import Iterable, List
+
+DATA_DIR = Path(__file__).parent.parent / "tests" / "data"
+CORTICAL_TEMPLATE = DATA_DIR / "lh.aparc.stats"
+SUBCORTICAL_TEMPLATE = DATA_DIR / "aseg.stats"
+
+#: Atlases the generator knows how to write
+ATLASES = ("aparc", "aparc.a2009s", "aseg")
+HEMISPHERES = ("lh", "rh")
+TEMPLATE_SUBJECT = "sub-01"
+
+#: Regions of the Destrieux (aparc.a2009s) atlas
+DESTRIEUX_REGIONS = (
+    "G_and_S_frontomargin G_and_S_occipital_inf G_and_S_paracentral G_and_S_subcentral "
+    "G_and_S_transv_frontopol G_and_S_cingul-Ant G_and_S_cingul-Mid-Ant G_and_S_cingul-Mid-Post "
+    "G_cingul-Post-dorsal G_cingul-Post-ventral G_cuneus G_front_inf-Opercular G_front_inf-Orbital "
+    "G_front_inf-Triangul G_front_middle G_front_sup G_Ins_lg_and_S_cent_ins G_insular_short "
+    "G_occipital_middle G_occipital_sup G_oc-temp_lat-fusifor G_oc-temp_med-Lingual "
+    "G_oc-temp_med-Parahip G_orbital G_pariet_inf-Angular G_pariet_inf-Supramar G_parietal_sup "
+    "G_postcentral G_precentral G_precuneus G_rectus G_subcallosal G_temp_sup-G_T_transv "
+    "G_temp_sup-Lateral G_temp_sup-Plan_polar G_temp_sup-Plan_tempo G_temporal_inf G_temporal_middle "
+    "Lat_Fis-ant-Horizont Lat_Fis-ant-Vertical Lat_Fis-post Pole_occipital Pole_temporal S_calcarine "
+    "S_central S_cingul-Marginalis S_circular_insula_ant S_circular_insula_inf S_circular_insula_sup "
+    "S_collat_transv_ant S_collat_transv_post S_front_inf S_front_middle S_front_sup "
+    "S_interm_prim-Jensen S_intrapariet_and_P_trans S_oc_middle_and_Lunatus S_oc_sup_and_transversal "
+    "S_occipital_ant S_oc-temp_lat S_oc-temp_med_and_Lingual S_orbital_lateral S_orbital_med-olfact "
+    "S_orbital-H_Shaped S_parieto_occipital S_pericallosal S_postcentral S_precentral-inf-part "
+    "S_precentral-sup-part S_suborbital S_subparietal S_temporal_inf S_temporal_sup S_temporal_transverse"
+).split()
+
+
+def split_template(path: Path):
+    """
+    Split a template stats file into its header and the names of its regions.
+    """
+    header, regions = [], []
+    for line in path.read_text().splitlines(keepends=True):
+        if line.startswith("#"):
+            header.append(line)
+        elif line.strip():
+            regions.append(line.split())
+    return "".join(header), regions
+
+
+def cortical_rows(regions: Iterable[str], rng: random.Random) -> List[str]:
+    """
+    Random rows of a cortical parcellation's table (see CORTICAL_TEMPLATE's columns).
+    """
+    rows = []
+    for region in regions:
+        num_vert = rng.randint(300, 12000)
+        area = int(num_vert * rng.uniform(0.6, 0.75))
+        rows.append(
+            f"{region:<42} {num_vert:6d} {area:6d} {int(area * rng.uniform(2.0, 3.5)):6d} "
+            f"{rng.uniform(1.8, 3.6):5.3f} {rng.uniform(0.3, 0.9):5.3f} {rng.uniform(0.08, 0.16):9.3f} "
+            f"{rng.uniform(0.01, 0.05):9.3f} {rng.randint(1, 150):8d} {rng.uniform(0.5, 15):7.1f}\n"
+        )
+    return rows
+
+
+def subcortical_rows(structures: Iterable[List[str]], rng: random.Random) -> List[str]:
+    """
+    Random rows of a segmentation's table, keeping each structure's index and SegId.
+    """
+    rows = []
+    for values in structures:
+        index, seg_id, name = values[0], values[1], values[4]
+        voxels = rng.randint(50, 60000)
+        low, high = rng.uniform(10, 70), rng.uniform(90, 140)
+        rows.append(
+            f"{int(index):3d} {int(seg_id):4d} {voxels:8d} {voxels * rng.uniform(0.99, 1.01):10.1f}  {name:<32} "
+            f"{rng.uniform(low, high):9.4f} {rng.uniform(3, 20):9.4f} {low:9.4f} {high:9.4f} {high - low:9.4f}\n"
+        )
+    return rows
+
+
+def write_subject(subjects_dir: Path, subject: str, atlases: Iterable[str] = ATLASES, seed: int = 0) -> List[Path]:
+    """
+    Write a single subject's stats files.
+
+    Parameters
+    ----------
+    subjects_dir : Path
+        The $SUBJECTS_DIR to write into.
+    subject : str
+        Subject's name.
+    atlases : Iterable[str], optional
+        Atlases to write (see ATLASES), by default all of them
+    seed : int, optional
+        Seed of the random measurements, by default 0
+
+    Returns
+    -------
+    List[Path]
+        The written stats files.
+    """
+    rng = random.Random(f"{seed}-{subject}")
+    stats_dir = Path(subjects_dir) / subject / "stats"
+    stats_dir.mkdir(parents=True, exist_ok=True)
+    cortical_header, dk_regions = split_template(CORTICAL_TEMPLATE)
+    subcortical_header, structures = split_template(SUBCORTICAL_TEMPLATE)
+    paths = []
+    for atlas in atlases:
+        if atlas == "aseg":
+            path = stats_dir / "aseg.stats"
+            content = subcortical_header.replace(TEMPLATE_SUBJECT, subject) + "".join(subcortical_rows(structures, rng))
+            path.write_text(content)
+            paths.append(path)
+            continue
+        if atlas not in ATLASES:
+            raise ValueError(f"Unknown atlas {atlas!r}, expected one of {ATLASES}")
+        regions = DESTRIEUX_REGIONS if atlas == "aparc.a2009s" else [values[0] for values in dk_regions]
+        for hemisphere in HEMISPHERES:
+            path = stats_dir / f"{hemisphere}.{atlas}.stats"
+            header = (
+                cortical_header.replace(TEMPLATE_SUBJECT, subject)
+                .replace("lh.", f"{hemisphere}.")
+                .replace("# hemi lh", f"# hemi {hemisphere}")
+                .replace("aparc.", f"{atlas}.")
+            )
+            path.write_text(header + "".join(cortical_rows(regions, rng)))
+            paths.append(path)
+    return paths
+
+
+def write_cohort(subjects_dir: Path, n_subjects: int, atlases: Iterable[str] = ATLASES, seed: int = 0) -> List[Path]:
+    """
+    Write a synthetic $SUBJECTS_DIR of *n_subjects* subjects ("sub-000001", ...).
+
+    Parameters
+    ----------
+    subjects_dir : Path
+        The $SUBJECTS_DIR to write into.
+    n_subjects : int
+        Number of subjects.
+    atlases : Iterable[str], optional
+        Atlases to write for every subject (see ATLASES), by default all of them
+    seed : int, optional
+        Seed of the random measurements, by default 0
+
+    Returns
+    -------
+    List[Path]
+        The written stats files.
+    """
+    atlases = tuple(atlases)
+    paths = []
+    for i in range(1, n_subjects + 1):
+        paths += write_subject(subjects_dir, f"sub-{i:06d}", atlases, seed)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("subjects_dir", type=Path)
+    parser.add_argument("--n-subjects", type=int, default=100)
+    parser.add_argument("--atlas", dest="atlases", action="append", choices=ATLASES, help="May be repeated (default: all).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = write_cohort(args.subjects_dir, args.n_subjects, args.atlases or ATLASES, args.seed)
+    print(f"Wrote {len(paths)} files to {args.subjects_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+from click.testing import CliRunner
+
+from freesurfer_statistics.cli import main
+
+
+def run_cli(*args):
+    result = CliRunner().invoke(main, [*args, "--quiet"])
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def test_single_file(measure, subject_dir, tmp_path):
+    measure(run_cli, "-i", str(subject_dir / "lh.aparc.stats"), "-o", str(tmp_path / "lh.aparc.csv"))
+
+
+def test_combined(measure, subjects_dir, tmp_path):
+    measure(run_cli, "-s", str(subjects_dir), "--combined", "-o", str(tmp_path / "cohort.csv"))
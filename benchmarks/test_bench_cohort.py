@@ -0,0 +1,21 @@
+import pytest
+
+from freesurfer_statistics.cohort import StatsCollection, find_stats_files
+from freesurfer_statistics.validation import validate_stats_files
+
+
+@pytest.mark.parametrize("n_jobs", [1, 4])
+def test_tidy(measure, subjects_dir, cohort_size, n_jobs):
+    data = measure(lambda: StatsCollection.from_subjects_dir(subjects_dir, n_jobs=n_jobs).tidy)
+    assert data["subject"].nunique() == cohort_size
+
+
+def test_wide(measure, subjects_dir, cohort_size):
+    data = measure(lambda: StatsCollection.from_subjects_dir(subjects_dir, n_jobs=1).wide)
+    assert len(data) == cohort_size
+
+
+@pytest.mark.parametrize("n_jobs", [1, 4])
+def test_validate(measure, subjects_dir, n_jobs):
+    stats_files = find_stats_files(subjects_dir)
+    assert not measure(lambda: validate_stats_files(stats_files, n_jobs=n_jobs))
@@ -0,0 +1,33 @@
+import pytest
+
+from freesurfer_statistics.registry import get_stats_class
+
+FILE_NAMES = ["lh.aparc.stats", "lh.aparc.a2009s.stats", "aseg.stats"]
+
+
+def open_stats(path):
+    return get_stats_class(path)(path, check_mtime=False)
+
+
+@pytest.mark.parametrize("file_name", FILE_NAMES)
+def test_headers(measure, subject_dir, file_name):
+    path = subject_dir / file_name
+    assert measure(lambda: open_stats(path).headers)
+
+
+@pytest.mark.parametrize("file_name", FILE_NAMES)
+def test_table_columns(measure, subject_dir, file_name):
+    path = subject_dir / file_name
+    assert not measure(lambda: open_stats(path).table_columns).empty
+
+
+@pytest.mark.parametrize("file_name", FILE_NAMES)
+def test_structural_measurements(measure, subject_dir, file_name):
+    path = subject_dir / file_name
+    assert not measure(lambda: open_stats(path).structural_measurements).empty
+
+
+@pytest.mark.parametrize("file_name", FILE_NAMES)
+def test_whole_brain_measurements(measure, subject_dir, file_name):
+    path = subject_dir / file_name
+    assert not measure(lambda: open_stats(path).whole_brain_measurements).empty
@@ -0,0 +1,30 @@
+"""
+Query latency of the serve mode's in-memory store: filtering (and encoding) a
+query against the loaded cohort, against answering the same query again from
+the store's cache.
+"""
+import pytest
+
+from freesurfer_statistics.server import CohortStore
+
+QUERY = {"atlas": "aparc", "hemisphere": "left", "measure": "ThickAvg"}
+
+
+@pytest.fixture(scope="module")
+def store(subjects_dir):
+    store = CohortStore(subjects_dir)
+    store.refresh()
+    return store
+
+
+def test_query(measure, store):
+    def query():
+        store._queries.clear()
+        return store.query_encoded("json", **QUERY)
+
+    assert measure(query)
+
+
+def test_repeat_query(measure, store):
+    store.query_encoded("json", **QUERY)
+    assert measure(lambda: store.query_encoded("json", **QUERY))
@@ -0,0 +1,39 @@
+"""
+Speed of the aparcstats2table replacement, against the generic cohort table
+and (when installed) FreeSurfer's own aparcstats2table.
+"""
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from freesurfer_statistics.cohort import StatsCollection, aparcstats2table
+
+
+@pytest.fixture(scope="module")
+def subjects(subjects_dir):
+    return sorted(path.parent.name for path in subjects_dir.glob("*/stats"))
+
+
+@pytest.mark.parametrize("n_jobs", [1, 4])
+def test_aparcstats2table(measure, subjects_dir, subjects, n_jobs):
+    table, _ = measure(lambda: aparcstats2table(subjects, "lh", subjects_dir, meas="thickness", n_jobs=n_jobs))
+    assert len(table) == len(subjects)
+
+
+def test_cohort_wide(measure, subjects_dir, subjects):
+    def build():
+        data = StatsCollection.from_subjects_dir(subjects_dir, atlases=["aparc"], n_jobs=1).tidy
+        data = data[(data["hemisphere"] == "left") & (data["measure"] == "ThickAvg")]
+        return data.pivot(index="subject", columns="region", values="value")
+
+    assert len(measure(build)) == len(subjects)
+
+
+@pytest.mark.skipif(shutil.which("aparcstats2table") is None, reason="FreeSurfer is not installed")
+def test_freesurfer_aparcstats2table(measure, tmp_path, subjects_dir, subjects):
+    command = ["aparcstats2table", "--hemi", "lh", "--meas", "thickness", "--tablefile", str(tmp_path / "table.tsv")]
+    command += ["--subjects", *subjects]
+    env = {**os.environ, "SUBJECTS_DIR": str(subjects_dir)}
+    measure(lambda: subprocess.run(command, env=env, check=True, capture_output=True))
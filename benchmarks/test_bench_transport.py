@@ -0,0 +1,52 @@
+"""
+Parent-side cost of receiving parsed cohorts from workers: unpickling a tidy
+frame per file and concatenating them, against attaching shared memory blocks
+and assembling the table from packed values.
+"""
+import pickle
+from multiprocessing import shared_memory
+
+import pandas as pd
+import pytest
+
+from freesurfer_statistics.cohort import StatsCollection, find_stats_files, pack_stats_files, unpack_batches
+from freesurfer_statistics.cohort.cohort import _parse_stats_files
+
+BATCH_SIZE = 16
+
+
+@pytest.fixture(scope="module")
+def batches(subjects_dir):
+    stats_files = find_stats_files(subjects_dir)
+    return [stats_files[i : i + BATCH_SIZE] for i in range(0, len(stats_files), BATCH_SIZE)]
+
+
+@pytest.fixture(scope="module")
+def pickled_results(batches):
+    return [pickle.dumps(_parse_stats_files(batch)) for batch in batches]
+
+
+@pytest.fixture(scope="module")
+def packed_results(batches):
+    packed = [pack_stats_files(batch) for batch in batches]
+    yield [pickle.dumps(batch) for batch in packed]
+    for batch in packed:
+        shared_memory.SharedMemory(name=batch.name).unlink()
+
+
+def test_pickle_parent(measure, benchmark, pickled_results):
+    benchmark.extra_info["pickled_bytes"] = sum(map(len, pickled_results))
+    data = measure(lambda: pd.concat([frame for batch in pickled_results for _, frame, _ in pickle.loads(batch)], ignore_index=True))
+    assert len(data)
+
+
+def test_shared_memory_parent(measure, benchmark, packed_results):
+    benchmark.extra_info["pickled_bytes"] = sum(map(len, packed_results))
+    data, _ = measure(lambda: unpack_batches([pickle.loads(batch) for batch in packed_results], unlink=False))
+    assert len(data)
+
+
+@pytest.mark.parametrize("transport", ["pickle", "shared_memory"])
+def test_load(measure, subjects_dir, transport):
+    data = measure(lambda: StatsCollection.from_subjects_dir(subjects_dir, n_jobs=4, chunksize=BATCH_SIZE, transport=transport).tidy)
+    assert len(data)
@@ -0,0 +1,23 @@
+import pytest
+
+from freesurfer_statistics.registry import get_stats_class
+from freesurfer_statistics.writer import format_stats, write_stats_files
+
+
+@pytest.fixture(scope="module")
+def sources(subjects_dir):
+    sources = [get_stats_class(path)(path, check_mtime=False) for path in sorted(subjects_dir.glob("*/stats/*.stats"))]
+    for stats in sources:
+        stats.structural_measurements, stats.whole_brain_measurements
+    return sources
+
+
+def test_format_stats(measure, sources):
+    assert measure(lambda: [format_stats(stats) for stats in sources])
+
+
+@pytest.mark.parametrize("n_jobs", [1, 4])
+def test_write_stats_files(measure, tmp_path, subjects_dir, sources, n_jobs):
+    jobs = [(stats, tmp_path / stats.path.relative_to(subjects_dir)) for stats in sources]
+    written, errors = measure(lambda: write_stats_files(jobs, n_jobs=n_jobs))
+    assert len(written) == len(jobs) and not errors
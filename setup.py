@@ -66,17 +66,19 @@ setup(
     python_requires=">=3.6",
     install_requires=[
         "click",
-        "pandas"
+        "numpy",
+        "pandas",
         # eg: 'aspectlib==1.1.1', 'six>=1.7',
     ],
     extras_require={
-        # eg:
-        #   'rst': ['docutils>=0.11'],
-        #   ':python_version=="2.6"': ['argparse'],
+        "parquet": ["pyarrow"],
+        "hdf5": ["tables"],
     },
     entry_points={
         "console_scripts": [
             "freesurfer-statistics = freesurfer_statistics.cli:main",
+            "freesurfer-aparcstats2table = freesurfer_statistics.cli:aparcstats2table_command",
+            "freesurfer-asegstats2table = freesurfer_statistics.cli:asegstats2table_command",
         ]
     },
 )
@@ -1,5 +1,40 @@
 """Top-level package for Freesurfer Statistics."""
+import importlib
 
 __author__ = """Gal Ben-Zvi"""
 __email__ = "benzvigal@gmail.com"
 __version__ = "0.1.0"
+
+#: Public names, imported from their modules on first access (PEP 562)
+_LAZY_ATTRIBUTES = {
+    "open": ("freesurfer_statistics.registry", "open_stats"),
+    "CorticalStats": ("freesurfer_statistics.cortical_stats", "CorticalStats"),
+    "BAExvivoStats": ("freesurfer_statistics.cortical_stats", "BAExvivoStats"),
+    "SubCorticalStats": ("freesurfer_statistics.subcortical_stats", "SubCorticalStats"),
+    "WMParcStats": ("freesurfer_statistics.subcortical_stats", "WMParcStats"),
+    "SubfieldStats": ("freesurfer_statistics.subfield_stats", "SubfieldStats"),
+    "FreesurferStats": ("freesurfer_statistics.freesurfer_stats", "FreesurferStats"),
+    "StatsCache": ("freesurfer_statistics.cache", "StatsCache"),
+    "StatsCollection": ("freesurfer_statistics.cohort", "StatsCollection"),
+    "load_cohort": ("freesurfer_statistics.cohort", "load_cohort"),
+    "CohortArray": ("freesurfer_statistics.cohort", "CohortArray"),
+    "MetadataIndex": ("freesurfer_statistics.index", "MetadataIndex"),
+    "load_many_async": ("freesurfer_statistics.aio", "load_many_async"),
+    "profile": ("freesurfer_statistics.profiling", "profile"),
+}
+
+#: "open" is left out of star-imports, so that it does not shadow the builtin
+__all__ = [name for name in _LAZY_ATTRIBUTES if name != "open"]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        module, attribute = _LAZY_ATTRIBUTES[name]
+        value = getattr(importlib.import_module(module), attribute)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
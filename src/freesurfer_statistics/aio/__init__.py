@@ -0,0 +1 @@
+from freesurfer_statistics.aio.aio import iter_many_async, load_many_async  # noqa: F401
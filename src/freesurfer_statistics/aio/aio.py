@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterable, Optional, Tuple, Union
+
+from freesurfer_statistics.cohort.cohort import TIDY_COLUMNS, to_tidy
+from freesurfer_statistics.registry import open_stats_buffer
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+#: Default number of files read (and held in memory) at once
+DEFAULT_CONCURRENCY = 64
+
+
+def _parse_stats_buffer(stats_file: Path, buffer: bytes) -> Tuple[Path, Optional[pd.DataFrame], Optional[str]]:
+    """
+    Parse a stats file's content into a tidy frame (process pool worker).
+
+    Parameters
+    ----------
+    stats_file : Path
+        Path to the Freesurfer .stats file.
+    buffer : bytes
+        The file's content.
+
+    Returns
+    -------
+    Tuple[Path, Optional[pd.DataFrame], Optional[str]]
+        The file, its tidy frame and, if parsing failed, the error's description.
+    """
+    try:
+        return stats_file, to_tidy(open_stats_buffer(stats_file, buffer)), None
+    except Exception as e:
+        return stats_file, None, f"{type(e).__name__}: {e}"
+
+
+async def iter_many_async(
+    paths: Iterable[Union[Path, str]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    n_jobs: Optional[int] = None,
+) -> AsyncIterator[Tuple[Path, Optional[pd.DataFrame], Optional[str]]]:
+    """
+    Parse many stats files, overlapping their (threaded) reads with their parsing on a process pool.
+
+    At most *concurrency* files are read or parsed at once, and reading stops
+    while *concurrency* results wait to be consumed, so memory use stays
+    bounded however many files are given and however slowly results are consumed.
+
+    Parameters
+    ----------
+    paths : Iterable[Union[Path, str]]
+        Paths to Freesurfer .stats files.
+    concurrency : int, optional
+        Maximal number of files in flight, by default DEFAULT_CONCURRENCY
+    n_jobs : int, optional
+        Number of parsing processes, by default os.cpu_count().
+        1 parses the files in the current process.
+
+    Yields
+    ------
+    Tuple[Path, Optional[pd.DataFrame], Optional[str]]
+        Every file's tidy frame or error, in completion order.
+    """
+    loop = asyncio.get_running_loop()
+    pending = iter([Path(path) for path in paths])
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    done = object()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as readers:
+        parsers = None if n_jobs == 1 else ProcessPoolExecutor(max_workers=n_jobs)
+
+        async def process() -> None:
+            for stats_file in pending:
+                try:
+                    buffer = await loop.run_in_executor(readers, stats_file.read_bytes)
+                except OSError as e:
+                    await results.put((stats_file, None, f"{type(e).__name__}: {e}"))
+                    continue
+                if parsers is None:
+                    result = _parse_stats_buffer(stats_file, buffer)
+                else:
+                    result = await loop.run_in_executor(parsers, _parse_stats_buffer, stats_file, buffer)
+                del buffer
+                await results.put(result)
+            await results.put(done)
+
+        workers = [asyncio.ensure_future(process()) for _ in range(concurrency)]
+        try:
+            running = len(workers)
+            while running:
+                result = await results.get()
+                if result is done:
+                    running -= 1
+                else:
+                    yield result
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if parsers is not None:
+                parsers.shutdown()
+
+
+async def load_many_async(
+    paths: Iterable[Union[Path, str]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    n_jobs: Optional[int] = None,
+) -> Tuple[pd.DataFrame, Dict[Path, str]]:
+    """
+    Parse many stats files into one tidy table (see iter_many_async), e.g.
+    ``data, errors = await load_many_async(paths, concurrency=64)``.
+
+    Parameters
+    ----------
+    paths : Iterable[Union[Path, str]]
+        Paths to Freesurfer .stats files.
+    concurrency : int, optional
+        Maximal number of files in flight, by default DEFAULT_CONCURRENCY
+    n_jobs : int, optional
+        Number of parsing processes, by default os.cpu_count()
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, Dict[Path, str]]
+        The cohort's table (in the order of *paths*) and the files that failed to parse, with their errors.
+    """
+    import pandas as pd
+
+    paths = [Path(path) for path in paths]
+    frames, errors = {}, {}
+    async for stats_file, data, error in iter_many_async(paths, concurrency=concurrency, n_jobs=n_jobs):
+        if error is not None:
+            errors[stats_file] = error
+        else:
+            frames[stats_file] = data
+    if not frames:
+        return pd.DataFrame(columns=TIDY_COLUMNS), errors
+    return pd.concat([frames[path] for path in paths if path in frames], ignore_index=True), errors
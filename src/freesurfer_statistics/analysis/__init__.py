@@ -0,0 +1,7 @@
+from freesurfer_statistics.analysis.analysis import (  # noqa: F401
+    asymmetry_index,
+    group_means,
+    normalize_icv,
+    read_icv,
+    zscore,
+)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Mapping, Optional, Sequence, Tuple, Union
+
+from freesurfer_statistics.cohort.array import CohortArray
+from freesurfer_statistics.cohort.cohort import get_subject
+from freesurfer_statistics.parsing import parse_measure
+from freesurfer_statistics.registry import get_stats_class
+
+if TYPE_CHECKING:
+    import numpy as np
+
+#: Whole brain measurement of the intracranial volume
+ICV_MEASURE = "eTIV"
+
+#: Measures normalized by the intracranial volume by default
+VOLUME_MEASURES = ("GrayVol", "Volume_mm3")
+
+#: Hemispheres compared by asymmetry_index, and the hemisphere label of its results
+LEFT, RIGHT = "left", "right"
+ASYMMETRY = "asymmetry"
+
+
+def _nan_moments(values: np.ndarray, ddof: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mean and standard deviation over the first axis, ignoring NaNs (NaN where undefined, without warnings).
+    """
+    import numpy as np
+
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    filled = np.where(valid, values, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = filled.sum(axis=0) / count
+        deviations = np.where(valid, values - mean, 0)
+        std = np.sqrt((deviations * deviations).sum(axis=0) / (count - ddof))
+    std[count - ddof <= 0] = np.nan
+    return mean, std
+
+
+def _check_vocabularies(array: CohortArray, reference: CohortArray) -> None:
+    """
+    Check that two arrays hold the same regions and measures.
+    """
+    if array.regions != reference.regions or array.measures != reference.measures:
+        raise ValueError("Arrays must have the same regions and measures (build both from the same atlases)")
+
+
+def zscore(
+    array: CohortArray,
+    reference: Optional[CohortArray] = None,
+    mean: Optional[np.ndarray] = None,
+    std: Optional[np.ndarray] = None,
+    ddof: int = 1,
+) -> CohortArray:
+    """
+    Z-score every measurement against normative data, for all subjects and regions at once.
+
+    Parameters
+    ----------
+    array : CohortArray
+        The cohort to score.
+    reference : CohortArray, optional
+        Normative subjects, with the same regions and measures, by default the cohort itself.
+    mean : np.ndarray, optional
+        Normative means of shape (regions, measures), instead of *reference*.
+    std : np.ndarray, optional
+        Normative standard deviations of shape (regions, measures), instead of *reference*.
+    ddof : int, optional
+        Delta degrees of freedom of the reference's standard deviation, by default 1
+
+    Returns
+    -------
+    CohortArray
+        The z-scores (NaN where the reference has no spread).
+    """
+    import numpy as np
+
+    if mean is None or std is None:
+        reference = array if reference is None else reference
+        _check_vocabularies(array, reference)
+        mean, std = _nan_moments(reference.values, ddof=ddof)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = (array.values - mean) / np.where(std == 0, np.nan, std)
+    return CohortArray(values.astype(array.values.dtype, copy=False), array.subjects, array.regions, array.measures)
+
+
+def asymmetry_index(array: CohortArray) -> CohortArray:
+    """
+    Compute (left - right) / ((left + right) / 2) for every region measured in both hemispheres.
+
+    Parameters
+    ----------
+    array : CohortArray
+        The cohort.
+
+    Returns
+    -------
+    CohortArray
+        The asymmetry indices, with (atlas, ASYMMETRY, region) regions.
+    """
+    import numpy as np
+
+    positions = {region: i for i, region in enumerate(array.regions)}
+    left, right, regions = [], [], []
+    for (atlas, hemisphere, name), i in positions.items():
+        j = positions.get((atlas, RIGHT, name)) if hemisphere == LEFT else None
+        if j is not None:
+            left.append(i)
+            right.append(j)
+            regions.append((atlas, ASYMMETRY, name))
+    lh, rh = array.values[:, left], array.values[:, right]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = (lh - rh) / ((lh + rh) / 2)
+    return CohortArray(values, array.subjects, regions, array.measures)
+
+
+def read_icv(stats_files: Iterable[Union[Path, str]], measure: str = ICV_MEASURE) -> Dict[str, float]:
+    """
+    Read every subject's intracranial volume from its stats files' headers (data tables are not read).
+
+    Parameters
+    ----------
+    stats_files : Iterable[Union[Path, str]]
+        Stats files with a whole brain *measure* line (e.g. aseg.stats or ?h.aparc.stats).
+    measure : str, optional
+        The whole brain measurement's index, by default ICV_MEASURE ("eTIV")
+
+    Returns
+    -------
+    Dict[str, float]
+        The intracranial volume of every subject (from its first file holding it).
+    """
+    icv = {}
+    for stats_file in map(Path, stats_files):
+        stats = get_stats_class(stats_file)(stats_file, check_mtime=False)
+        tokens = stats.scan_headers()
+        subject = get_subject(stats)
+        if subject in icv:
+            continue
+        for line in tokens.measures:
+            whole_brain = parse_measure(line)
+            if whole_brain.index == measure:
+                icv[subject] = whole_brain.value
+                break
+    return icv
+
+
+def normalize_icv(
+    array: CohortArray,
+    icv: Union[Mapping[str, float], np.ndarray],
+    measures: Sequence[str] = VOLUME_MEASURES,
+    scale: Optional[float] = None,
+) -> CohortArray:
+    """
+    Normalize volumes by every subject's intracranial volume (the proportion method).
+
+    Parameters
+    ----------
+    array : CohortArray
+        The cohort.
+    icv : Union[Mapping[str, float], np.ndarray]
+        Intracranial volume per subject (see read_icv), or a vector in the order of the array's subjects.
+    measures : Sequence[str], optional
+        Measures to normalize (others are kept as-is), by default VOLUME_MEASURES
+    scale : float, optional
+        Multiply the normalized volumes by this volume (e.g. the cohort's mean ICV,
+        to keep them in mm^3), by default None (fractions of the ICV)
+
+    Returns
+    -------
+    CohortArray
+        A copy of the array, with normalized volumes.
+    """
+    import numpy as np
+
+    if isinstance(icv, Mapping):
+        icv = np.array([icv.get(subject, np.nan) for subject in array.subjects], dtype=float)
+    factors = np.asarray(icv, dtype=float).reshape(-1, 1, 1)
+    if scale is not None:
+        factors = factors / scale
+    columns = [i for i, measure in enumerate(array.measures) if measure in measures]
+    values = array.values.copy()
+    values[:, :, columns] = values[:, :, columns] / factors
+    return CohortArray(values, array.subjects, array.regions, array.measures)
+
+
+def group_means(array: CohortArray, groups: Union[Mapping[str, str], Sequence[str]]) -> CohortArray:
+    """
+    Average every region's measurements per group of subjects (ignoring missing values).
+
+    Parameters
+    ----------
+    array : CohortArray
+        The cohort.
+    groups : Union[Mapping[str, str], Sequence[str]]
+        Group of every subject, as a mapping or in the order of the array's subjects.
+        Subjects without a group (None) are left out.
+
+    Returns
+    -------
+    CohortArray
+        The means, with a "subject" per group (sorted).
+    """
+    import numpy as np
+
+    if isinstance(groups, Mapping):
+        groups = [groups.get(subject) for subject in array.subjects]
+    labels = sorted({group for group in groups if group is not None})
+    positions = {label: i for i, label in enumerate(labels)}
+    membership = np.zeros((len(labels), len(array.subjects)))
+    for subject, group in enumerate(groups):
+        if group is not None:
+            membership[positions[group], subject] = 1
+    values = array.values.reshape(len(array.subjects), -1)
+    valid = ~np.isnan(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = (membership @ np.where(valid, values, 0)) / (membership @ valid)
+    means = means.reshape(len(labels), *array.shape[1:]).astype(array.values.dtype, copy=False)
+    return CohortArray(means, labels, array.regions, array.measures)
@@ -0,0 +1 @@
+from freesurfer_statistics.cache.cache import StatsCache  # noqa: F401
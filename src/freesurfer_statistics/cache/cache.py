@@ -0,0 +1,210 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from freesurfer_statistics import __version__
+
+
+class StatsCache:
+    #: Cached results (FreesurferStats properties)
+    KEYS = ("headers", "schema", "structural_measurements", "whole_brain_measurements")
+
+    #: Storage format
+    INDEX_NAME = "index.sqlite"
+    ENTRY_SUFFIX = ".pkl"
+
+    def __init__(
+        self,
+        cache_dir: Union[Path, str],
+        max_bytes: Optional[int] = 2**30,
+        max_entries: Optional[int] = None,
+    ) -> None:
+        """
+        An on-disk cache of parsed stats files.
+
+        Entries are keyed by the stats file's resolved path, size, modification
+        time, the parser producing them (see get_key) and the library's version,
+        and are evicted least-recently-used first once *max_bytes* or
+        *max_entries* is exceeded. Entries that fail to load (e.g. truncated, or
+        written by another version of pandas) are evicted and treated as misses.
+
+        Entries are pickles rather than a columnar format (Parquet/Feather): besides
+        the measurement tables, they hold the headers and the interned schema, and
+        pyarrow is only an optional dependency. Loading a pickle runs any code it
+        contains, so *cache_dir* must only be writable by trusted users (never
+        share a world-writable cache directory).
+
+        Parameters
+        ----------
+        cache_dir : Union[Path, str]
+            Directory to store the cache in (created if missing).
+        max_bytes : int, optional
+            Maximal total size of the cached entries, by default 1 GiB.
+            None disables the limit.
+        max_entries : int, optional
+            Maximal number of cached entries, by default unlimited.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, path TEXT, size INTEGER, mtime_ns INTEGER, "
+                "version TEXT, nbytes INTEGER, accessed REAL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Open a connection to the cache's index, committed and closed on exit.
+
+        Yields
+        ------
+        sqlite3.Connection
+            Connection to the index database.
+        """
+        connection = sqlite3.connect(str(self.cache_dir / self.INDEX_NAME), timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.ENTRY_SUFFIX}"
+
+    @staticmethod
+    def get_key(stats_file: Union[Path, str], variant: str = "") -> str:
+        """
+        Get the cache key of a stats file in its current state.
+
+        Parameters
+        ----------
+        stats_file : Union[Path, str]
+            Path to a Freesurfer .stats file.
+        variant : str, optional
+            What the results depend on besides the file (e.g. the parser class and float_dtype), by default none
+
+        Returns
+        -------
+        str
+            The stats file's cache key.
+        """
+        path = Path(stats_file).resolve()
+        stat = path.stat()
+        signature = f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0{variant}\0{__version__}"
+        return hashlib.sha1(signature.encode()).hexdigest()
+
+    def get(self, stats_file: Union[Path, str], variant: str = "") -> Optional[dict]:
+        """
+        Load a stats file's cached results.
+
+        Parameters
+        ----------
+        stats_file : Union[Path, str]
+            Path to a Freesurfer .stats file.
+        variant : str, optional
+            The results' variant (see get_key), by default none
+
+        Returns
+        -------
+        Optional[dict]
+            The cached results (by KEYS), or None if the file is not cached.
+        """
+        key = self.get_key(stats_file, variant)
+        with self._connect() as connection:
+            found = connection.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+            if not found:
+                return None
+            try:
+                results = pickle.loads(self._entry_path(key).read_bytes())
+            except Exception:
+                # Unreadable entries (truncated, or pickled by incompatible versions) are misses
+                self._delete(connection, [key])
+                return None
+            connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        return results
+
+    def set(self, stats_file: Union[Path, str], results: dict, variant: str = "") -> None:
+        """
+        Store a stats file's parsed results, replacing older entries of the same file (of any variant).
+
+        Parameters
+        ----------
+        stats_file : Union[Path, str]
+            Path to a Freesurfer .stats file.
+        results : dict
+            The parsed results (by KEYS).
+        variant : str, optional
+            The results' variant (see get_key), by default none
+        """
+        path = Path(stats_file).resolve()
+        stat = path.stat()
+        key = self.get_key(path, variant)
+        data = pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)
+        entry_path = self._entry_path(key)
+        temporary_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        temporary_path.write_bytes(data)
+        temporary_path.replace(entry_path)
+        with self._connect() as connection:
+            stale = connection.execute("SELECT key FROM entries WHERE path = ? AND key != ?", (str(path), key)).fetchall()
+            self._delete(connection, [row[0] for row in stale])
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, str(path), stat.st_size, stat.st_mtime_ns, __version__, len(data), time.time()),
+            )
+            self._evict(connection)
+
+    def _delete(self, connection: sqlite3.Connection, keys: list) -> None:
+        """
+        Delete entries from the index and the disk.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            Connection to the index database.
+        keys : list
+            Keys of the entries to delete.
+        """
+        for key in keys:
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._entry_path(key).unlink(missing_ok=True)
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """
+        Delete least-recently-used entries until the cache fits its limits.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            Connection to the index database.
+        """
+        rows = connection.execute("SELECT key, nbytes FROM entries ORDER BY accessed DESC").fetchall()
+        total_bytes = 0
+        evicted = []
+        for i, (key, nbytes) in enumerate(rows):
+            total_bytes += nbytes
+            over_bytes = self.max_bytes is not None and total_bytes > self.max_bytes
+            over_entries = self.max_entries is not None and i >= self.max_entries
+            if over_bytes or over_entries:
+                evicted.append(key)
+        self._delete(connection, evicted)
+
+    def clear(self) -> None:
+        """
+        Delete every cached entry.
+        """
+        with self._connect() as connection:
+            keys = [row[0] for row in connection.execute("SELECT key FROM entries").fetchall()]
+            self._delete(connection, keys)
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
@@ -1,27 +1,170 @@
 """Console script for freesurfer_stats."""
+import glob
 import json
 import sys
+from contextlib import nullcontext
+from functools import partial
+from pathlib import Path
+from typing import Iterable, List, Optional
 
 import click
 
-from freesurfer_statistics.cortical_stats import CorticalStats
+from freesurfer_statistics.cohort.cohort import (
+    DEFAULT_ATLASES,
+    HEMISPHERES,
+    TRANSPORTS,
+    StatsCollection,
+    find_stats_files,
+)
+from freesurfer_statistics.cohort.tables import APARC_MEASURES, ASEG_MEASURES, aparcstats2table, asegstats2table
+from freesurfer_statistics.export import FORMATS, json_default, write_table
+from freesurfer_statistics.profiling import profile
+from freesurfer_statistics.registry import get_stats_class
+from freesurfer_statistics.server.server import DEFAULT_HOST, DEFAULT_PORT
 from freesurfer_statistics.subcortical_stats import SubCorticalStats
+from freesurfer_statistics.utils import parallel_map
+
+
+def collect_input_files(
+    input_files: Iterable[str] = (),
+    patterns: Iterable[str] = (),
+    subjects_dir: Optional[str] = None,
+    atlases: Iterable[str] = DEFAULT_ATLASES,
+) -> List[Path]:
+    """
+    Collect the stats files to process from explicit paths, glob patterns and a $SUBJECTS_DIR.
+
+    Parameters
+    ----------
+    input_files : Iterable[str], optional
+        Paths to .stats files.
+    patterns : Iterable[str], optional
+        Glob patterns (recursive "**" is supported).
+    subjects_dir : str, optional
+        Freesurfer's $SUBJECTS_DIR to look for *atlases* in.
+    atlases : Iterable[str], optional
+        Atlases to look for in *subjects_dir*, by default DEFAULT_ATLASES
+
+    Returns
+    -------
+    List[Path]
+        Unique stats files, in the order they were found.
+    """
+    stats_files = [Path(input_file) for input_file in input_files]
+    for pattern in patterns:
+        stats_files += [Path(path) for path in sorted(glob.glob(pattern, recursive=True))]
+    if subjects_dir:
+        stats_files += find_stats_files(subjects_dir, atlases)
+    return list(dict.fromkeys(stats_files))
+
 
+def convert_stats_file(
+    input_file: Path,
+    output_file: Optional[str] = None,
+    output_metadata: Optional[str] = None,
+    whole_brain: Optional[str] = None,
+    is_subcortex: bool = False,
+    format: str = "csv",
+    metadata_only: bool = False,
+) -> Optional[str]:
+    """
+    Write a single stats file's measurements (and optionally metadata and whole brain measurements).
+
+    Parameters
+    ----------
+    input_file : Path
+        Path to the Freesurfer .stats file.
+    output_file : str, optional
+        Path to the output file, by default next to *input_file*.
+    output_metadata : str, optional
+        Path to the output metadata .json file, by default None
+    whole_brain : str, optional
+        Path to the output whole brain measurements' .csv file, by default None
+    is_subcortex : bool, optional
+        Whether the stats file is for the subcortical structures,
+        by default detected from the file's header.
+    format : str, optional
+        Output format, one of FORMATS, by default "csv".
+        Columnar formats embed the headers and whole brain measurements.
+    metadata_only : bool, optional
+        Only write the headers to *output_metadata* (by default next to *input_file*),
+        without parsing the data table (and importing pandas), by default False
+
+    Returns
+    -------
+    Optional[str]
+        The error's description if the file could not be converted, None otherwise.
+    """
+    input_file = Path(input_file)
+    try:
+        stats_class = SubCorticalStats if is_subcortex else get_stats_class(input_file)
+        stats = stats_class(input_file, check_mtime=False)
+        if metadata_only:
+            stats.scan_headers()
+            output_metadata = output_metadata or input_file.with_suffix(".json")
+        else:
+            output_file = output_file or input_file.with_suffix(FORMATS[format])
+        for output in [output_file, output_metadata, whole_brain]:
+            if output and Path(output).resolve() == input_file.resolve():
+                raise ValueError(f"Refusing to overwrite the input file {input_file}")
+        if not metadata_only:
+            stats.export(output_file, format=format)
+        if output_metadata:
+            with open(output_metadata, "w") as f:
+                json.dump(stats.headers, f, default=json_default)
+        if whole_brain:
+            stats.whole_brain_measurements.to_csv(whole_brain)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
 
-@click.command()
+
+@click.group(invoke_without_command=True)
 @click.option(
     "-i",
     "--input-file",
     type=click.Path(exists=True),
-    required=True,
-    help="Path to the Freesurfer .stats file.",
+    multiple=True,
+    help="Path to a Freesurfer .stats file (may be repeated).",
+)
+@click.option(
+    "-g",
+    "--glob",
+    "patterns",
+    multiple=True,
+    help='Glob pattern of Freesurfer .stats files, e.g. "subjects/*/stats/?h.aparc.stats" (may be repeated).',
+)
+@click.option(
+    "-s",
+    "--subjects-dir",
+    type=click.Path(exists=True, file_okay=False),
+    required=False,
+    help="Freesurfer's $SUBJECTS_DIR to collect .stats files from.",
+)
+@click.option(
+    "-a",
+    "--atlas",
+    "atlases",
+    multiple=True,
+    default=DEFAULT_ATLASES,
+    show_default=True,
+    help="Atlas to collect from --subjects-dir (may be repeated).",
 )
 @click.option(
     "-o",
     "--output-file",
     type=click.Path(exists=False),
     required=False,
-    help="Path to the output .csv file.",
+    help="Path to the output file (or the combined output, with --combined).",
+)
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    type=click.Choice(list(FORMATS)),
+    default="csv",
+    show_default=True,
+    help="Output format. Columnar formats embed the headers and whole brain measurements.",
 )
 @click.option(
     "-om",
@@ -42,31 +185,348 @@ from freesurfer_statistics.subcortical_stats import SubCorticalStats
     "--is_subcortex",
     is_flag=True,
     default=False,
-    help="Whether the stats file is for the subcortical structures.",
+    help="Whether the stats files are for the subcortical structures (detected from the files' headers by default).",
+)
+@click.option(
+    "-mo",
+    "--metadata-only",
+    is_flag=True,
+    default=False,
+    help="Only write the headers (to -om, or next to every input file) without parsing the data tables.",
+)
+@click.option(
+    "-c",
+    "--combined",
+    is_flag=True,
+    default=False,
+    help="Write a single combined (tidy) table of all inputs to --output-file.",
+)
+@click.option(
+    "--wide",
+    is_flag=True,
+    default=False,
+    help="With --combined, write a wide (subject x measurement) table instead.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help="With --combined, keep --output-file as a directory of Parquet partitions, re-parsing only new and changed files.",
+)
+@click.option(
+    "--transport",
+    type=click.Choice(TRANSPORTS),
+    default="pickle",
+    show_default=True,
+    help="With --combined, how workers send parsed files back (shared_memory avoids pickling a table per file).",
+)
+@click.option(
+    "--validate",
+    is_flag=True,
+    default=False,
+    help="Check the files' structure first (without parsing them), and skip the invalid ones.",
+)
+@click.option(
+    "--quarantine-report",
+    type=click.Path(exists=False),
+    required=False,
+    help="Path to write the invalid files and their problems to, as JSON (implies --validate).",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes.",
+)
+@click.option("-q", "--quiet", is_flag=True, default=False, help="Do not report progress.")
+@click.option(
+    "--profile",
+    "report_profile",
+    is_flag=True,
+    default=False,
+    help="Report the time spent in every parsing stage, over all workers.",
+)
+@click.option(
+    "--profile-json",
+    type=click.Path(exists=False),
+    required=False,
+    help="Path to write the parsing stages' profile to, as JSON.",
 )
 def main(
-    input_file: str,
+    input_file: Iterable[str] = (),
+    patterns: Iterable[str] = (),
+    subjects_dir: str = None,
+    atlases: Iterable[str] = DEFAULT_ATLASES,
     output_file: str = None,
+    output_format: str = "csv",
     output_metadata: str = None,
     whole_brain: str = None,
     is_subcortex: bool = False,
+    metadata_only: bool = False,
+    combined: bool = False,
+    wide: bool = False,
+    incremental: bool = False,
+    transport: str = "pickle",
+    validate: bool = False,
+    quarantine_report: str = None,
+    jobs: int = 1,
+    quiet: bool = False,
+    report_profile: bool = False,
+    profile_json: str = None,
 ):
     """Console script for freesurfer_stats."""
-    output_file = output_file or input_file.replace(".stats", ".csv")
-    if is_subcortex:
-        stats = SubCorticalStats(input_file)
-    else:
-        stats = CorticalStats(input_file)
-    stats.structural_measurements.to_csv(output_file)
-    if output_metadata:
-        output_metadata = output_metadata or input_file.replace(".stats", ".json")
-        with open(output_metadata, "w") as f:
-            json.dump(stats.headers, f)
-    if whole_brain:
-        whole_brain = whole_brain or input_file.replace(".stats", "_wholebrain.csv")
-        stats.whole_brain_measurements.to_csv(whole_brain)
+    if click.get_current_context().invoked_subcommand is not None:
+        # Converting options are ignored when running a subcommand (e.g. "serve")
+        return 0
+    stats_files = collect_input_files(input_file, patterns, subjects_dir, atlases)
+    if not stats_files:
+        raise click.UsageError("No input .stats files given (use --input-file, --glob or --subjects-dir).")
+    if combined and not output_file:
+        raise click.UsageError("--combined requires --output-file.")
+    if incremental and (not combined or wide):
+        raise click.UsageError("--incremental requires --combined (and a tidy output).")
+    if not combined and len(stats_files) > 1 and (output_file or output_metadata or whole_brain):
+        raise click.UsageError("-o, -om and -wb take a single input file (use --combined for a single output).")
+
+    n_files, quarantined = len(stats_files), {}
+    if validate or quarantine_report:
+        from freesurfer_statistics.validation import quarantine
+
+        stats_files, invalid = quarantine(stats_files, quarantine_report, n_jobs=jobs)
+        quarantined = {stats_file: "; ".join(problem.message for problem in problems) for stats_file, problems in invalid.items()}
+
+    errors = {}
+    with profile() if report_profile or profile_json else nullcontext() as run_profile, click.progressbar(
+        length=len(stats_files),
+        label="Parsing .stats files",
+        file=sys.stderr,
+        hidden=quiet,
+    ) as progress:
+        if incremental:
+            from freesurfer_statistics.cohort.incremental import IncrementalCohort
+
+            changes = IncrementalCohort(output_file, n_jobs=jobs).refresh(stats_files, callback=lambda *_: progress.update(1))
+            progress.update(progress.length - progress.pos)
+            errors = changes.errors
+            if not quiet:
+                click.echo(
+                    f"{len(changes.added)} added, {len(changes.modified)} modified, {len(changes.deleted)} deleted",
+                    err=True,
+                )
+        elif combined:
+            collection = StatsCollection(stats_files, n_jobs=jobs, transport=transport)
+            collection.load(callback=lambda *_: progress.update(1))
+            errors = collection.errors
+            data = collection.wide if wide else collection.tidy
+            if wide and output_format != "csv":
+                data.columns = [":".join(column) for column in data.columns]
+            write_table(data, output_file, format=output_format)
+        else:
+            convert = partial(
+                convert_stats_file,
+                output_file=output_file,
+                output_metadata=output_metadata,
+                whole_brain=whole_brain,
+                is_subcortex=is_subcortex,
+                format=output_format,
+                metadata_only=metadata_only,
+            )
+            for stats_file, error in zip(stats_files, parallel_map(convert, stats_files, n_jobs=jobs)):
+                if error is not None:
+                    errors[stats_file] = error
+                progress.update(1)
+
+    if report_profile:
+        click.echo(run_profile.summary(), err=True)
+    if profile_json:
+        run_profile.to_json(profile_json)
+    errors = {**quarantined, **errors}
+    if errors:
+        click.echo(f"{len(errors)} of {n_files} files failed:", err=True)
+        for stats_file, error in errors.items():
+            click.echo(f"  {stats_file}: {error}", err=True)
+        sys.exit(1)
     return 0
 
 
+@main.command("serve")
+@click.option(
+    "-s",
+    "--subjects-dir",
+    type=click.Path(exists=True, file_okay=False),
+    envvar="SUBJECTS_DIR",
+    required=True,
+    help="Freesurfer's $SUBJECTS_DIR to serve (defaults to the environment variable).",
+)
+@click.option(
+    "-a",
+    "--atlas",
+    "atlases",
+    multiple=True,
+    default=DEFAULT_ATLASES,
+    show_default=True,
+    help="Atlas to load (may be repeated).",
+)
+@click.option("--host", default=DEFAULT_HOST, show_default=True, help="Address to listen on.")
+@click.option("--port", type=click.IntRange(min=0), default=DEFAULT_PORT, show_default=True, help="Port to listen on.")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Path of a Unix socket to listen on (instead of --host and --port).",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0),
+    default=2.0,
+    show_default=True,
+    help="Seconds between two checks for changed stats files (0 disables watching).",
+)
+@click.option("-j", "--jobs", type=click.IntRange(min=1), default=1, show_default=True, help="Number of worker processes.")
+@click.option("-q", "--quiet", is_flag=True, default=False, help="Do not log requests.")
+def serve_command(
+    subjects_dir: str,
+    atlases: Iterable[str],
+    host: str,
+    port: int,
+    socket_path: Optional[str],
+    poll_interval: float,
+    jobs: int,
+    quiet: bool,
+):
+    """Serve a $SUBJECTS_DIR's measurements over a local HTTP query API (GET /query and /status)."""
+    from freesurfer_statistics.server import CohortStore, make_server
+
+    store = CohortStore(subjects_dir, atlases, n_jobs=jobs)
+    changes = store.refresh()
+    click.echo(f"Loaded {len(changes.added)} stats files ({len(changes.errors)} failed) from {subjects_dir}", err=True)
+    if poll_interval:
+        store.watch(poll_interval)
+    server = make_server(store, host=host, port=port, socket_path=socket_path, quiet=quiet)
+    address = socket_path or f"http://{host}:{server.server_address[1]}"
+    click.echo(f"Serving on {address} (press Ctrl+C to stop)", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.stop()
+        server.server_close()
+    return 0
+
+
+#: --delimiter choices of FreeSurfer's *stats2table tools
+DELIMITERS = {"tab": "\t", "comma": ",", "space": " ", "semicolon": ";"}
+
+
+def table_options(func):
+    """
+    Add the options shared by the aparcstats2table and asegstats2table commands (as named by FreeSurfer).
+    """
+    options = [
+        click.option("-s", "--subjects", multiple=True, help="Subject to include (may be repeated)."),
+        click.option(
+            "--subjectsfile",
+            type=click.Path(exists=True, dir_okay=False),
+            help="File listing the subjects to include, one per line.",
+        ),
+        click.option(
+            "--sd",
+            "subjects_dir",
+            type=click.Path(exists=True, file_okay=False),
+            envvar="SUBJECTS_DIR",
+            required=True,
+            help="Freesurfer's $SUBJECTS_DIR (defaults to the environment variable).",
+        ),
+        click.option("-t", "--tablefile", type=click.Path(exists=False), required=True, help="Path to the output table."),
+        click.option(
+            "-d",
+            "--delimiter",
+            type=click.Choice(list(DELIMITERS)),
+            default="tab",
+            show_default=True,
+            help="Delimiter of the output table.",
+        ),
+        click.option("--skip", is_flag=True, default=False, help="Leave out subjects whose stats file is missing or invalid."),
+        click.option("-j", "--jobs", type=click.IntRange(min=1), default=1, show_default=True, help="Number of worker processes."),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+def read_subjects(subjects: Iterable[str], subjects_file: Optional[str]) -> List[str]:
+    """
+    Collect subjects given on the command line and in a subjects file.
+    """
+    subjects = list(subjects)
+    if subjects_file:
+        with open(subjects_file) as f:
+            subjects += [line.strip() for line in f if line.strip()]
+    if not subjects:
+        raise click.UsageError("No subjects given (use --subjects or --subjectsfile).")
+    return subjects
+
+
+def write_stats_table(build, tablefile: str, delimiter: str) -> int:
+    """
+    Build a *stats2table table and write it, reporting skipped files.
+    """
+    try:
+        table, errors = build()
+    except ValueError as e:
+        raise click.ClickException(f"{e} (use --skip to leave these subjects out)")
+    table.to_csv(tablefile, sep=DELIMITERS[delimiter])
+    for stats_file, error in errors.items():
+        click.echo(f"Skipped {stats_file}: {error}", err=True)
+    return 0
+
+
+@click.command("aparcstats2table")
+@table_options
+@click.option("--hemi", type=click.Choice(HEMISPHERES), required=True, help="Hemisphere.")
+@click.option("-p", "--parc", default="aparc", show_default=True, help='Parcellation, e.g. "aparc.a2009s".')
+@click.option("-m", "--meas", type=click.Choice(list(APARC_MEASURES)), default="area", show_default=True, help="Measure.")
+def aparcstats2table_command(
+    subjects: Iterable[str],
+    subjectsfile: Optional[str],
+    subjects_dir: str,
+    tablefile: str,
+    delimiter: str,
+    skip: bool,
+    jobs: int,
+    hemi: str,
+    parc: str,
+    meas: str,
+):
+    """Build a subject x region table of a cortical parcellation's measure (like FreeSurfer's aparcstats2table)."""
+    subjects = read_subjects(subjects, subjectsfile)
+    build = partial(aparcstats2table, subjects, hemi, subjects_dir, parc=parc, meas=meas, n_jobs=jobs, skip=skip)
+    return write_stats_table(build, tablefile, delimiter)
+
+
+@click.command("asegstats2table")
+@table_options
+@click.option("-m", "--meas", type=click.Choice(list(ASEG_MEASURES)), default="volume", show_default=True, help="Measure.")
+@click.option("--statsfile", default="aseg.stats", show_default=True, help='Name of the stats file, e.g. "wmparc.stats".')
+def asegstats2table_command(
+    subjects: Iterable[str],
+    subjectsfile: Optional[str],
+    subjects_dir: str,
+    tablefile: str,
+    delimiter: str,
+    skip: bool,
+    jobs: int,
+    meas: str,
+    statsfile: str,
+):
+    """Build a subject x structure table of a segmentation's measure (like FreeSurfer's asegstats2table)."""
+    subjects = read_subjects(subjects, subjectsfile)
+    build = partial(asegstats2table, subjects, subjects_dir, meas=meas, stats_file=statsfile, n_jobs=jobs, skip=skip)
+    return write_stats_table(build, tablefile, delimiter)
+
+
 if __name__ == "__main__":
     sys.exit(main())  # pragma: no cover
@@ -0,0 +1,37 @@
+import importlib
+
+#: Public names, imported from their modules on first access (PEP 562),
+#: so that importing a single module (e.g. the CLI's constants) does not load them all
+_LAZY_ATTRIBUTES = {
+    "StatsCollection": "freesurfer_statistics.cohort.cohort",
+    "find_stats_files": "freesurfer_statistics.cohort.cohort",
+    "iter_cohort": "freesurfer_statistics.cohort.cohort",
+    "load_cohort": "freesurfer_statistics.cohort.cohort",
+    "load_headers": "freesurfer_statistics.cohort.cohort",
+    "CohortChanges": "freesurfer_statistics.cohort.incremental",
+    "IncrementalCohort": "freesurfer_statistics.cohort.incremental",
+    "CohortArray": "freesurfer_statistics.cohort.array",
+    "APARC_MEASURES": "freesurfer_statistics.cohort.tables",
+    "ASEG_MEASURES": "freesurfer_statistics.cohort.tables",
+    "aparcstats2table": "freesurfer_statistics.cohort.tables",
+    "asegstats2table": "freesurfer_statistics.cohort.tables",
+    "Layout": "freesurfer_statistics.cohort.transport",
+    "PackedBatch": "freesurfer_statistics.cohort.transport",
+    "pack_stats_files": "freesurfer_statistics.cohort.transport",
+    "release_batches": "freesurfer_statistics.cohort.transport",
+    "unpack_batches": "freesurfer_statistics.cohort.transport",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
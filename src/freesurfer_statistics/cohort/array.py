@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple, Union
+
+from freesurfer_statistics.cohort.cohort import TIDY_COLUMNS, WIDE_COLUMNS, WIDE_INDEX
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+#: Tidy columns identifying a region (in the regions' vocabulary order)
+REGION_KEY = ["atlas", "hemisphere", "region"]
+
+Region = Tuple[str, str, str]
+
+
+class CohortArray:
+    def __init__(
+        self,
+        values: np.ndarray,
+        subjects: Sequence[str],
+        regions: Sequence[Region],
+        measures: Sequence[str],
+    ) -> None:
+        """
+        A cohort's measurements as a dense (subjects, regions, measures) array.
+
+        Labels are kept once per cohort, in sorted vocabularies, and missing
+        measurements (e.g. thickness of subcortical regions) are NaN. Regions are
+        sorted by (atlas, hemisphere, region), so an atlas' regions are contiguous
+        and selecting them (see select) returns a view.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The measurements, of shape (len(subjects), len(regions), len(measures)).
+        subjects : Sequence[str]
+            Subjects' names.
+        regions : Sequence[Region]
+            (atlas, hemisphere, region) of every region.
+        measures : Sequence[str]
+            Measures' names.
+        """
+        self.values = values
+        self.subjects = tuple(subjects)
+        self.regions = tuple(tuple(region) for region in regions)
+        self.measures = tuple(measures)
+        expected = (len(self.subjects), len(self.regions), len(self.measures))
+        if values.shape != expected:
+            raise ValueError(f"Expected values of shape {expected}, got {values.shape}")
+
+    @classmethod
+    def from_tidy(cls, data: pd.DataFrame, float_dtype: str = "float64") -> "CohortArray":
+        """
+        Build the array from a tidy table (see StatsCollection.tidy).
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            A table with TIDY_COLUMNS columns.
+        float_dtype : str, optional
+            The array's data type, e.g. "float32" to halve its size, by default "float64"
+
+        Returns
+        -------
+        CohortArray
+            The cohort's array.
+
+        Raises
+        ------
+        ValueError
+            If a (subject, atlas, hemisphere, region, measure) is measured more than once.
+        """
+        import numpy as np
+        import pandas as pd
+
+        subject_codes, subjects = pd.factorize(data["subject"].astype(str), sort=True)
+        region_codes, regions = pd.factorize(pd.MultiIndex.from_frame(data[REGION_KEY].astype(str)), sort=True)
+        measure_codes, measures = pd.factorize(data["measure"].astype(str), sort=True)
+        shape = (len(subjects), len(regions), len(measures))
+        cells = np.ravel_multi_index((subject_codes, region_codes, measure_codes), shape)
+        duplicated = pd.Series(cells).duplicated(keep=False).to_numpy()
+        if duplicated.any():
+            raise ValueError(f"Measurements are duplicated, e.g.:\n{data[duplicated].head()}")
+        values = np.full(shape, np.nan, dtype=float_dtype)
+        values[subject_codes, region_codes, measure_codes] = data["value"].to_numpy()
+        return cls(values, list(subjects), list(regions), list(measures))
+
+    @classmethod
+    def from_wide(cls, data: pd.DataFrame, float_dtype: str = "float64") -> "CohortArray":
+        """
+        Build the array from a wide table (see StatsCollection.wide).
+
+        Parameters
+        ----------
+        data : pd.DataFrame
+            A table with a row per subject and (atlas, hemisphere, region, measure) columns.
+        float_dtype : str, optional
+            The array's data type, by default "float64"
+
+        Returns
+        -------
+        CohortArray
+            The cohort's array.
+        """
+        tidy = data.rename_axis(index=WIDE_INDEX, columns=WIDE_COLUMNS).melt(ignore_index=False).reset_index()
+        return cls.from_tidy(tidy.dropna(subset=["value"]), float_dtype=float_dtype)
+
+    def to_tidy(self) -> pd.DataFrame:
+        """
+        Convert the array to a tidy table (without its missing measurements).
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per (subject, atlas, hemisphere, region, measure), with categorical labels.
+        """
+        import numpy as np
+        import pandas as pd
+
+        subject_codes, region_codes, measure_codes = np.nonzero(~np.isnan(self.values))
+        columns = {"subject": pd.Categorical.from_codes(subject_codes, self.subjects)}
+        for i, name in enumerate(REGION_KEY):
+            codes, labels = pd.factorize(pd.Series([region[i] for region in self.regions], dtype=object))
+            columns[name] = pd.Categorical.from_codes(codes[region_codes], labels)
+        columns["measure"] = pd.Categorical.from_codes(measure_codes, self.measures)
+        columns["value"] = self.values[subject_codes, region_codes, measure_codes]
+        return pd.DataFrame(columns)[TIDY_COLUMNS]
+
+    def to_wide(self) -> pd.DataFrame:
+        """
+        Convert the array to a wide table (without all-missing columns).
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per subject, with (atlas, hemisphere, region, measure) columns.
+        """
+        import pandas as pd
+
+        columns = pd.MultiIndex.from_tuples(
+            [(*region, measure) for region in self.regions for measure in self.measures],
+            names=WIDE_COLUMNS,
+        )
+        data = pd.DataFrame(
+            self.values.reshape(len(self.subjects), -1),
+            index=pd.Index(self.subjects, name=WIDE_INDEX),
+            columns=columns,
+        )
+        return data.dropna(axis=1, how="all")
+
+    def astype(self, float_dtype: str) -> "CohortArray":
+        """
+        Get a copy of the array with another data type.
+
+        Parameters
+        ----------
+        float_dtype : str
+            The new data type, e.g. "float32".
+
+        Returns
+        -------
+        CohortArray
+            The converted array.
+        """
+        return CohortArray(self.values.astype(float_dtype), self.subjects, self.regions, self.measures)
+
+    def __getitem__(self, key: Union[slice, Tuple[slice, ...]]) -> "CohortArray":
+        """
+        Slice the array by position (a view of the same data, with sliced vocabularies).
+
+        Parameters
+        ----------
+        key : Union[slice, Tuple[slice, ...]]
+            Slices of the subjects, regions and measures axes.
+
+        Returns
+        -------
+        CohortArray
+            The sliced array.
+        """
+        key = key if isinstance(key, tuple) else (key,)
+        if len(key) > 3 or not all(isinstance(part, slice) for part in key):
+            raise TypeError("CohortArray only supports slicing (use get for single labels)")
+        key = key + (slice(None),) * (3 - len(key))
+        return CohortArray(
+            self.values[key],
+            self.subjects[key[0]],
+            self.regions[key[1]],
+            self.measures[key[2]],
+        )
+
+    def select(
+        self,
+        atlas: str,
+        hemisphere: Optional[str] = None,
+        measures: Optional[Union[str, slice]] = None,
+    ) -> "CohortArray":
+        """
+        Select an atlas' regions (a view, since they are contiguous).
+
+        Parameters
+        ----------
+        atlas : str
+            The atlas, e.g. "aparc".
+        hemisphere : str, optional
+            Only this hemisphere's regions ("left", "right" or "subcortex"), by default all.
+        measures : Union[str, slice], optional
+            A measure, or a slice of measures' names (inclusive, like pandas' label slicing), by default all.
+
+        Returns
+        -------
+        CohortArray
+            The selected regions (and measures) of every subject.
+        """
+        prefix = (atlas,) if hemisphere is None else (atlas, hemisphere)
+        start = bisect_left(self.regions, prefix)
+        stop = bisect_right(self.regions, prefix + ("\U0010ffff",))
+        if isinstance(measures, str):
+            index = self.measures.index(measures)
+            measures = slice(index, index + 1)
+        elif isinstance(measures, slice):
+            measures = slice(
+                None if measures.start is None else self.measures.index(measures.start),
+                None if measures.stop is None else self.measures.index(measures.stop) + 1,
+            )
+        return self[:, start:stop, measures or slice(None)]
+
+    def get(
+        self,
+        subject: Optional[str] = None,
+        region: Optional[Region] = None,
+        measure: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Get the measurements with the given labels (a view, with their axes dropped).
+
+        Parameters
+        ----------
+        subject : str, optional
+            A subject, by default all.
+        region : Region, optional
+            An (atlas, hemisphere, region) tuple, by default all.
+        measure : str, optional
+            A measure, by default all.
+
+        Returns
+        -------
+        np.ndarray
+            A view of the values, e.g. a (regions,) vector for a subject and a measure.
+        """
+        key = (
+            slice(None) if subject is None else self.subjects.index(subject),
+            slice(None) if region is None else self.regions.index(tuple(region)),
+            slice(None) if measure is None else self.measures.index(measure),
+        )
+        return self.values[key]
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        """
+        The array's (subjects, regions, measures) shape.
+        """
+        return self.values.shape
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the measurements (in bytes).
+        """
+        return self.values.nbytes
+
+    def __repr__(self) -> str:
+        subjects, regions, measures = self.shape
+        return f"CohortArray(subjects={subjects}, regions={regions}, measures={measures}, dtype={self.values.dtype})"
@@ -0,0 +1,540 @@
+from __future__ import annotations
+
+import os
+from contextlib import suppress
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from freesurfer_statistics.cache import StatsCache
+from freesurfer_statistics.freesurfer_stats import FreesurferStats
+from freesurfer_statistics.profiling import stage
+from freesurfer_statistics.registry import get_stats_class
+from freesurfer_statistics.utils import advise_willneed, parallel_map, to_datetimes
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+#: Default atlases looked up in every subject's "stats" directory
+DEFAULT_ATLASES = ("aparc", "aparc.a2009s", "aparc.DKTatlas", "aseg")
+HEMISPHERES = ("lh", "rh")
+SUBCORTICAL_ATLASES = ("aseg",)
+
+#: Tidy table format
+TIDY_COLUMNS = ["subject", "atlas", "hemisphere", "region", "measure", "value"]
+WIDE_INDEX = "subject"
+WIDE_COLUMNS = ["atlas", "hemisphere", "region", "measure"]
+
+#: How parsing workers send their results back (see cohort.transport)
+TRANSPORTS = ("pickle", "shared_memory")
+
+#: Measurement columns that identify a region rather than measure it
+IDENTIFIER_COLUMNS = ("Index", "SegId")
+REGION_COLUMN = "Region"
+
+
+def find_stats_files(
+    subjects_dir: Union[Path, str],
+    atlases: Iterable[str] = DEFAULT_ATLASES,
+    subjects: Optional[Iterable[str]] = None,
+) -> List[Path]:
+    """
+    Find Freesurfer .stats files under a $SUBJECTS_DIR.
+
+    Parameters
+    ----------
+    subjects_dir : Union[Path, str]
+        Freesurfer's $SUBJECTS_DIR.
+    atlases : Iterable[str], optional
+        Atlases to look for, by default DEFAULT_ATLASES
+    subjects : Iterable[str], optional
+        Subjects to look in, by default every subject with a "stats" directory.
+
+    Returns
+    -------
+    List[Path]
+        Existing .stats files, sorted by subject.
+    """
+    subjects_dir = Path(subjects_dir)
+    if subjects is None:
+        subjects = sorted(path.parent.name for path in subjects_dir.glob("*/stats"))
+    file_names = []
+    for atlas in atlases:
+        if atlas in SUBCORTICAL_ATLASES:
+            file_names.append(f"{atlas}.stats")
+        else:
+            file_names += [f"{hemi}.{atlas}.stats" for hemi in HEMISPHERES]
+    stats_files = []
+    for subject in subjects:
+        stats_dir = subjects_dir / subject / "stats"
+        stats_files += [stats_dir / name for name in file_names if (stats_dir / name).exists()]
+    return stats_files
+
+
+def get_atlas(stats_file: Union[Path, str]) -> str:
+    """
+    Get the atlas name of a stats file (e.g. "aparc.a2009s" for "lh.aparc.a2009s.stats",
+    or "hippoSfVolumes-T1.v21" for "lh.hippoSfVolumes-T1.v21.txt").
+
+    Parameters
+    ----------
+    stats_file : Union[Path, str]
+        Path to a Freesurfer .stats file.
+
+    Returns
+    -------
+    str
+        The atlas name.
+    """
+    name = Path(stats_file).stem
+    hemi, _, atlas = name.partition(".")
+    return atlas if hemi in HEMISPHERES and atlas else name
+
+
+def get_subject(stats: FreesurferStats) -> str:
+    """
+    Get the subject of a parsed stats file, from its headers or its location.
+
+    Parameters
+    ----------
+    stats : FreesurferStats
+        A parsed stats file.
+
+    Returns
+    -------
+    str
+        The subject's name.
+    """
+    return stats.headers.get("subjectname") or stats.path.parent.parent.name
+
+
+def get_measure_columns(measurements: pd.DataFrame) -> List[str]:
+    """
+    Get the columns of structural measurements that hold measures (numeric, and not identifying regions).
+
+    Parameters
+    ----------
+    measurements : pd.DataFrame
+        A stats file's structural measurements.
+
+    Returns
+    -------
+    List[str]
+        The measures' columns, in order.
+    """
+    import pandas as pd
+
+    return [
+        col
+        for col in measurements.columns
+        if col != REGION_COLUMN and col not in IDENTIFIER_COLUMNS and pd.api.types.is_numeric_dtype(measurements[col])
+    ]
+
+
+def to_tidy(stats: FreesurferStats) -> pd.DataFrame:
+    """
+    Melt a stats file's structural measurements into the tidy cohort format.
+
+    Parameters
+    ----------
+    stats : FreesurferStats
+        A parsed stats file.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (region, measure), with TIDY_COLUMNS columns.
+    """
+    measurements = stats.structural_measurements
+    measures = get_measure_columns(measurements)
+    data = measurements.melt(
+        id_vars=[REGION_COLUMN],
+        value_vars=measures,
+        var_name="measure",
+        value_name="value",
+    ).rename(columns={REGION_COLUMN: "region"})
+    data["value"] = data["value"].astype(float)
+    data.insert(0, "subject", get_subject(stats))
+    data.insert(1, "atlas", get_atlas(stats.path))
+    data.insert(2, "hemisphere", stats.hemisphere)
+    return data[TIDY_COLUMNS]
+
+
+def iter_cohort(
+    stats_files: Iterable[Union[Path, str]],
+    measures: bool = False,
+) -> Iterator[Tuple[Path, tuple]]:
+    """
+    Stream the rows of many stats files, one file (and one row) at a time.
+
+    Parameters
+    ----------
+    stats_files : Iterable[Union[Path, str]]
+        Paths to Freesurfer .stats files.
+    measures : bool, optional
+        Whether to stream the whole brain measurements instead of the
+        structural measurements, by default False
+
+    Yields
+    ------
+    Tuple[Path, tuple]
+        Every row's stats file, and the row (see FreesurferStats.iter_rows and
+        FreesurferStats.iter_measures).
+    """
+    for stats_file in map(Path, stats_files):
+        stats = get_stats_class(stats_file)(stats_file, check_mtime=False)
+        records = stats.iter_measures() if measures else stats.iter_rows()
+        for record in records:
+            yield stats_file, record
+
+
+def _read_stats_headers(stats_file: Path) -> Tuple[Path, Optional[dict], Dict[str, str], Optional[str]]:
+    """
+    Read a single stats file's headers, keeping dates as strings.
+
+    Parameters
+    ----------
+    stats_file : Path
+        Path to a Freesurfer .stats file.
+
+    Returns
+    -------
+    Tuple[Path, Optional[dict], Dict[str, str], Optional[str]]
+        The file, its headers, the formats of its date headers and, if reading failed, the error's description.
+    """
+    try:
+        stats_class = get_stats_class(stats_file)
+        stats = stats_class(stats_file, check_mtime=False, parse_dates=False)
+        return stats_file, stats.headers, stats_class.get_date_formats(), None
+    except Exception as e:
+        return stats_file, None, {}, f"{type(e).__name__}: {e}"
+
+
+def load_headers(
+    stats_files: Iterable[Union[Path, str]],
+    n_jobs: int = 1,
+    chunksize: int = 1,
+    parse_dates: bool = True,
+) -> Tuple[pd.DataFrame, Dict[Path, str]]:
+    """
+    Read the headers of many stats files into one table.
+
+    Dates are kept as strings while the files are read, and every date
+    column is converted at once (see freesurfer_statistics.utils.to_datetimes).
+
+    Parameters
+    ----------
+    stats_files : Iterable[Union[Path, str]]
+        Paths to Freesurfer .stats files.
+    n_jobs : int, optional
+        Number of worker processes, by default 1
+    chunksize : int, optional
+        Number of files sent to a worker at once, by default 1
+    parse_dates : bool, optional
+        Whether to convert the date headers to datetimes, by default True
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, Dict[Path, str]]
+        A row of headers per stats file (indexed by path), and the files that failed to read, with their errors.
+    """
+    import pandas as pd
+
+    rows, index, date_formats, errors = [], [], {}, {}
+    stats_files = [Path(stats_file) for stats_file in stats_files]
+    for stats_file, headers, formats, error in parallel_map(_read_stats_headers, stats_files, n_jobs, chunksize):
+        if error is not None:
+            errors[stats_file] = error
+            continue
+        rows.append(headers)
+        index.append(stats_file)
+        date_formats.update(formats)
+    data = pd.DataFrame(rows, index=pd.Index(index, name="path"))
+    if parse_dates:
+        for key, format in date_formats.items():
+            if key in data:
+                data[key] = to_datetimes(data[key], format)
+    return data, errors
+
+
+def _parse_stats_file(
+    stats_file: Path, cache: Optional[StatsCache] = None, io_backend: str = "stream"
+) -> Tuple[Path, Optional[pd.DataFrame], Optional[str]]:
+    """
+    Parse a single stats file into a tidy frame.
+
+    Parameters
+    ----------
+    stats_file : Path
+        Path to a Freesurfer .stats file.
+    cache : StatsCache, optional
+        On-disk cache of parsed stats files, by default None
+    io_backend : str, optional
+        I/O backend of the parser ("stream" or "mmap"), by default "stream"
+
+    Returns
+    -------
+    Tuple[Path, Optional[pd.DataFrame], Optional[str]]
+        The file, its tidy frame and, if parsing failed, the error's description.
+    """
+    try:
+        stats = get_stats_class(stats_file)(stats_file, check_mtime=False, cache=cache, io_backend=io_backend)
+        return stats_file, to_tidy(stats), None
+    except Exception as e:
+        return stats_file, None, f"{type(e).__name__}: {e}"
+
+
+def _parse_stats_files(
+    stats_files: List[Path], cache: Optional[StatsCache] = None, io_backend: str = "stream"
+) -> List[Tuple[Path, Optional[pd.DataFrame], Optional[str]]]:
+    """
+    Parse a batch of stats files (process pool worker), hinting the OS to read them ahead first.
+
+    Parameters
+    ----------
+    stats_files : List[Path]
+        Paths to Freesurfer .stats files.
+    cache : StatsCache, optional
+        On-disk cache of parsed stats files, by default None
+    io_backend : str, optional
+        I/O backend of the parser ("stream" or "mmap"), by default "stream"
+
+    Returns
+    -------
+    List[Tuple[Path, Optional[pd.DataFrame], Optional[str]]]
+        Every file's parsing result (see _parse_stats_file).
+    """
+    advise_willneed(stats_files)
+    return [_parse_stats_file(stats_file, cache=cache, io_backend=io_backend) for stats_file in stats_files]
+
+
+class StatsCollection:
+    def __init__(
+        self,
+        stats_files: Iterable[Union[Path, str]],
+        n_jobs: Optional[int] = None,
+        chunksize: int = 1,
+        cache: Optional[StatsCache] = None,
+        io_backend: str = "stream",
+        transport: str = "pickle",
+    ) -> None:
+        """
+        A cohort of Freesurfer .stats files, parsed in parallel.
+
+        Parameters
+        ----------
+        stats_files : Iterable[Union[Path, str]]
+            Paths to Freesurfer .stats files.
+        n_jobs : int, optional
+            Number of worker processes, by default os.cpu_count().
+            1 parses the files in the current process.
+        chunksize : int, optional
+            Number of files sent to a worker at once (and read ahead together), by default 1
+        cache : StatsCache, optional
+            On-disk cache of parsed stats files, by default None
+        io_backend : str, optional
+            I/O backend of the parsers ("stream" or "mmap"), by default "stream"
+        transport : str, optional
+            How workers send their results back: "pickle" (a tidy frame per file) or
+            "shared_memory" (values packed in shared memory, see cohort.transport,
+            with categorical labels), by default "pickle"
+        """
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport {transport!r}, expected one of {TRANSPORTS}")
+        self.stats_files = [Path(stats_file) for stats_file in stats_files]
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.cache = cache
+        self.io_backend = io_backend
+        self.transport = transport
+        self.errors: Dict[Path, str] = {}
+        self._data = None
+
+    @classmethod
+    def from_subjects_dir(
+        cls,
+        subjects_dir: Union[Path, str],
+        atlases: Iterable[str] = DEFAULT_ATLASES,
+        subjects: Optional[Iterable[str]] = None,
+        **kwargs,
+    ) -> "StatsCollection":
+        """
+        Collect the .stats files found under a $SUBJECTS_DIR.
+
+        Parameters
+        ----------
+        subjects_dir : Union[Path, str]
+            Freesurfer's $SUBJECTS_DIR.
+        atlases : Iterable[str], optional
+            Atlases to look for, by default DEFAULT_ATLASES
+        subjects : Iterable[str], optional
+            Subjects to look in, by default all of them.
+
+        Returns
+        -------
+        StatsCollection
+            The cohort's stats files.
+        """
+        return cls(find_stats_files(subjects_dir, atlases, subjects), **kwargs)
+
+    def _iter_results(self):
+        """
+        Parse the collection's files, in parallel if more than one job is requested.
+
+        Yields
+        ------
+        Tuple[Path, Optional[pd.DataFrame], Optional[str]]
+            Every file's parsing result.
+        """
+        parse = partial(_parse_stats_files, cache=self.cache, io_backend=self.io_backend)
+        for results in parallel_map(parse, self._batches(), n_jobs=self.n_jobs):
+            yield from results
+
+    def _batches(self) -> List[List[Path]]:
+        size = max(self.chunksize, 1)
+        return [self.stats_files[i : i + size] for i in range(0, len(self.stats_files), size)]
+
+    def _load_packed(self, callback: Optional[Callable[[Path, Optional[str]], None]] = None) -> pd.DataFrame:
+        """
+        Parse every file of the collection with the shared memory transport (see load).
+        """
+        # Imported here, as the transport module builds on this one
+        from freesurfer_statistics.cohort.transport import pack_stats_files, release_batches, unpack_batches
+
+        pack = partial(pack_stats_files, cache=self.cache, io_backend=self.io_backend)
+        results = parallel_map(pack, self._batches(), n_jobs=self.n_jobs)
+        received = []
+
+        def iter_batches():
+            for batch in results:
+                received.append(batch)
+                if callback is not None:
+                    for stats_file, *_ in batch.files:
+                        callback(stats_file, None)
+                    for stats_file, error in batch.errors:
+                        callback(stats_file, error)
+                yield batch
+
+        try:
+            self._data, self.errors = unpack_batches(iter_batches())
+        except Exception:
+            # Workers receive every batch up front: wait for the pending ones to release their blocks too
+            # (when parsing inline, the remaining batches are simply never packed)
+            release_batches(received)
+            if self.n_jobs > 1:
+                with suppress(Exception):
+                    release_batches(results)
+            results.close()
+            raise
+        except BaseException:
+            # Interrupted (e.g. Ctrl+C): do not wait for the workers, closing the pool cancels the pending batches
+            release_batches(received)
+            results.close()
+            raise
+        return self._data
+
+    def load(self, callback: Optional[Callable[[Path, Optional[str]], None]] = None) -> pd.DataFrame:
+        """
+        Parse every file of the collection into a single tidy frame.
+
+        Files that fail to parse are skipped and recorded in *errors*.
+
+        Parameters
+        ----------
+        callback : Callable[[Path, Optional[str]], None], optional
+            Called with every file and its error (None on success) once parsed,
+            e.g. to report progress.
+
+        Returns
+        -------
+        pd.DataFrame
+            The cohort's measurements, with TIDY_COLUMNS columns.
+        """
+        import pandas as pd
+
+        if self.transport == "shared_memory":
+            return self._load_packed(callback)
+        frames = []
+        self.errors = {}
+        for stats_file, data, error in self._iter_results():
+            if callback is not None:
+                callback(stats_file, error)
+            if error is not None:
+                self.errors[stats_file] = error
+            else:
+                frames.append(data)
+        if frames:
+            with stage("assemble"):
+                self._data = pd.concat(frames, ignore_index=True)
+        else:
+            self._data = pd.DataFrame(columns=TIDY_COLUMNS)
+        return self._data
+
+    @property
+    def tidy(self) -> pd.DataFrame:
+        """
+        Get the cohort's measurements in long (tidy) format.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per (subject, atlas, hemisphere, region, measure).
+        """
+        if self._data is None:
+            self.load()
+        return self._data
+
+    @property
+    def wide(self) -> pd.DataFrame:
+        """
+        Get the cohort's measurements in wide format.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per subject, with (atlas, hemisphere, region, measure) columns.
+        """
+        return self.tidy.set_index([WIDE_INDEX] + WIDE_COLUMNS)["value"].unstack(WIDE_COLUMNS)
+
+
+def load_cohort(
+    paths_or_subjects_dir: Union[Path, str, Iterable[Union[Path, str]]],
+    atlases: Iterable[str] = DEFAULT_ATLASES,
+    n_jobs: Optional[int] = None,
+    chunksize: int = 1,
+    wide: bool = False,
+    transport: str = "pickle",
+) -> Tuple[pd.DataFrame, Dict[Path, str]]:
+    """
+    Parse a cohort of Freesurfer .stats files into one table.
+
+    Parameters
+    ----------
+    paths_or_subjects_dir : Union[Path, str, Iterable[Union[Path, str]]]
+        Either a $SUBJECTS_DIR to look for *atlases* in, or paths to .stats files.
+    atlases : Iterable[str], optional
+        Atlases to look for in a $SUBJECTS_DIR, by default DEFAULT_ATLASES
+    n_jobs : int, optional
+        Number of worker processes, by default os.cpu_count()
+    chunksize : int, optional
+        Number of files sent to a worker at once, by default 1
+    wide : bool, optional
+        Whether to return a wide (subject x measurement) table, by default False
+    transport : str, optional
+        How workers send their results back (see StatsCollection), by default "pickle"
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, Dict[Path, str]]
+        The cohort's table and the files that failed to parse, with their errors.
+    """
+    if isinstance(paths_or_subjects_dir, (str, Path)) and Path(paths_or_subjects_dir).is_dir():
+        collection = StatsCollection.from_subjects_dir(
+            paths_or_subjects_dir, atlases=atlases, n_jobs=n_jobs, chunksize=chunksize, transport=transport
+        )
+    elif isinstance(paths_or_subjects_dir, (str, Path)):
+        collection = StatsCollection([paths_or_subjects_dir], n_jobs=n_jobs, chunksize=chunksize, transport=transport)
+    else:
+        collection = StatsCollection(paths_or_subjects_dir, n_jobs=n_jobs, chunksize=chunksize, transport=transport)
+    data = collection.wide if wide else collection.tidy
+    return data, collection.errors
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from freesurfer_statistics.cohort.cohort import TIDY_COLUMNS, StatsCollection
+from freesurfer_statistics.utils import hash_file
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class CohortChanges(NamedTuple):
+    """
+    What a refresh of an IncrementalCohort changed.
+
+    Attributes
+    ----------
+    added : List[Path]
+        Newly parsed stats files.
+    modified : List[Path]
+        Re-parsed stats files (whose content changed).
+    deleted : List[Path]
+        Stats files whose rows were dropped (missing, or failing to parse).
+    errors : Dict[Path, str]
+        The files that failed to parse, with their errors.
+    """
+
+    added: List[Path]
+    modified: List[Path]
+    deleted: List[Path]
+    errors: Dict[Path, str]
+
+
+class IncrementalCohort:
+    #: Storage format
+    MANIFEST_NAME = "manifest.sqlite"
+    DATA_DIR = "data"
+    PARTITION_SUFFIX = ".parquet"
+
+    #: Column identifying the stats file every row was parsed from
+    SOURCE_COLUMN = "stats_file"
+
+    def __init__(
+        self,
+        output_dir: Union[Path, str],
+        n_jobs: Optional[int] = None,
+        chunksize: int = 1,
+        io_backend: str = "stream",
+    ) -> None:
+        """
+        A cohort's tidy table kept up to date by re-parsing only new and changed stats files.
+
+        Rows are stored as a Parquet partition per subject directory (requires pyarrow),
+        next to a manifest of every parsed file's path, size, modification time and
+        content hash. Refreshing diffs the manifest against the filesystem and
+        rewrites only the partitions of added, modified and deleted files.
+
+        Parameters
+        ----------
+        output_dir : Union[Path, str]
+            Directory to store the cohort in (created if missing).
+        n_jobs : int, optional
+            Number of worker processes, by default os.cpu_count()
+        chunksize : int, optional
+            Number of files sent to a worker at once, by default 1
+        io_backend : str, optional
+            I/O backend of the parsers ("stream" or "mmap"), by default "stream"
+        """
+        self.output_dir = Path(output_dir)
+        self.data_dir = self.output_dir / self.DATA_DIR
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.n_jobs = n_jobs
+        self.chunksize = chunksize
+        self.io_backend = io_backend
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT, partition TEXT)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Open a connection to the manifest, committed and closed on exit.
+
+        Yields
+        ------
+        sqlite3.Connection
+            Connection to the manifest database.
+        """
+        connection = sqlite3.connect(str(self.output_dir / self.MANIFEST_NAME), timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def get_partition(stats_file: Path) -> str:
+        """
+        Get the partition of a stats file (its subject's directory name).
+
+        Parameters
+        ----------
+        stats_file : Path
+            Path to a stats file (<subject>/stats/<name>.stats).
+
+        Returns
+        -------
+        str
+            The partition's name.
+        """
+        return stats_file.parent.parent.name or stats_file.parent.name
+
+    def _partition_path(self, partition: str) -> Path:
+        return self.data_dir / f"{partition}{self.PARTITION_SUFFIX}"
+
+    def _write_partition(self, partition: str, drop: Iterable[str], frames: List[pd.DataFrame]) -> None:
+        """
+        Rewrite a partition without the rows of the *drop* files, with *frames* appended.
+        """
+        import pandas as pd
+
+        path = self._partition_path(partition)
+        drop = set(drop)
+        if path.exists():
+            existing = pd.read_parquet(path)
+            frames = [existing[~existing[self.SOURCE_COLUMN].isin(drop)], *frames]
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            if path.exists():
+                path.unlink()
+            return
+        data = pd.concat(frames, ignore_index=True)
+        data = data.astype({column: str for column in data.columns if column != "value"})
+        tmp_path = path.with_suffix(".tmp")
+        data.to_parquet(tmp_path, index=False)
+        tmp_path.replace(path)
+
+    def refresh(
+        self,
+        stats_files: Iterable[Union[Path, str]],
+        callback: Optional[Callable[[Path, Optional[str]], None]] = None,
+    ) -> CohortChanges:
+        """
+        Bring the stored cohort up to date with *stats_files*.
+
+        Files whose size and modification time match the manifest are skipped;
+        files that were only touched (same content hash) are not re-parsed either.
+
+        Parameters
+        ----------
+        stats_files : Iterable[Union[Path, str]]
+            The cohort's current stats files (indexed files missing from it are dropped).
+        callback : Callable[[Path, Optional[str]], None], optional
+            Called with every re-parsed file and its error (None on success), e.g. to report progress.
+
+        Returns
+        -------
+        CohortChanges
+            The added, modified and deleted files, and the parsing errors.
+        """
+        stats_files = [Path(stats_file) for stats_file in stats_files]
+        with self._connect() as connection:
+            manifest = {row[0]: row[1:] for row in connection.execute("SELECT path, size, mtime_ns, hash, partition FROM files")}
+
+        added, modified, touched, vanished, records = [], [], [], set(), {}
+        for stats_file in stats_files:
+            try:
+                stat = stats_file.stat()
+            except FileNotFoundError:
+                # Deleted since it was listed
+                vanished.add(str(stats_file))
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            entry = manifest.get(str(stats_file))
+            if entry is not None and tuple(entry[:2]) == signature:
+                continue
+            content_hash = hash_file(stats_file)
+            records[stats_file] = (str(stats_file), *signature, content_hash, self.get_partition(stats_file))
+            if entry is None:
+                added.append(stats_file)
+            elif entry[2] == content_hash:
+                touched.append(stats_file)
+            else:
+                modified.append(stats_file)
+        current = {str(stats_file) for stats_file in stats_files} - vanished
+        deleted = [Path(path) for path in manifest if path not in current]
+
+        frames: Dict[str, List[pd.DataFrame]] = {}
+        errors = {}
+        collection = StatsCollection(added + modified, n_jobs=self.n_jobs, chunksize=self.chunksize, io_backend=self.io_backend)
+        for stats_file, data, error in collection._iter_results():
+            if callback is not None:
+                callback(stats_file, error)
+            if error is not None:
+                errors[stats_file] = error
+                continue
+            data.insert(0, self.SOURCE_COLUMN, str(stats_file))
+            frames.setdefault(self.get_partition(stats_file), []).append(data)
+
+        # Partitions are rewritten before the manifest, so rows of an added file may already be
+        # stored by a refresh that crashed in between: drop them too, to keep refreshing idempotent
+        drops: Dict[str, List[str]] = {}
+        for stats_file in added + modified + deleted + list(errors):
+            entry = manifest.get(str(stats_file))
+            partition = entry[3] if entry is not None else self.get_partition(stats_file)
+            drops.setdefault(partition, []).append(str(stats_file))
+        for partition in set(drops) | set(frames):
+            self._write_partition(partition, drops.get(partition, ()), frames.get(partition, []))
+
+        with self._connect() as connection:
+            connection.executemany("DELETE FROM files WHERE path = ?", [(str(path),) for path in [*deleted, *errors]])
+            connection.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, hash, partition) VALUES (?, ?, ?, ?, ?)",
+                [records[stats_file] for stats_file in added + modified + touched if stats_file not in errors],
+            )
+        failed = [stats_file for stats_file in errors if str(stats_file) in manifest]
+        return CohortChanges(
+            added=[stats_file for stats_file in added if stats_file not in errors],
+            modified=[stats_file for stats_file in modified if stats_file not in errors],
+            deleted=deleted + failed,
+            errors=errors,
+        )
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def load(self, source: bool = False) -> pd.DataFrame:
+        """
+        Read the stored cohort.
+
+        Parameters
+        ----------
+        source : bool, optional
+            Whether to keep the SOURCE_COLUMN (every row's stats file), by default False
+
+        Returns
+        -------
+        pd.DataFrame
+            The cohort's measurements, with TIDY_COLUMNS columns.
+        """
+        import pandas as pd
+
+        paths = sorted(self.data_dir.glob(f"*{self.PARTITION_SUFFIX}"))
+        columns = [self.SOURCE_COLUMN, *TIDY_COLUMNS] if source else TIDY_COLUMNS
+        if not paths:
+            return pd.DataFrame(columns=columns)
+        return pd.concat([pd.read_parquet(path, columns=columns) for path in paths], ignore_index=True)
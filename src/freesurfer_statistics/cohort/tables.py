@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Union
+
+from freesurfer_statistics.cohort.cohort import HEMISPHERES, REGION_COLUMN
+from freesurfer_statistics.registry import get_stats_class
+from freesurfer_statistics.utils import advise_willneed, parallel_map
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+#: aparcstats2table's --meas choices, and the table columns they select
+APARC_MEASURES = {
+    "area": "SurfArea",
+    "volume": "GrayVol",
+    "thickness": "ThickAvg",
+    "thicknessstd": "ThickStd",
+    "meancurv": "MeanCurv",
+    "gauscurv": "GausCurv",
+    "foldind": "FoldInd",
+    "curvind": "CurvInd",
+}
+
+#: asegstats2table's --meas choices, and the table columns they select
+ASEG_MEASURES = {
+    "volume": "Volume_mm3",
+    "mean": "normMean",
+    "std": "normStdDev",
+}
+
+#: Whole brain measures appended to aparcstats2table's table: per hemisphere for some --meas, and for all of them
+APARC_HEMISPHERE_MEASURES = {"thickness": "MeanThickness", "area": "WhiteSurfArea"}
+APARC_WHOLE_BRAIN_MEASURES = ("BrainSegVolNotVent", "eTIV")
+
+#: Whole brain measures named differently in asegstats2table's table (which appends all of them to volume tables)
+ASEG_WHOLE_BRAIN_ALIASES = {"eTIV": "EstimatedTotalIntraCranialVol"}
+
+#: A parsed row: the regions, their values and the requested whole brain measures (None when missing)
+TableRow = Tuple[List[str], List[float], Dict[str, Optional[float]]]
+
+
+def _read_table_row(
+    stats_file: Path, column: str, whole_brain: Optional[Tuple[str, ...]]
+) -> Tuple[Path, Optional[TableRow], Optional[str]]:
+    """
+    Read a single measure (and whole brain measures) of a stats file's regions.
+
+    Parameters
+    ----------
+    stats_file : Path
+        Path to a Freesurfer .stats file.
+    column : str
+        The table column to read, e.g. "ThickAvg".
+    whole_brain : Tuple[str, ...], optional
+        Whole brain measures' indices to read, by default none; an empty tuple reads all of them.
+
+    Returns
+    -------
+    Tuple[Path, Optional[TableRow], Optional[str]]
+        The file, its row and, if reading failed, the error's description.
+    """
+    try:
+        stats = get_stats_class(stats_file)(stats_file, check_mtime=False)
+        data = stats.structural_measurements
+        measures = {}
+        if whole_brain is not None:
+            measurements = stats.whole_brain_measurements
+            measures = dict(zip(measurements["index"].tolist(), measurements["value"].tolist()))
+            if whole_brain:
+                measures = {index: measures.get(index) for index in whole_brain}
+        return stats_file, (data[REGION_COLUMN].tolist(), data[column].astype(float).tolist(), measures), None
+    except Exception as e:
+        return stats_file, None, f"{type(e).__name__}: {e}"
+
+
+def _read_table_rows(
+    stats_files: List[Path], column: str, whole_brain: Optional[Tuple[str, ...]]
+) -> List[Tuple[Path, Optional[TableRow], Optional[str]]]:
+    """
+    Read a batch of stats files' rows (process pool worker), hinting the OS to read them ahead first.
+    """
+    advise_willneed(stats_files)
+    return [_read_table_row(stats_file, column, whole_brain) for stats_file in stats_files]
+
+
+def build_table(
+    stats_files: Dict[str, Path],
+    column: str,
+    index_name: str,
+    region_name: str = "{region}",
+    whole_brain: Optional[Iterable[str]] = None,
+    whole_brain_names: Optional[Dict[str, str]] = None,
+    n_jobs: int = 1,
+    chunksize: int = 16,
+    skip: bool = False,
+) -> Tuple[pd.DataFrame, Dict[Path, str]]:
+    """
+    Build a subject x region table of a single measure.
+
+    Files are parsed on a process pool, every worker returning plain lists of a
+    file's regions and values; the table is then filled in a single pass over
+    the rows, into one array, with a column per region (in order of appearance).
+
+    Parameters
+    ----------
+    stats_files : Dict[str, Path]
+        Every subject's stats file.
+    column : str
+        The table column to read, e.g. "ThickAvg".
+    index_name : str
+        Name of the table's index (its first column's header).
+    region_name : str, optional
+        Format of the regions' column names (with a "{region}" field), by default the region's name.
+    whole_brain : Iterable[str], optional
+        Indices of the whole brain measures to append, by default none; an empty iterable appends all of them.
+    whole_brain_names : Dict[str, str], optional
+        Column names of whole brain measures, by default their index.
+    n_jobs : int, optional
+        Number of worker processes, by default 1
+    chunksize : int, optional
+        Number of files sent to a worker at once, by default 16
+    skip : bool, optional
+        Whether to leave out subjects whose file is missing or fails to parse, instead of raising, by default False
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, Dict[Path, str]]
+        The table (indexed by subject) and the skipped files, with their errors.
+
+    Raises
+    ------
+    ValueError
+        If a file is missing or fails to parse (and *skip* is False).
+    """
+    import numpy as np
+    import pandas as pd
+
+    subjects = {path: subject for subject, path in stats_files.items()}
+    errors = {path: "FileNotFoundError: No such file" for path in subjects if not path.exists()}
+    paths = [path for path in subjects if path not in errors]
+    whole_brain = None if whole_brain is None else tuple(whole_brain)
+    whole_brain_names = whole_brain_names or {}
+    read = partial(_read_table_rows, column=column, whole_brain=whole_brain)
+    batches = [paths[i : i + chunksize] for i in range(0, len(paths), chunksize)]
+    rows = {}
+    for results in parallel_map(read, batches, n_jobs=n_jobs):
+        for stats_file, row, error in results:
+            if error is None:
+                rows[subjects[stats_file]] = row
+            else:
+                errors[stats_file] = error
+    if errors and not skip:
+        raise ValueError("Failed to read: " + ", ".join(f"{path} ({error})" for path, error in errors.items()))
+
+    names: Dict[str, int] = {}
+    positions, values = [], []
+    for regions, region_values, measures in rows.values():
+        keys = [region_name.format(region=region) for region in regions]
+        keys += [whole_brain_names.get(index, index) for index in measures]
+        positions.append([names.setdefault(key, len(names)) for key in keys])
+        values.append(region_values + [np.nan if value is None else value for value in measures.values()])
+    table = np.full((len(rows), len(names)), np.nan)
+    for i, (row_positions, row_values) in enumerate(zip(positions, values)):
+        table[i, row_positions] = row_values
+    return pd.DataFrame(table, index=pd.Index(list(rows), name=index_name), columns=list(names)), errors
+
+
+def _subject_files(subjects_dir: Union[Path, str], subjects: Iterable[str], file_name: str) -> Dict[str, Path]:
+    subjects_dir = Path(subjects_dir)
+    return {subject: subjects_dir / subject / "stats" / file_name for subject in subjects}
+
+
+def aparcstats2table(
+    subjects: Iterable[str],
+    hemi: str,
+    subjects_dir: Union[Path, str],
+    parc: str = "aparc",
+    meas: str = "area",
+    **kwargs,
+) -> Tuple[pd.DataFrame, Dict[Path, str]]:
+    """
+    Build FreeSurfer's aparcstats2table table: a subject x region table of a cortical parcellation's measure.
+
+    Columns are named "<hemi>_<region>_<meas>" (after the "<hemi>.<parc>.<meas>" index),
+    followed by the hemisphere's mean thickness or white surface area (for the
+    thickness and area measures), BrainSegVolNotVent and eTIV.
+
+    Parameters
+    ----------
+    subjects : Iterable[str]
+        Subjects' names.
+    hemi : str
+        Hemisphere ("lh" or "rh").
+    subjects_dir : Union[Path, str]
+        Freesurfer's $SUBJECTS_DIR.
+    parc : str, optional
+        Parcellation (atlas) name, e.g. "aparc.a2009s", by default "aparc"
+    meas : str, optional
+        Measure, one of APARC_MEASURES, by default "area"
+    **kwargs
+        Passed to build_table (n_jobs, chunksize, skip).
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, Dict[Path, str]]
+        The table (indexed by subject) and the skipped files, with their errors.
+    """
+    if hemi not in HEMISPHERES:
+        raise ValueError(f"Unknown hemisphere {hemi!r}, expected one of {HEMISPHERES}")
+    if meas not in APARC_MEASURES:
+        raise ValueError(f"Unknown measure {meas!r}, expected one of {tuple(APARC_MEASURES)}")
+    whole_brain, whole_brain_names = APARC_WHOLE_BRAIN_MEASURES, {}
+    if meas in APARC_HEMISPHERE_MEASURES:
+        index = APARC_HEMISPHERE_MEASURES[meas]
+        whole_brain, whole_brain_names = (index, *whole_brain), {index: f"{hemi}_{index}_{meas}"}
+    return build_table(
+        _subject_files(subjects_dir, subjects, f"{hemi}.{parc}.stats"),
+        APARC_MEASURES[meas],
+        index_name=f"{hemi}.{parc}.{meas}",
+        region_name=f"{hemi}_{{region}}_{meas}",
+        whole_brain=whole_brain,
+        whole_brain_names=whole_brain_names,
+        **kwargs,
+    )
+
+
+def asegstats2table(
+    subjects: Iterable[str],
+    subjects_dir: Union[Path, str],
+    meas: str = "volume",
+    stats_file: str = "aseg.stats",
+    **kwargs,
+) -> Tuple[pd.DataFrame, Dict[Path, str]]:
+    """
+    Build FreeSurfer's asegstats2table table: a subject x structure table of a segmentation's measure.
+
+    Columns are named after the structures (after the "Measure:<meas>" index);
+    volume tables are followed by every whole brain measure of the files.
+
+    Parameters
+    ----------
+    subjects : Iterable[str]
+        Subjects' names.
+    subjects_dir : Union[Path, str]
+        Freesurfer's $SUBJECTS_DIR.
+    meas : str, optional
+        Measure, one of ASEG_MEASURES, by default "volume"
+    stats_file : str, optional
+        Name of the segmentation's stats file, e.g. "wmparc.stats", by default "aseg.stats"
+    **kwargs
+        Passed to build_table (n_jobs, chunksize, skip).
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, Dict[Path, str]]
+        The table (indexed by subject) and the skipped files, with their errors.
+    """
+    if meas not in ASEG_MEASURES:
+        raise ValueError(f"Unknown measure {meas!r}, expected one of {tuple(ASEG_MEASURES)}")
+    return build_table(
+        _subject_files(subjects_dir, subjects, stats_file),
+        ASEG_MEASURES[meas],
+        index_name=f"Measure:{meas}",
+        whole_brain=() if meas == "volume" else None,
+        whole_brain_names=ASEG_WHOLE_BRAIN_ALIASES,
+        **kwargs,
+    )
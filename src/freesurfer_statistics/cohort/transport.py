@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import os
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from freesurfer_statistics.cache import StatsCache
+from freesurfer_statistics.cohort.cohort import REGION_COLUMN, TIDY_COLUMNS, get_atlas, get_measure_columns, get_subject
+from freesurfer_statistics.profiling import stage
+from freesurfer_statistics.registry import get_stats_class
+from freesurfer_statistics.utils import advise_willneed
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+#: Data type (and size) of the values in shared memory
+VALUES_DTYPE = "float64"
+VALUES_ITEMSIZE = 8
+
+
+class Layout(NamedTuple):
+    """
+    The shape of a stats file's measurements, shared by (almost) every file of an atlas and hemisphere.
+    """
+
+    atlas: str
+    hemisphere: str
+    regions: Tuple[str, ...]
+    measures: Tuple[str, ...]
+
+    @property
+    def size(self) -> int:
+        return len(self.regions) * len(self.measures)
+
+
+class PackedBatch(NamedTuple):
+    """
+    A batch of parsed stats files, with their values packed in a shared memory block.
+
+    Only this (small) description is pickled back to the parent; every distinct
+    layout is sent once per batch rather than once per file.
+
+    Attributes
+    ----------
+    name : Optional[str]
+        Name of the shared memory block (None if no file was parsed).
+    layouts : Tuple[Layout, ...]
+        The batch's distinct layouts.
+    files : Tuple[Tuple[Path, str, int, int], ...]
+        Every parsed file's path, subject, layout (index in *layouts*) and offset in the block (in values).
+        Each file's values are stored as a (regions, measures) array.
+    errors : Tuple[Tuple[Path, str], ...]
+        The files that failed to parse, with their errors.
+    """
+
+    name: Optional[str]
+    layouts: Tuple[Layout, ...]
+    files: Tuple[Tuple[Path, str, int, int], ...]
+    errors: Tuple[Tuple[Path, str], ...]
+
+
+def pack_stats_files(stats_files: List[Path], cache: Optional[StatsCache] = None, io_backend: str = "stream") -> PackedBatch:
+    """
+    Parse a batch of stats files (process pool worker), packing their values into a new shared memory block.
+
+    The block is left for the parent to unlink (see unpack_batches).
+
+    Parameters
+    ----------
+    stats_files : List[Path]
+        Paths to Freesurfer .stats files.
+    cache : StatsCache, optional
+        On-disk cache of parsed stats files, by default None
+    io_backend : str, optional
+        I/O backend of the parser ("stream" or "mmap"), by default "stream"
+
+    Returns
+    -------
+    PackedBatch
+        The batch's description.
+    """
+    import numpy as np
+
+    advise_willneed(stats_files)
+    layouts: Dict[Layout, int] = {}
+    measures_by_schema: Dict[tuple, Tuple[str, ...]] = {}
+    files, blocks, errors = [], [], []
+    offset = 0
+    for stats_file in stats_files:
+        try:
+            stats = get_stats_class(stats_file)(stats_file, check_mtime=False, cache=cache, io_backend=io_backend)
+            data = stats.structural_measurements
+            # Measures only depend on the table columns: computed once per atlas
+            key = (type(stats), stats.schema)
+            if key not in measures_by_schema:
+                measures_by_schema[key] = tuple(get_measure_columns(data))
+            measures = measures_by_schema[key]
+            layout = Layout(get_atlas(stats_file), stats.hemisphere, tuple(data[REGION_COLUMN].tolist()), measures)
+            block = data[list(measures)].to_numpy(dtype=VALUES_DTYPE)
+            subject = get_subject(stats)
+        except Exception as e:
+            errors.append((stats_file, f"{type(e).__name__}: {e}"))
+            continue
+        files.append((stats_file, subject, layouts.setdefault(layout, len(layouts)), offset))
+        blocks.append(block)
+        offset += block.size
+    if not offset:
+        return PackedBatch(None, tuple(layouts), tuple(files), tuple(errors))
+    # The parent owns (and unlinks) the block: this process' resource tracker
+    # would otherwise report it as leaked, and unlink it, once the worker exits
+    if sys.version_info >= (3, 13):
+        memory = shared_memory.SharedMemory(create=True, size=offset * VALUES_ITEMSIZE, track=False)
+    else:
+        memory = shared_memory.SharedMemory(create=True, size=offset * VALUES_ITEMSIZE)
+        if os.name == "posix":
+            # CPython 3.8-3.12 always track created blocks, under their private _name (the name with its leading slash)
+            resource_tracker.unregister(memory._name, "shared_memory")
+    try:
+        values = np.ndarray(offset, dtype=VALUES_DTYPE, buffer=memory.buf)
+        np.concatenate(blocks, axis=None, out=values)
+        del values
+    finally:
+        memory.close()
+    return PackedBatch(memory.name, tuple(layouts), tuple(files), tuple(errors))
+
+
+def _unpack_values(batch: PackedBatch, unlink: bool = True) -> np.ndarray:
+    """
+    Copy a batch's values out of shared memory, as every file's (measures, regions) values in a row.
+    """
+    import numpy as np
+
+    memory = shared_memory.SharedMemory(name=batch.name)
+    try:
+        end = max(offset + batch.layouts[layout].size for _, _, layout, offset in batch.files)
+        values = np.ndarray(end, dtype=VALUES_DTYPE, buffer=memory.buf)
+        blocks = []
+        for _, _, layout, offset in batch.files:
+            regions, measures = batch.layouts[layout].regions, batch.layouts[layout].measures
+            blocks.append(values[offset : offset + len(regions) * len(measures)].reshape(len(regions), len(measures)).T)
+        unpacked = np.concatenate(blocks, axis=None)
+        del values, blocks
+        return unpacked
+    finally:
+        memory.close()
+        if unlink:
+            memory.unlink()
+
+
+def release_batches(batches: Iterable[PackedBatch]) -> None:
+    """
+    Unlink the shared memory blocks of batches that were not unpacked (e.g. left behind by a failed load).
+
+    Blocks that were already released are skipped.
+
+    Parameters
+    ----------
+    batches : Iterable[PackedBatch]
+        Batches of parsed stats files (see pack_stats_files).
+    """
+    for batch in batches:
+        if batch.name is None:
+            continue
+        try:
+            memory = shared_memory.SharedMemory(name=batch.name)
+        except FileNotFoundError:
+            continue
+        memory.close()
+        memory.unlink()
+
+
+def unpack_batches(batches: Iterable[PackedBatch], unlink: bool = True) -> Tuple[pd.DataFrame, Dict[Path, str]]:
+    """
+    Assemble packed batches into a single tidy table, without building a frame per file.
+
+    Values are copied out of every batch's block (which is then released), and
+    labels are built once per layout and repeated as categorical codes.
+
+    Parameters
+    ----------
+    batches : Iterable[PackedBatch]
+        Batches of parsed stats files (see pack_stats_files).
+    unlink : bool, optional
+        Whether to release the batches' shared memory blocks, by default True
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, Dict[Path, str]]
+        The cohort's measurements (with TIDY_COLUMNS columns, in the files' order,
+        like StatsCollection's pickle transport, but with categorical labels),
+        and the files that failed to parse, with their errors.
+    """
+    import numpy as np
+    import pandas as pd
+
+    layouts: Dict[Layout, int] = {}
+    values, file_layouts, subjects, errors = [], [], [], {}
+    for batch in batches:
+        errors.update(batch.errors)
+        if batch.name is None:
+            continue
+        with stage("assemble"):
+            values.append(_unpack_values(batch, unlink=unlink))
+            ids = [layouts.setdefault(layout, len(layouts)) for layout in batch.layouts]
+            file_layouts += [ids[layout] for _, _, layout, _ in batch.files]
+            subjects += [subject for _, subject, _, _ in batch.files]
+    if not values:
+        return pd.DataFrame(columns=TIDY_COLUMNS), errors
+
+    with stage("assemble"):
+        vocabularies: Dict[str, Dict[str, int]] = {name: {} for name in TIDY_COLUMNS[1:-1]}
+        per_layout: Dict[str, list] = {name: [] for name in TIDY_COLUMNS[1:-1]}
+        for layout in layouts:
+            n_regions, n_measures = len(layout.regions), len(layout.measures)
+            for name, label in [("atlas", layout.atlas), ("hemisphere", layout.hemisphere)]:
+                per_layout[name].append(vocabularies[name].setdefault(label, len(vocabularies[name])))
+            regions = [vocabularies["region"].setdefault(region, len(vocabularies["region"])) for region in layout.regions]
+            measures = [vocabularies["measure"].setdefault(measure, len(vocabularies["measure"])) for measure in layout.measures]
+            per_layout["region"].append(np.tile(np.array(regions, dtype=np.int32), n_measures))
+            per_layout["measure"].append(np.repeat(np.array(measures, dtype=np.int32), n_regions))
+
+        file_layouts = np.array(file_layouts)
+        sizes = np.array([layout.size for layout in layouts])[file_layouts]
+        subject_codes, subject_labels = pd.factorize(pd.Series(subjects, dtype=object))
+        columns = {"subject": pd.Categorical.from_codes(np.repeat(subject_codes, sizes), subject_labels)}
+        for name in ["atlas", "hemisphere"]:
+            codes = np.repeat(np.array(per_layout[name])[file_layouts], sizes)
+            columns[name] = pd.Categorical.from_codes(codes, list(vocabularies[name]))
+        for name in ["region", "measure"]:
+            codes = np.concatenate([per_layout[name][layout] for layout in file_layouts])
+            columns[name] = pd.Categorical.from_codes(codes, list(vocabularies[name]))
+        columns["value"] = np.concatenate(values)
+        return pd.DataFrame(columns)[TIDY_COLUMNS], errors
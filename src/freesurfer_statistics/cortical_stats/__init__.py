@@ -1 +1 @@
-from freesurfer_statistics.cortical_stats.cortical_stats import CorticalStats  # noqa: F401
+from freesurfer_statistics.cortical_stats.cortical_stats import BAExvivoStats, CorticalStats  # noqa: F401
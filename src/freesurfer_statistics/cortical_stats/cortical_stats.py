@@ -1,10 +1,10 @@
 from pathlib import Path
 from typing import Union
 
-import pandas as pd
-
+from freesurfer_statistics.cache import StatsCache
 from freesurfer_statistics.cortical_stats.format import SpecialHeaders
 from freesurfer_statistics.freesurfer_stats import FreesurferStats
+from freesurfer_statistics.parsing import SniffedHeader
 
 
 class CorticalStats(FreesurferStats):
@@ -14,55 +14,67 @@ class CorticalStats(FreesurferStats):
     #: Special headers
     SPECIAL_HEADERS = SpecialHeaders
 
-    def __init__(self, stats_file: Union[Path, str]) -> None:
-        super().__init__(stats_file)
+    #: Detection
+    GENERATING_PROGRAM = "mris_anatomical_stats"
+    IDENTIFYING_COLUMNS = ("NumVert", "ThickAvg")
 
-    def parse_whole_brain_measurements(
+    def __init__(
         self,
-    ) -> pd.DataFrame:
-        """
-        Parse whole brain measurements from Freesurfer's .stats file.
+        stats_file: Union[Path, str],
+        check_mtime: bool = True,
+        float_dtype: str = "float64",
+        cache: StatsCache = None,
+        io_backend: str = "stream",
+        parse_dates: bool = True,
+    ) -> None:
+        super().__init__(
+            stats_file,
+            check_mtime=check_mtime,
+            float_dtype=float_dtype,
+            cache=cache,
+            io_backend=io_backend,
+            parse_dates=parse_dates,
+        )
 
-        Returns
-        -------
-        pd.DataFrame
-            Whole brain measurements.
+    @classmethod
+    def detect(cls, header: SniffedHeader) -> bool:
         """
-        data = pd.DataFrame(columns=["index", "description", "unit", "value"])
-        for i, line in enumerate(self._get_wholebrain_measures()):
-            _, col, description, val, unit = [j.strip() for j in line.split(",")]
-            data.loc[i, ["index", "description", "unit"]] = [
-                col,
-                description,
-                unit,
-            ]
-            data.loc[i, "value"] = float(val)
-        return data
+        Whether the sniffed file is a cortical parcellation's stats file.
 
-    def _get_wholebrain_measures(self) -> list:
-        """
-        Read stats file's measures
+        Parameters
+        ----------
+        header : SniffedHeader
+            The beginning of a stats file.
 
         Returns
         -------
-        list
-            A list of the measures from the stats file.
+        bool
+            True for surface-based (mris_anatomical_stats) stats files.
         """
-        measures = []
-        for line in self.lines:
-            line = self._read_header_line(line)
-            if line.startswith(self.HEADERS_END):
-                measures.append(line.replace(self.HEADERS_END, "").strip())
-        return measures
+        return (
+            header.headers.get("generating_program") == cls.GENERATING_PROGRAM
+            or header.headers.get("hemi") in ("lh", "rh")
+            or any(column in header.columns for column in cls.IDENTIFYING_COLUMNS)
+        )
+
 
-    @property
-    def whole_brain_measurements(self) -> pd.DataFrame:
+class BAExvivoStats(CorticalStats):
+    #: Detection
+    ATLAS_IDENTIFIER = "BA_exvivo"
+
+    @classmethod
+    def detect(cls, header: SniffedHeader) -> bool:
         """
-        Get whole brain measurements.
+        Whether the sniffed file is a Brodmann areas' (BA_exvivo) stats file.
+
+        Parameters
+        ----------
+        header : SniffedHeader
+            The beginning of a stats file.
 
         Returns
         -------
-        pd.DataFrame
-            Whole brain measurements.
+        bool
+            True for BA_exvivo (and BA_exvivo.thresh) stats files.
         """
-        return self.parse_whole_brain_measurements()
+        return cls.ATLAS_IDENTIFIER in header.name or cls.ATLAS_IDENTIFIER in header.headers.get("AnnotationFile", "")
@@ -0,0 +1,10 @@
+from freesurfer_statistics.export.export import (  # noqa: F401
+    FORMATS,
+    decode_headers,
+    decode_metadata,
+    encode_headers,
+    encode_metadata,
+    json_default,
+    read_table,
+    write_table,
+)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+#: Output formats and their file extensions
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather", "hdf5": ".h5"}
+
+#: Metadata format
+METADATA_KEY = "freesurfer_statistics"
+HDF_KEY = "structural_measurements"
+DATETIME_KEY = "__datetime__"
+
+
+def json_default(value: Any) -> Any:
+    """
+    Serialize values the json module does not support (e.g. parsed header dates).
+
+    Parameters
+    ----------
+    value : Any
+        The value to serialize.
+
+    Returns
+    -------
+    Any
+        A JSON-serializable representation of *value*.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_headers(headers: dict) -> dict:
+    """
+    Encode headers as JSON-compatible values, keeping track of their types.
+
+    Parameters
+    ----------
+    headers : dict
+        Parsed headers of a stats file.
+
+    Returns
+    -------
+    dict
+        The headers, with dates encoded as {DATETIME_KEY: <ISO 8601 string>}.
+    """
+    return {key: {DATETIME_KEY: value.isoformat()} if isinstance(value, datetime) else value for key, value in headers.items()}
+
+
+def decode_headers(headers: dict) -> dict:
+    """
+    Decode headers encoded by encode_headers.
+
+    Parameters
+    ----------
+    headers : dict
+        Encoded headers.
+
+    Returns
+    -------
+    dict
+        The headers, with their original types.
+    """
+    return {
+        key: datetime.fromisoformat(value[DATETIME_KEY]) if isinstance(value, dict) and DATETIME_KEY in value else value
+        for key, value in headers.items()
+    }
+
+
+def encode_metadata(headers: Optional[dict] = None, whole_brain: Optional[pd.DataFrame] = None) -> str:
+    """
+    Encode a stats file's headers and whole brain measurements as a JSON string.
+
+    Parameters
+    ----------
+    headers : dict, optional
+        Parsed headers of a stats file, by default None
+    whole_brain : pd.DataFrame, optional
+        Whole brain measurements of a stats file, by default None
+
+    Returns
+    -------
+    str
+        The JSON-encoded metadata.
+    """
+    metadata = {}
+    if headers is not None:
+        metadata["headers"] = encode_headers(headers)
+    if whole_brain is not None:
+        metadata["whole_brain_measurements"] = whole_brain.astype(object).to_dict(orient="list")
+    return json.dumps(metadata)
+
+
+def decode_metadata(metadata: Union[str, bytes]) -> Tuple[Optional[dict], Optional[pd.DataFrame]]:
+    """
+    Decode metadata encoded by encode_metadata.
+
+    Parameters
+    ----------
+    metadata : Union[str, bytes]
+        The JSON-encoded metadata.
+
+    Returns
+    -------
+    Tuple[Optional[dict], Optional[pd.DataFrame]]
+        The headers and whole brain measurements.
+    """
+    import pandas as pd
+
+    metadata = json.loads(metadata)
+    headers = metadata.get("headers")
+    whole_brain = metadata.get("whole_brain_measurements")
+    if headers is not None:
+        headers = decode_headers(headers)
+    if whole_brain is not None:
+        whole_brain = pd.DataFrame(whole_brain)
+        whole_brain = whole_brain.astype({col: "category" for col in whole_brain.columns if col != "value"})
+    return headers, whole_brain
+
+
+def _to_arrow(data: pd.DataFrame, metadata: Optional[str] = None):
+    """
+    Convert a frame to an Arrow table, embedding *metadata* in its schema.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(data)
+    if metadata is not None:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: metadata})
+    return table
+
+
+def write_table(
+    data: pd.DataFrame,
+    path: Union[Path, str],
+    format: str = "csv",
+    metadata: Optional[str] = None,
+) -> Path:
+    """
+    Write a table, with optional embedded metadata, in one of FORMATS.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The table to write.
+    path : Union[Path, str]
+        Path to the output file.
+    format : str, optional
+        One of FORMATS, by default "csv".
+        Metadata is not embedded in CSV files.
+    metadata : str, optional
+        JSON-encoded metadata (see encode_metadata), by default None
+
+    Returns
+    -------
+    Path
+        Path to the written file.
+    """
+    import pandas as pd
+
+    path = Path(path)
+    if format == "csv":
+        data.to_csv(path)
+    elif format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(_to_arrow(data, metadata), path)
+    elif format == "feather":
+        import pyarrow.feather as feather
+
+        feather.write_feather(_to_arrow(data, metadata), path)
+    elif format == "hdf5":
+        with pd.HDFStore(path, mode="w") as store:
+            store.put(HDF_KEY, data, format="table")
+            if metadata is not None:
+                store.get_storer(HDF_KEY).attrs[METADATA_KEY] = metadata
+    else:
+        raise ValueError(f"Unknown output format {format!r}, expected one of {list(FORMATS)}")
+    return path
+
+
+def read_table(
+    path: Union[Path, str],
+) -> Tuple[pd.DataFrame, Optional[dict], Optional[pd.DataFrame]]:
+    """
+    Read a table written by write_table, with its embedded metadata.
+
+    Parameters
+    ----------
+    path : Union[Path, str]
+        Path to a .csv, .parquet, .feather or .h5 file.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, Optional[dict], Optional[pd.DataFrame]]
+        The table, and the headers and whole brain measurements (if embedded).
+    """
+    import pandas as pd
+
+    path = Path(path)
+    metadata = None
+    if path.suffix == FORMATS["csv"]:
+        data = pd.read_csv(path, index_col=0)
+    elif path.suffix in (FORMATS["parquet"], FORMATS["feather"]):
+        if path.suffix == FORMATS["parquet"]:
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(path)
+        else:
+            import pyarrow.feather as feather
+
+            table = feather.read_table(path)
+        data = table.to_pandas()
+        metadata = (table.schema.metadata or {}).get(METADATA_KEY.encode())
+    elif path.suffix == FORMATS["hdf5"]:
+        with pd.HDFStore(path, mode="r") as store:
+            data = store.get(HDF_KEY)
+            attrs = store.get_storer(HDF_KEY).attrs
+            metadata = getattr(attrs, METADATA_KEY, None)
+    else:
+        raise ValueError(f"Unknown file format {path.suffix!r}, expected one of {list(FORMATS.values())}")
+    if metadata is None:
+        return data, None, None
+    return (data, *decode_metadata(metadata))
@@ -1,10 +1,32 @@
 """Main module."""
-from pathlib import Path
-from typing import Callable, Union
-
-import pandas as pd
+from __future__ import annotations
 
-from freesurfer_statistics.utils import validate_stats_file
+import io
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from freesurfer_statistics.cache import StatsCache
+from freesurfer_statistics.export import encode_metadata, write_table
+from freesurfer_statistics.parsing import (
+    Measure,
+    ParsedStats,
+    TableSchema,
+    get_record_type,
+    parse_measure,
+    parse_row,
+    parse_stats_buffer,
+    parse_stats_lines,
+    parse_table_columns,
+    read_comment_line,
+)
+from freesurfer_statistics.parsing.parser import COMMENT_PREFIX, MEASURES_IDENTIFIER
+from freesurfer_statistics.profiling import active_profile, stage
+from freesurfer_statistics.utils import IO_BACKENDS, UNITS_CONVERTER, map_file, parse_date, validate_stats_file
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from freesurfer_statistics.parsing import SniffedHeader
 
 
 class FreesurferStats:
@@ -15,16 +37,168 @@ class FreesurferStats:
         "subcortex": "subcortex",
     }
 
+    #: File format
+    SUFFIXES = (".stats",)
+
     #: Columns format
     COLUMNS_IDENTIFIER = "TableCol"
+    DEFAULT_TABLE_COLUMNS = ()
     COLUMNS_PROPERTIES = ["ColHeader", "FieldName", "Units", "CastedType"]
 
     #: Data format
     INDEX_COLUMN = "ColHeader"
     COLUMNS_CONVERTER = {"StructName": "Region"}
 
-    def __init__(self, stats_file: Union[Path, str]) -> None:
-        self.path = validate_stats_file(stats_file)
+    #: Data types
+    INTEGER_COLUMNS = ("Index", "SegId", "NumVert", "NVertices", "NVoxels")
+    CATEGORICAL_COLUMNS = ("Region",)
+    CASTED_TYPES = {"int": "int32", "integer": "int32", "float": "float"}
+    PYTHON_TYPES = {"int32": int, "category": str, "str": str}
+
+    #: Whole brain measurements format
+    WHOLE_BRAIN_COLUMNS = ["index", "description", "unit", "value"]
+
+    def __init__(
+        self,
+        stats_file: Union[Path, str],
+        check_mtime: bool = True,
+        float_dtype: str = "float64",
+        cache: StatsCache = None,
+        io_backend: str = "stream",
+        parse_dates: bool = True,
+    ) -> None:
+        self._initialize(
+            validate_stats_file(stats_file, suffixes=self.SUFFIXES),
+            check_mtime=check_mtime,
+            float_dtype=float_dtype,
+            cache=cache,
+            io_backend=io_backend,
+            parse_dates=parse_dates,
+        )
+
+    def _initialize(
+        self,
+        path: Path,
+        check_mtime: bool = True,
+        float_dtype: str = "float64",
+        cache: StatsCache = None,
+        io_backend: str = "stream",
+        parse_dates: bool = True,
+    ) -> None:
+        """
+        Set up the parser's state, for an already validated *path*.
+        """
+        if io_backend not in IO_BACKENDS:
+            raise ValueError(f"Unknown I/O backend {io_backend!r}, expected one of {IO_BACKENDS}")
+        self.path = path
+        self.check_mtime = check_mtime
+        self.float_dtype = float_dtype
+        self.cache = cache
+        self.io_backend = io_backend
+        self.parse_dates = parse_dates
+        self._cache = {}
+        self._signature = None
+        self._cache_loaded = False
+
+    @classmethod
+    def from_buffer(cls, stats_file: Union[Path, str], buffer: bytes, **kwargs) -> "FreesurferStats":
+        """
+        Create a parser over a stats file's content that was already read (e.g. asynchronously).
+
+        The file is not read again (nor does it need to exist): it is tokenized from *buffer*,
+        and not checked for modifications.
+
+        Parameters
+        ----------
+        stats_file : Union[Path, str]
+            Path to the Freesurfer .stats file.
+        buffer : bytes
+            The file's content.
+        **kwargs
+            Passed to the class (e.g. float_dtype).
+
+        Returns
+        -------
+        FreesurferStats
+            The parser.
+        """
+        stats = cls.__new__(cls)
+        stats._initialize(Path(stats_file), check_mtime=False, **kwargs)
+        stats._cache["tokens"] = parse_stats_buffer(buffer) if buffer else parse_stats_lines(())
+        return stats
+
+    def reload(self) -> None:
+        """
+        Drop every cached result, so that the stats file is re-read on next access.
+        """
+        self._cache.clear()
+        self._signature = None
+        self._cache_loaded = False
+
+    def _get_signature(self) -> Tuple[int, int]:
+        """
+        Get the (size, modification time) signature of the stats file.
+
+        Returns
+        -------
+        Tuple[int, int]
+            The file's size (in bytes) and modification time (in nanoseconds).
+        """
+        stat = self.path.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    @property
+    def is_stale(self) -> bool:
+        """
+        Whether the stats file changed since it was last read.
+
+        Returns
+        -------
+        bool
+            True if the cached results no longer match the file on disk.
+        """
+        return self._signature is not None and self._signature != self._get_signature()
+
+    def _cached(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Memoize *func*'s result on the instance under *key*.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+        func : Callable[[], Any]
+            Function computing the value on a cache miss.
+
+        Returns
+        -------
+        Any
+            The cached value.
+        """
+        if self.check_mtime and self.is_stale:
+            self.reload()
+        if key not in self._cache:
+            # Unchecked (e.g. buffer-fed) parsers never stat the file
+            if self.check_mtime and self._signature is None:
+                self._signature = self._get_signature()
+            if self.cache is not None and self.parse_dates and not self._cache_loaded and key in self.cache.KEYS:
+                self._load_cache()
+            if key not in self._cache:
+                self._cache[key] = func()
+        return self._cache[key]
+
+    def _load_cache(self) -> None:
+        """
+        Load the parsed results from the on-disk cache, parsing and storing them on a miss.
+        """
+        self._cache_loaded = True
+        # Results depend on the parser and its float dtype, not only on the file
+        variant = f"{type(self).__qualname__}:{self.float_dtype}"
+        results = self.cache.get(self.path, variant)
+        if results is None:
+            results = {key: getattr(self, key) for key in self.cache.KEYS}
+            self.cache.set(self.path, results, variant)
+        self._cache.update(results)
 
     def get_structural_measurements(self) -> pd.DataFrame:
         """
@@ -35,14 +209,209 @@ class FreesurferStats:
         pd.DataFrame
             Measurements from the stats file.
         """
-        return pd.read_csv(
-            self.path,
-            header=None,
-            names=self.table_columns[self.INDEX_COLUMN].replace(self.COLUMNS_CONVERTER),
-            delim_whitespace=True,
-            comment="#",
+        import pandas as pd
+
+        dtypes = self.get_dtypes()
+        data = self.tokens.data
+        with stage("read_csv"):
+            return pd.read_csv(
+                io.BytesIO(data) if isinstance(data, bytes) else io.StringIO(data),
+                header=None,
+                names=list(dtypes),
+                dtype=dtypes,
+                sep=r"\s+",
+                engine="c",
+            )
+
+    def get_dtypes(self, schema: Optional[TableSchema] = None) -> Dict[str, str]:
+        """
+        Get the measurements' data types, derived from the table columns' units and casted types.
+
+        Parameters
+        ----------
+        schema : TableSchema, optional
+            The table's schema, by default the stats file's schema.
+
+        Returns
+        -------
+        Dict[str, str]
+            Data type per (converted) column name.
+        """
+        dtypes = {}
+        for column in (schema or self.schema).columns:
+            name = self.COLUMNS_CONVERTER.get(column.name, column.name)
+            if name in self.CATEGORICAL_COLUMNS:
+                dtype = "category"
+            elif name in self.INTEGER_COLUMNS:
+                dtype = "int32"
+            elif column.casted_type in self.CASTED_TYPES:
+                dtype = self.CASTED_TYPES[column.casted_type]
+            elif UNITS_CONVERTER.get(column.units, float) is str:
+                dtype = "str"
+            else:
+                dtype = "float"
+            dtypes[name] = self.float_dtype if dtype == "float" else dtype
+        return dtypes
+
+    def parse_whole_brain_measurements(self) -> pd.DataFrame:
+        """
+        Parse whole brain measurements from Freesurfer's .stats file.
+
+        Returns
+        -------
+        pd.DataFrame
+            Whole brain measurements.
+        """
+        import numpy as np
+        import pandas as pd
+
+        indices, descriptions, units, values = [], [], [], []
+        for measure in map(parse_measure, self._get_wholebrain_measures()):
+            indices.append(measure.index)
+            descriptions.append(measure.description)
+            units.append(measure.unit)
+            values.append(measure.value)
+        index, description, unit, value = self.WHOLE_BRAIN_COLUMNS
+        return pd.DataFrame(
+            {
+                index: pd.Categorical(indices),
+                description: pd.Categorical(descriptions),
+                unit: pd.Categorical(units),
+                value: np.array(values, dtype=np.float64),
+            }
         )
 
+    def iter_rows(self) -> Iterator[tuple]:
+        """
+        Iterate over the measurements' rows, straight from the stats file.
+
+        Rows are read one at a time (without caching), so memory use does not
+        depend on the file's size.
+
+        Yields
+        ------
+        tuple
+            A named tuple per row, with a typed field per (converted) table column.
+        """
+        record_type = casters = None
+        table_columns = []
+        for line in self._iter_lines():
+            if line.startswith(COMMENT_PREFIX):
+                line = read_comment_line(line)
+                if line.startswith(self.COLUMNS_IDENTIFIER):
+                    table_columns.append(line)
+                continue
+            if not line.strip():
+                continue
+            if record_type is None:
+                dtypes = self.get_dtypes(self._parse_schema(table_columns))
+                record_type = get_record_type(tuple(dtypes))
+                casters = tuple(self.PYTHON_TYPES.get(dtype, float) for dtype in dtypes.values())
+            yield parse_row(line, record_type, casters)
+
+    def iter_measures(self) -> Iterator[Measure]:
+        """
+        Iterate over the whole brain measurements, straight from the stats file.
+
+        Reading stops at the first data row.
+
+        Yields
+        ------
+        Measure
+            A named tuple per "Measure" line.
+        """
+        for line in self._iter_lines():
+            if not line.startswith(COMMENT_PREFIX):
+                if line.strip():
+                    return
+                continue
+            line = read_comment_line(line)
+            if line.startswith(MEASURES_IDENTIFIER):
+                yield parse_measure(line[len(MEASURES_IDENTIFIER) :])
+
+    def get_metadata(self) -> str:
+        """
+        Get the stats file's headers and whole brain measurements, encoded as JSON.
+
+        Returns
+        -------
+        str
+            The JSON-encoded metadata (dates are kept typed).
+        """
+        return encode_metadata(self.headers, self.whole_brain_measurements)
+
+    def export(self, path: Union[Path, str], format: str = "csv") -> Path:
+        """
+        Write the structural measurements, with the headers and whole brain measurements
+        embedded as metadata (except for CSV).
+
+        Parameters
+        ----------
+        path : Union[Path, str]
+            Path to the output file.
+        format : str, optional
+            One of "csv", "parquet", "feather" or "hdf5", by default "csv"
+
+        Returns
+        -------
+        Path
+            Path to the written file.
+        """
+        metadata = None if format == "csv" else self.get_metadata()
+        return write_table(self.structural_measurements, path, format=format, metadata=metadata)
+
+    def to_parquet(self, path: Union[Path, str]) -> Path:
+        """
+        Write the stats file as Parquet (requires pyarrow).
+        """
+        return self.export(path, format="parquet")
+
+    def to_feather(self, path: Union[Path, str]) -> Path:
+        """
+        Write the stats file as Feather (requires pyarrow).
+        """
+        return self.export(path, format="feather")
+
+    def to_hdf(self, path: Union[Path, str]) -> Path:
+        """
+        Write the stats file as HDF5 (requires PyTables).
+        """
+        return self.export(path, format="hdf5")
+
+    @classmethod
+    def detect(cls, header: SniffedHeader) -> bool:
+        """
+        Whether this class parses the sniffed stats file (see freesurfer_statistics.registry).
+
+        Parameters
+        ----------
+        header : SniffedHeader
+            The beginning of a stats file.
+
+        Returns
+        -------
+        bool
+            True if this class can parse the file.
+        """
+        return False
+
+    def _parse_schema(self, table_columns: Iterable[str]) -> TableSchema:
+        """
+        Parse the table's schema, falling back to DEFAULT_TABLE_COLUMNS for files without "TableCol" lines.
+
+        Parameters
+        ----------
+        table_columns : Iterable[str]
+            The "TableCol" lines.
+
+        Returns
+        -------
+        TableSchema
+            The table's schema.
+        """
+        with stage("table_columns"):
+            return parse_table_columns(tuple(table_columns) or self.DEFAULT_TABLE_COLUMNS)
+
     def query_hemisphere(self):
         """
         Query the hemisphere of the stats file.
@@ -67,11 +436,14 @@ class FreesurferStats:
         list
             A list of the table columns from the stats file.
         """
-        table_columns = pd.DataFrame(columns=self.COLUMNS_PROPERTIES)
-        for line in self._get_table_columns():
-            _, i, col, value = [i.strip() for i in line.split(maxsplit=3)]
-            table_columns.loc[int(i), col] = value
-        return table_columns
+        import pandas as pd
+
+        columns = self.schema.columns
+        return pd.DataFrame(
+            [column[1:] for column in columns],
+            columns=self.COLUMNS_PROPERTIES,
+            index=[column.index for column in columns],
+        )
 
     def _read_headers(self, special_headers: dict = None) -> dict:
         """
@@ -91,22 +463,40 @@ class FreesurferStats:
         """
         special_headers = special_headers or self.SPECIAL_HEADERS
         headers = {}
-        for line in self._get_headers():
-            header, value = line.split(" ", maxsplit=1)
-            key = header
-            value = value.strip()
-            if header in special_headers:
-                parser = special_headers[header]
-                func = parser.get("func")
-                key = parser.get("key")
-                if isinstance(func, Callable):
-                    kwargs = parser.get("kwargs", {})
-                    value = func(value, **kwargs)
-                elif isinstance(func, str):
-                    value = func
-            headers[key or header] = value
+        lines = self._get_headers()
+        with stage("headers"):
+            for line in lines:
+                header, value = line.split(" ", maxsplit=1)
+                key = header
+                value = value.strip()
+                if header in special_headers:
+                    parser = special_headers[header]
+                    func = parser.get("func")
+                    key = parser.get("key")
+                    if isinstance(func, Callable) and (self.parse_dates or func is not parse_date):
+                        kwargs = parser.get("kwargs", {})
+                        value = func(value, **kwargs)
+                    elif isinstance(func, str):
+                        value = func
+                headers[key or header] = value
         return headers
 
+    @classmethod
+    def get_date_formats(cls) -> Dict[str, str]:
+        """
+        Get the formats of the headers parsed as dates (see parse_dates).
+
+        Returns
+        -------
+        Dict[str, str]
+            The strptime format per header key.
+        """
+        return {
+            parser.get("key") or header: parser["kwargs"]["format"]
+            for header, parser in getattr(cls, "SPECIAL_HEADERS", {}).items()
+            if parser.get("func") is parse_date
+        }
+
     def _get_table_columns(self) -> list:
         """
         Read stats file's table columns
@@ -116,12 +506,18 @@ class FreesurferStats:
         list
             A list of the table columns from the stats file.
         """
-        columns = []
-        for line in self.lines:
-            line = self._read_header_line(line)
-            if line.startswith(self.COLUMNS_IDENTIFIER):
-                columns.append(line)
-        return columns
+        return list(self._get_header_tokens().table_columns)
+
+    def _get_wholebrain_measures(self) -> list:
+        """
+        Read stats file's measures
+
+        Returns
+        -------
+        list
+            A list of the measures from the stats file.
+        """
+        return list(self._get_header_tokens().measures)
 
     def _get_headers(self) -> list:
         """
@@ -133,12 +529,10 @@ class FreesurferStats:
             A list of the headers from the stats file.
         """
         headers = []
-        for line in self.lines:
-            line = self._read_header_line(line)
+        for line in self._get_header_tokens().comments:
             if line.startswith(self.HEADERS_END):
                 break
-            if line:
-                headers.append(line)
+            headers.append(line)
         return headers
 
     @staticmethod
@@ -156,8 +550,85 @@ class FreesurferStats:
         str
             The header line.
         """
-        # assert line.startswith("# ")
-        return line[2:].rstrip()
+        return read_comment_line(line)
+
+    def _iter_lines(self) -> Iterator[str]:
+        """
+        Iterate over the stats file's lines, one at a time.
+
+        Yields
+        ------
+        str
+            The lines of the stats file.
+        """
+        with self.path.open("r") as stream:
+            yield from stream
+
+    def _read_tokens(self) -> ParsedStats:
+        """
+        Tokenize the stats file with the instance's I/O backend.
+
+        The "mmap" backend maps the file once, decodes only its header and
+        slices the data block out of the mapping as bytes. Reading and
+        tokenizing happen in a single pass, profiled as the "io" stage.
+
+        Returns
+        -------
+        ParsedStats
+            The stats file's tokens.
+        """
+        # Only stat the file when its size is needed (an extra metadata call on network filesystems)
+        profile = active_profile()
+        size = self.path.stat().st_size if profile is not None or self.io_backend == "mmap" else None
+        if profile is not None:
+            profile.add_file(size)
+        with stage("io"):
+            if self.io_backend == "mmap" and size:
+                with map_file(self.path) as mapping:
+                    return parse_stats_buffer(mapping)
+            return parse_stats_lines(self._iter_lines())
+
+    def _read_header_tokens(self) -> ParsedStats:
+        """
+        Tokenize the stats file up to its first data row (reusing the whole file's tokens if already read).
+
+        Returns
+        -------
+        ParsedStats
+            The header's tokens (without data rows).
+        """
+        if "tokens" in self._cache:
+            return self._cache["tokens"]
+        with stage("io"):
+            return parse_stats_lines(self._iter_lines(), header_only=True)
+
+    def _get_header_tokens(self) -> ParsedStats:
+        """
+        Get the header's tokens, from a header scan if one was made (see scan_headers).
+
+        Returns
+        -------
+        ParsedStats
+            Tokens holding (at least) the comments, table columns and measures.
+        """
+        if "header_tokens" in self._cache:
+            return self._cache["header_tokens"]
+        return self.tokens
+
+    def scan_headers(self) -> ParsedStats:
+        """
+        Read the stats file's header only, stopping at the first data row.
+
+        Headers, table columns and whole brain measurements accessed afterwards
+        are taken from the scan, so the data table is only read if the
+        structural measurements are requested.
+
+        Returns
+        -------
+        ParsedStats
+            The header's tokens.
+        """
+        return self._cached("header_tokens", self._read_header_tokens)
 
     def _read_lines(self) -> list:
         """
@@ -168,10 +639,7 @@ class FreesurferStats:
         list
             A list of the lines from the stats file.
         """
-        stream = self.path.open("r")
-        lines = stream.readlines()
-        stream.close()
-        return lines
+        return list(self._iter_lines())
 
     @property
     def lines(self) -> list:
@@ -183,7 +651,31 @@ class FreesurferStats:
         list
             The lines contained in the stats file.
         """
-        return self._read_lines()
+        return self._cached("lines", self._read_lines)
+
+    @property
+    def tokens(self) -> ParsedStats:
+        """
+        Get the stats file's tokens (headers, table columns, measures and data rows).
+
+        Returns
+        -------
+        ParsedStats
+            The stats file's tokens.
+        """
+        return self._cached("tokens", self._read_tokens)
+
+    @property
+    def schema(self) -> TableSchema:
+        """
+        Get the table's schema (shared between files with identical table columns).
+
+        Returns
+        -------
+        TableSchema
+            The table columns' names, field names, units and casted types.
+        """
+        return self._cached("schema", lambda: self._parse_schema(self._get_header_tokens().table_columns))
 
     @property
     def hemisphere(self) -> str:
@@ -207,7 +699,7 @@ class FreesurferStats:
         dict
             The headers from the stats file.
         """
-        return self._read_headers()
+        return self._cached("headers", self._read_headers)
 
     @property
     def table_columns(self) -> pd.DataFrame:
@@ -219,7 +711,7 @@ class FreesurferStats:
         pd.DataFrame
             The table columns from the stats file.
         """
-        return self._read_table_columns()
+        return self._cached("table_columns", self._read_table_columns)
 
     @property
     def structural_measurements(self) -> pd.DataFrame:
@@ -231,4 +723,16 @@ class FreesurferStats:
         pd.DataFrame
             Measurements from the stats file.
         """
-        return self.get_structural_measurements()
+        return self._cached("structural_measurements", self.get_structural_measurements)
+
+    @property
+    def whole_brain_measurements(self) -> pd.DataFrame:
+        """
+        Get whole brain measurements.
+
+        Returns
+        -------
+        pd.DataFrame
+            Whole brain measurements.
+        """
+        return self._cached("whole_brain_measurements", self.parse_whole_brain_measurements)
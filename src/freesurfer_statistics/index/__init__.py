@@ -0,0 +1 @@
+from freesurfer_statistics.index.index import MetadataIndex  # noqa: F401
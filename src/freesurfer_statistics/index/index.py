@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from freesurfer_statistics.cohort.cohort import DEFAULT_ATLASES, find_stats_files, get_atlas, get_subject
+from freesurfer_statistics.export import encode_headers
+from freesurfer_statistics.parsing import parse_measure
+from freesurfer_statistics.registry import get_stats_class
+from freesurfer_statistics.utils import parallel_map
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+#: Headers holding a stats file's processing date, by priority
+CREATION_TIME_HEADERS = ("CreationTime", "SegVolFileTimeStamp", "GCATimeStamp", "AnnotationFileTimeStamp")
+VERSION_HEADER = "cvs_version"
+
+#: Indexed columns of every stats file
+FILE_COLUMNS = ("path", "subject", "atlas", "hemisphere", "parser", "size", "mtime_ns", "version", "creation_time", "headers")
+MEASURE_COLUMNS = ("path", "structure", "name", "description", "unit", "value")
+
+
+def _scan_stats_file(stats_file: Path) -> Tuple[Path, Optional[dict], Optional[str]]:
+    """
+    Read a stats file's header (without its data table) into index records.
+
+    Parameters
+    ----------
+    stats_file : Path
+        Path to a Freesurfer .stats file.
+
+    Returns
+    -------
+    Tuple[Path, Optional[dict], Optional[str]]
+        The file, its "file" record (with its "measures" records) and, if scanning failed, the error's description.
+    """
+    try:
+        stats_class = get_stats_class(stats_file)
+        stats = stats_class(stats_file, check_mtime=False)
+        stat = stats_file.stat()
+        tokens = stats.scan_headers()
+        headers = stats.headers
+        creation_time = next((headers[key] for key in CREATION_TIME_HEADERS if isinstance(headers.get(key), datetime)), None)
+        record = {
+            "path": str(stats_file),
+            "subject": get_subject(stats),
+            "atlas": get_atlas(stats_file),
+            "hemisphere": stats.hemisphere,
+            "parser": stats_class.__name__,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "version": headers.get(VERSION_HEADER),
+            "creation_time": creation_time.isoformat() if creation_time else None,
+            "headers": json.dumps(encode_headers(headers)),
+            "measures": [(str(stats_file), *measure) for measure in map(parse_measure, tokens.measures)],
+        }
+        return stats_file, record, None
+    except Exception as e:
+        return stats_file, None, f"{type(e).__name__}: {e}"
+
+
+class MetadataIndex:
+    def __init__(self, index_path: Union[Path, str]) -> None:
+        """
+        A queryable SQLite index of stats files' headers and whole brain measurements.
+
+        Files are indexed from their headers only (see FreesurferStats.scan_headers),
+        and re-scanned only once their size or modification time changes.
+
+        Parameters
+        ----------
+        index_path : Union[Path, str]
+            Path to the index database (created if missing).
+        """
+        self.index_path = Path(index_path)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, subject TEXT, atlas TEXT, hemisphere TEXT, parser TEXT, "
+                "size INTEGER, mtime_ns INTEGER, version TEXT, creation_time TEXT, headers TEXT)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS measures ("
+                "path TEXT REFERENCES files(path) ON DELETE CASCADE, "
+                "structure TEXT, name TEXT, description TEXT, unit TEXT, value REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS measures_path ON measures (path)")
+            connection.execute("CREATE INDEX IF NOT EXISTS files_subject ON files (subject)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Open a connection to the index, committed and closed on exit.
+
+        Yields
+        ------
+        sqlite3.Connection
+            Connection to the index database.
+        """
+        connection = sqlite3.connect(str(self.index_path), timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def _is_current(self, stats_files: List[Path]) -> List[bool]:
+        """
+        Whether every stats file is indexed in its current state.
+        """
+        with self._connect() as connection:
+            indexed = {row["path"]: (row["size"], row["mtime_ns"]) for row in connection.execute("SELECT path, size, mtime_ns FROM files")}
+        current = []
+        for stats_file in stats_files:
+            signature = indexed.get(str(stats_file))
+            if signature is None:
+                current.append(False)
+                continue
+            try:
+                stat = stats_file.stat()
+            except FileNotFoundError:
+                # Deleted since it was indexed
+                current.append(False)
+                continue
+            current.append(signature == (stat.st_size, stat.st_mtime_ns))
+        return current
+
+    def update(self, stats_files: Iterable[Union[Path, str]], n_jobs: int = 1, chunksize: int = 16) -> Dict[Path, str]:
+        """
+        Index new and modified stats files (unchanged files are not read, deleted ones are removed).
+
+        Parameters
+        ----------
+        stats_files : Iterable[Union[Path, str]]
+            Paths to Freesurfer .stats files.
+        n_jobs : int, optional
+            Number of worker processes, by default 1
+        chunksize : int, optional
+            Number of files sent to a worker at once, by default 16
+
+        Returns
+        -------
+        Dict[Path, str]
+            The files that failed to scan, with their errors.
+        """
+        stats_files = [Path(stats_file) for stats_file in stats_files]
+        outdated = [stats_file for stats_file, current in zip(stats_files, self._is_current(stats_files)) if not current]
+        errors = {}
+        with self._connect() as connection:
+            for stats_file, record, error in parallel_map(_scan_stats_file, outdated, n_jobs, chunksize):
+                if error is not None:
+                    errors[stats_file] = error
+                    if not stats_file.exists():
+                        connection.execute("DELETE FROM files WHERE path = ?", (str(stats_file),))
+                    continue
+                measures = record.pop("measures")
+                connection.execute("DELETE FROM files WHERE path = ?", (record["path"],))
+                connection.execute(
+                    f"INSERT INTO files ({', '.join(FILE_COLUMNS)}) VALUES ({', '.join('?' * len(FILE_COLUMNS))})",
+                    [record[column] for column in FILE_COLUMNS],
+                )
+                connection.executemany(
+                    f"INSERT INTO measures ({', '.join(MEASURE_COLUMNS)}) VALUES ({', '.join('?' * len(MEASURE_COLUMNS))})",
+                    measures,
+                )
+        return errors
+
+    def remove(self, stats_files: Iterable[Union[Path, str]]) -> None:
+        """
+        Remove stats files from the index.
+
+        Parameters
+        ----------
+        stats_files : Iterable[Union[Path, str]]
+            Paths to indexed stats files.
+        """
+        with self._connect() as connection:
+            connection.executemany("DELETE FROM files WHERE path = ?", [(str(stats_file),) for stats_file in stats_files])
+
+    def update_subjects_dir(
+        self,
+        subjects_dir: Union[Path, str],
+        atlases: Iterable[str] = DEFAULT_ATLASES,
+        n_jobs: int = 1,
+    ) -> Dict[Path, str]:
+        """
+        Index a $SUBJECTS_DIR's stats files, dropping indexed files of it that no longer exist.
+
+        Parameters
+        ----------
+        subjects_dir : Union[Path, str]
+            Freesurfer's $SUBJECTS_DIR.
+        atlases : Iterable[str], optional
+            Atlases to index, by default DEFAULT_ATLASES
+        n_jobs : int, optional
+            Number of worker processes, by default 1
+
+        Returns
+        -------
+        Dict[Path, str]
+            The files that failed to scan, with their errors.
+        """
+        stats_files = find_stats_files(subjects_dir, atlases)
+        found = {str(stats_file) for stats_file in stats_files}
+        prefix = str(Path(subjects_dir)).rstrip("/") + "/"
+        with self._connect() as connection:
+            rows = connection.execute("SELECT path FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+            indexed = [row["path"] for row in rows]
+        self.remove(path for path in indexed if path not in found)
+        return self.update(stats_files, n_jobs=n_jobs)
+
+    def query(self, sql: str, params: Iterable = ()) -> List[dict]:
+        """
+        Run a SQL query over the index's "files" and "measures" tables.
+
+        Headers are stored as JSON, and can be queried with SQLite's JSON functions,
+        e.g. "SELECT path FROM files WHERE json_extract(headers, '$.hemi') = 'lh'".
+
+        Parameters
+        ----------
+        sql : str
+            The query.
+        params : Iterable, optional
+            The query's parameters, by default ()
+
+        Returns
+        -------
+        List[dict]
+            A dictionary per result row.
+        """
+        with self._connect() as connection:
+            return [dict(row) for row in connection.execute(sql, tuple(params))]
+
+    def find(
+        self,
+        subject: Optional[str] = None,
+        atlas: Optional[str] = None,
+        hemisphere: Optional[str] = None,
+        version: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> List[Path]:
+        """
+        Find indexed stats files by their metadata.
+
+        Parameters
+        ----------
+        subject : str, optional
+            Subject's name.
+        atlas : str, optional
+            Atlas name, e.g. "aparc" or "aseg".
+        hemisphere : str, optional
+            "left", "right" or "subcortex".
+        version : str, optional
+            Freesurfer version prefix, e.g. "7.1".
+        created_after : datetime, optional
+            Only files processed at or after this date.
+        created_before : datetime, optional
+            Only files processed before this date.
+
+        Returns
+        -------
+        List[Path]
+            The matching stats files, sorted by path.
+        """
+        conditions, params = [], []
+        for column, value in [("subject", subject), ("atlas", atlas), ("hemisphere", hemisphere)]:
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if version is not None:
+            conditions.append("(version = ? OR version LIKE ?)")
+            params += [version, f"{version}.%"]
+        if created_after is not None:
+            conditions.append("creation_time >= ?")
+            params.append(created_after.isoformat())
+        if created_before is not None:
+            conditions.append("creation_time < ?")
+            params.append(created_before.isoformat())
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return [Path(row["path"]) for row in self.query(f"SELECT path FROM files{where} ORDER BY path", params)]
+
+    def to_frame(self, measures: bool = False) -> pd.DataFrame:
+        """
+        Get the index's files (or whole brain measurements) as a frame.
+
+        Parameters
+        ----------
+        measures : bool, optional
+            Whether to get the whole brain measurements instead of the files, by default False
+
+        Returns
+        -------
+        pd.DataFrame
+            The "files" (with parsed creation times) or "measures" table.
+        """
+        import pandas as pd
+
+        with self._connect() as connection:
+            if measures:
+                return pd.read_sql_query(f"SELECT {', '.join(MEASURE_COLUMNS)} FROM measures", connection)
+            data = pd.read_sql_query(f"SELECT {', '.join(FILE_COLUMNS)} FROM files ORDER BY path", connection)
+        data["creation_time"] = pd.to_datetime(data["creation_time"])
+        return data
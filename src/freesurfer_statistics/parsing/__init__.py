@@ -0,0 +1,12 @@
+from freesurfer_statistics.parsing.parser import (  # noqa: F401
+    Measure,
+    ParsedStats,
+    get_record_type,
+    parse_measure,
+    parse_row,
+    parse_stats_buffer,
+    parse_stats_lines,
+    read_comment_line,
+)
+from freesurfer_statistics.parsing.schema import TableColumn, TableSchema, parse_table_columns  # noqa: F401
+from freesurfer_statistics.parsing.sniff import SniffedHeader, sniff_stats_buffer, sniff_stats_file  # noqa: F401
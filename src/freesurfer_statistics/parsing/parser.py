@@ -0,0 +1,240 @@
+from collections import namedtuple
+from functools import lru_cache
+from typing import Callable, Iterable, List, NamedTuple, Tuple, Union
+
+#: Line prefixes
+COMMENT_PREFIX = "#"
+COLUMNS_IDENTIFIER = "TableCol"
+MEASURES_IDENTIFIER = "Measure"
+COLUMN_HEADERS_IDENTIFIER = "ColHeaders"
+
+
+class ParsedStats(NamedTuple):
+    """
+    Tokens of a single Freesurfer .stats file, collected in one pass.
+
+    Attributes
+    ----------
+    comments : Tuple[str, ...]
+        Every non-empty commented line (without the leading "# "), in order.
+    table_columns : Tuple[str, ...]
+        The "TableCol" lines.
+    measures : Tuple[str, ...]
+        The "Measure" lines, without the "Measure" identifier.
+    col_headers : Tuple[str, ...]
+        The column names listed in the "ColHeaders" line (if any).
+    data : Union[str, bytes]
+        The (uncommented) data rows, joined by newlines
+        (bytes when sliced out of a memory-mapped file, see parse_stats_buffer).
+    n_rows : int
+        Number of data rows.
+    """
+
+    comments: Tuple[str, ...]
+    table_columns: Tuple[str, ...]
+    measures: Tuple[str, ...]
+    col_headers: Tuple[str, ...]
+    data: Union[str, bytes]
+    n_rows: int
+
+
+class Measure(NamedTuple):
+    """
+    A single "Measure" line (a whole brain measurement).
+    """
+
+    structure: str
+    index: str
+    description: str
+    unit: str
+    value: float
+
+
+def parse_measure(line: str) -> Measure:
+    """
+    Parse a "Measure" line's content, e.g.
+    "Cortex, MeanThickness, Mean Thickness, 2.49215, mm".
+
+    Parameters
+    ----------
+    line : str
+        The line, without the "Measure" identifier.
+
+    Returns
+    -------
+    Measure
+        The parsed measurement.
+    """
+    parts = [part.strip() for part in line.split(",")]
+    return Measure(
+        structure=parts[0],
+        index=parts[1],
+        description=",".join(parts[2:-2]),
+        unit=parts[-1],
+        value=float(parts[-2]),
+    )
+
+
+@lru_cache(maxsize=256)
+def get_record_type(names: Tuple[str, ...]) -> type:
+    """
+    Get the (shared) named tuple type of data rows with the given columns.
+
+    Parameters
+    ----------
+    names : Tuple[str, ...]
+        The table's column names.
+
+    Returns
+    -------
+    type
+        A named tuple type with a field per column.
+    """
+    return namedtuple("StatsRow", names, rename=True)
+
+
+def parse_row(line: str, record_type: type, casters: Tuple[Callable[[str], object], ...]) -> tuple:
+    """
+    Parse a data row into a typed record.
+
+    Parameters
+    ----------
+    line : str
+        The data row.
+    record_type : type
+        Named tuple type of the row (see get_record_type).
+    casters : Tuple[Callable[[str], object], ...]
+        A type conversion function per column.
+
+    Returns
+    -------
+    tuple
+        The typed record.
+
+    Raises
+    ------
+    ValueError
+        If the row does not have a value per column.
+    """
+    values = line.split()
+    if len(values) != len(casters):
+        raise ValueError(f"Expected {len(casters)} values per row, got {len(values)}: {line.strip()!r}")
+    return record_type._make([cast(value) for cast, value in zip(casters, values)])
+
+
+def read_comment_line(line: str) -> str:
+    """
+    Strip the leading "# " and trailing whitespace from a commented line.
+
+    Parameters
+    ----------
+    line : str
+        The line to read.
+
+    Returns
+    -------
+    str
+        The line's content.
+    """
+    return line[2:].rstrip()
+
+
+def parse_stats_lines(lines: Iterable[str], header_only: bool = False) -> ParsedStats:
+    """
+    Tokenize the lines of a Freesurfer .stats file in a single pass.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        The lines of the stats file.
+    header_only : bool, optional
+        Whether to stop at the first data row (leaving the data empty), by default False
+
+    Returns
+    -------
+    ParsedStats
+        The file's tokens.
+    """
+    comments: List[str] = []
+    table_columns: List[str] = []
+    measures: List[str] = []
+    col_headers: Tuple[str, ...] = ()
+    data: List[str] = []
+    for line in lines:
+        if line.startswith(COMMENT_PREFIX):
+            line = read_comment_line(line)
+            if not line:
+                continue
+            comments.append(line)
+            if line.startswith(COLUMNS_IDENTIFIER):
+                table_columns.append(line)
+            elif line.startswith(MEASURES_IDENTIFIER):
+                measures.append(line[len(MEASURES_IDENTIFIER) :].strip())
+            elif line.startswith(COLUMN_HEADERS_IDENTIFIER):
+                col_headers = tuple(line.split()[1:])
+        elif line.strip():
+            if header_only:
+                break
+            data.append(line.rstrip("\n"))
+    return ParsedStats(
+        comments=tuple(comments),
+        table_columns=tuple(table_columns),
+        measures=tuple(measures),
+        col_headers=col_headers,
+        data="\n".join(data),
+        n_rows=len(data),
+    )
+
+
+def find_data_offset(buffer: bytes) -> int:
+    """
+    Find where the data rows of a stats file's buffer start.
+
+    Parameters
+    ----------
+    buffer : bytes
+        The stats file's content (e.g. a memory map).
+
+    Returns
+    -------
+    int
+        Offset of the first data row (the buffer's length if there are none).
+    """
+    comment = COMMENT_PREFIX.encode()
+    offset, size = 0, len(buffer)
+    while offset < size:
+        end = buffer.find(b"\n", offset)
+        end = size if end == -1 else end + 1
+        line = buffer[offset:end]
+        if not line.startswith(comment) and line.strip():
+            return offset
+        offset = end
+    return size
+
+
+def parse_stats_buffer(buffer: bytes) -> ParsedStats:
+    """
+    Tokenize a stats file's content, keeping the data rows as a single bytes slice.
+
+    Only the header is decoded and split into lines; the data block is sliced
+    out of *buffer* as-is, to be handed to the CSV reader without building a
+    string per row.
+
+    Parameters
+    ----------
+    buffer : bytes
+        The stats file's content (any buffer supporting find and slicing, e.g. a memory map).
+
+    Returns
+    -------
+    ParsedStats
+        The file's tokens.
+    """
+    offset = find_data_offset(buffer)
+    header = parse_stats_lines(buffer[:offset].decode().splitlines())
+    data = buffer[offset:]
+    end = len(data)
+    while end and data[end - 1 : end].isspace():
+        end -= 1
+    n_rows = data.count(b"\n", 0, end) + 1 if end else 0
+    return header._replace(data=data, n_rows=n_rows)
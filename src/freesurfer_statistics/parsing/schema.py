@@ -0,0 +1,78 @@
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
+
+#: TableCol properties, as named in the stats files
+COLUMNS_PROPERTIES = ("ColHeader", "FieldName", "Units", "CastedType")
+
+
+class TableColumn(NamedTuple):
+    """
+    A single "TableCol" definition.
+    """
+
+    index: int
+    name: str
+    field_name: Optional[str] = None
+    units: Optional[str] = None
+    casted_type: Optional[str] = None
+
+
+class TableSchema(NamedTuple):
+    """
+    The table columns of a stats file, in order.
+    """
+
+    columns: Tuple[TableColumn, ...]
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(column.name for column in self.columns)
+
+    @property
+    def field_names(self) -> Tuple[Optional[str], ...]:
+        return tuple(column.field_name for column in self.columns)
+
+    @property
+    def units(self) -> Tuple[Optional[str], ...]:
+        return tuple(column.units for column in self.columns)
+
+    @property
+    def casted_types(self) -> Tuple[Optional[str], ...]:
+        return tuple(column.casted_type for column in self.columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+
+@lru_cache(maxsize=256)
+def parse_table_columns(lines: Tuple[str, ...]) -> TableSchema:
+    """
+    Parse a stats file's "TableCol" lines into a schema.
+
+    Schemas are interned: files sharing the same "TableCol" block (i.e. every
+    file of the same atlas) share the same TableSchema instance, which is only
+    parsed once.
+
+    Parameters
+    ----------
+    lines : Tuple[str, ...]
+        The "TableCol" lines (without the leading "# ").
+
+    Returns
+    -------
+    TableSchema
+        The table's schema.
+    """
+    properties: Dict[int, Dict[str, str]] = {}
+    for line in lines:
+        parts = line.split(maxsplit=3)
+        i, col = int(parts[1]), parts[2]
+        properties.setdefault(i, {})[col] = parts[3].strip() if len(parts) > 3 else ""
+    columns = tuple(
+        TableColumn(
+            i,
+            *[properties[i].get(col) for col in COLUMNS_PROPERTIES],
+        )
+        for i in sorted(properties)
+    )
+    return TableSchema(columns)
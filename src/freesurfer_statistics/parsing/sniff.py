@@ -0,0 +1,100 @@
+from pathlib import Path
+from typing import Dict, NamedTuple, Tuple, Union
+
+from freesurfer_statistics.parsing.parser import (
+    COLUMN_HEADERS_IDENTIFIER,
+    COLUMNS_IDENTIFIER,
+    COMMENT_PREFIX,
+    read_comment_line,
+)
+
+#: Number of bytes read to detect a file's type
+SNIFF_SIZE = 16384
+
+
+class SniffedHeader(NamedTuple):
+    """
+    What can be cheaply learned from the beginning of a stats file.
+
+    Attributes
+    ----------
+    name : str
+        The file's name.
+    headers : Dict[str, str]
+        Raw "key value" headers (first occurrence of every key).
+    columns : Tuple[str, ...]
+        Table column names ("TableCol ... ColHeader" or "ColHeaders").
+    """
+
+    name: str
+    headers: Dict[str, str]
+    columns: Tuple[str, ...]
+
+    @property
+    def text(self) -> str:
+        """
+        The file's name and header values, for substring matching.
+        """
+        return " ".join([self.name, *self.headers.values()])
+
+
+def sniff_stats_buffer(name: str, chunk: bytes, truncated: bool = False) -> SniffedHeader:
+    """
+    Read the beginning of a stats file's header from its content.
+
+    Parameters
+    ----------
+    name : str
+        The file's name.
+    chunk : bytes
+        The beginning of the file's content.
+    truncated : bool, optional
+        Whether *chunk* stops before the end of the file (its last line is then ignored), by default False
+
+    Returns
+    -------
+    SniffedHeader
+        The file's name, raw headers and table column names.
+    """
+    lines = chunk.decode(errors="replace").splitlines()
+    if truncated:
+        lines = lines[:-1]
+    headers = {}
+    columns = []
+    for line in lines:
+        if not line.startswith(COMMENT_PREFIX):
+            if line.strip():
+                break
+            continue
+        key, _, value = read_comment_line(line).partition(" ")
+        value = value.strip()
+        headers.setdefault(key, value)
+        if key == COLUMNS_IDENTIFIER:
+            parts = value.split()
+            if len(parts) > 2 and parts[1] == "ColHeader":
+                columns.append(parts[2])
+        elif key == COLUMN_HEADERS_IDENTIFIER:
+            columns = value.split()
+    return SniffedHeader(name=name, headers=headers, columns=tuple(columns))
+
+
+def sniff_stats_file(stats_file: Union[Path, str], size: int = SNIFF_SIZE) -> SniffedHeader:
+    """
+    Read the beginning of a stats file's header (without reading the whole file).
+
+    Parameters
+    ----------
+    stats_file : Union[Path, str]
+        Path to a Freesurfer stats file.
+    size : int, optional
+        Maximal number of bytes to read, by default SNIFF_SIZE
+
+    Returns
+    -------
+    SniffedHeader
+        The file's name, raw headers and table column names.
+    """
+    path = Path(stats_file)
+    with path.open("rb") as stream:
+        chunk = stream.read(size)
+    return sniff_stats_buffer(path.name, chunk, truncated=len(chunk) == size)
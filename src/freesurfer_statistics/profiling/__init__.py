@@ -0,0 +1,8 @@
+from freesurfer_statistics.profiling.profiling import (  # noqa: F401
+    PROFILE_ENV_VAR,
+    Profile,
+    active_profile,
+    profile,
+    run_profiled,
+    stage,
+)
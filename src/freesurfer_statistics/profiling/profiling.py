@@ -0,0 +1,226 @@
+import atexit
+import json
+import multiprocessing
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+
+#: Environment variable enabling profiling for the whole process:
+#: "1" reports a summary to stderr at exit, any other (non-"0") value is a path to write the JSON report to
+PROFILE_ENV_VAR = "FREESURFER_STATS_PROFILE"
+PROFILE_ENV_FLAGS = ("1", "true", "yes")
+
+
+class Profile:
+    """
+    Timings of the parsing stages, with the number of files and bytes read.
+
+    Stages may nest (e.g. "headers" includes "parse_date"), so their times
+    do not add up to the total run time.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.n_files = 0
+        self.bytes_read = 0
+
+    def add(self, name: str, seconds: float, calls: int = 1) -> None:
+        """
+        Record *calls* runs of a stage, which took *seconds* in total.
+        """
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + calls
+
+    def add_file(self, nbytes: int) -> None:
+        """
+        Record a file read.
+        """
+        self.n_files += 1
+        self.bytes_read += nbytes
+
+    def merge(self, other: "Profile") -> "Profile":
+        """
+        Add another profile's records (e.g. a worker process') to this one.
+
+        Parameters
+        ----------
+        other : Profile
+            The profile to merge.
+
+        Returns
+        -------
+        Profile
+            This profile.
+        """
+        for name, seconds in other.seconds.items():
+            self.add(name, seconds, other.calls[name])
+        self.n_files += other.n_files
+        self.bytes_read += other.bytes_read
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        Get the profile as a JSON-compatible dictionary.
+
+        Returns
+        -------
+        dict
+            Files and bytes read, and the calls and total seconds of every stage.
+        """
+        return {
+            "n_files": self.n_files,
+            "bytes_read": self.bytes_read,
+            "stages": {name: {"calls": self.calls[name], "seconds": self.seconds[name]} for name in self.seconds},
+        }
+
+    def to_json(self, path: Optional[Union[Path, str]] = None) -> str:
+        """
+        Encode the profile as JSON, optionally writing it to *path*.
+
+        Parameters
+        ----------
+        path : Union[Path, str], optional
+            Path to the output .json file, by default None
+
+        Returns
+        -------
+        str
+            The JSON-encoded profile.
+        """
+        encoded = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            Path(path).write_text(encoded)
+        return encoded
+
+    def summary(self) -> str:
+        """
+        Get a human-readable summary of the profile.
+
+        Returns
+        -------
+        str
+            A line per stage, slowest first.
+        """
+        lines = [f"{self.n_files} files, {self.bytes_read / 2**20:.1f} MiB read"]
+        for name in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            seconds, calls = self.seconds[name], self.calls[name]
+            lines.append(f"  {name:<15} {seconds:10.4f} s {calls:8d} calls {1e6 * seconds / calls:10.1f} us/call")
+        return "\n".join(lines)
+
+
+class _Stage:
+    """
+    Context manager timing a stage into a profile.
+    """
+
+    __slots__ = ("profile", "name", "start")
+
+    def __init__(self, profile: Profile, name: str) -> None:
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.profile.add(self.name, time.perf_counter() - self.start)
+
+
+#: The profile stages are recorded into (None when profiling is disabled)
+_active: Optional[Profile] = None
+_NULL_STAGE = nullcontext()
+
+
+def active_profile() -> Optional[Profile]:
+    """
+    Get the profile stages are currently recorded into.
+
+    Returns
+    -------
+    Optional[Profile]
+        The active profile, or None if profiling is disabled.
+    """
+    return _active
+
+
+def stage(name: str):
+    """
+    Time a parsing stage into the active profile (a no-op when profiling is disabled).
+
+    Parameters
+    ----------
+    name : str
+        The stage's name, e.g. "io", "headers", "parse_date", "table_columns" or "read_csv".
+
+    Returns
+    -------
+    ContextManager
+        A context manager timing its block.
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return _Stage(_active, name)
+
+
+@contextmanager
+def profile() -> Iterator[Profile]:
+    """
+    Profile the parsing stages run in the block, including those run on
+    worker processes by freesurfer_statistics.utils.parallel_map.
+
+    The enclosing profile (if any) is restored on exit, without the block's records.
+
+    Yields
+    ------
+    Profile
+        The block's profile.
+    """
+    global _active
+    previous, _active = _active, Profile()
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+def run_profiled(func: Callable[..., Any], *args, **kwargs) -> Tuple[Any, Profile]:
+    """
+    Call *func* in its own profile (e.g. on a worker process).
+
+    Parameters
+    ----------
+    func : Callable[..., Any]
+        The function to call.
+
+    Returns
+    -------
+    Tuple[Any, Profile]
+        The function's result and its profile.
+    """
+    with profile() as result_profile:
+        result = func(*args, **kwargs)
+    return result, result_profile
+
+
+def _report(destination: str) -> None:
+    """
+    Report the process-wide profile (see PROFILE_ENV_VAR) at exit, in the main process only.
+    """
+    # Spawned workers import this module again (before knowing their parent), but send
+    # their profiles back to the main process rather than reporting them
+    if multiprocessing.parent_process() is not None:
+        return
+    if destination.lower() in PROFILE_ENV_FLAGS:
+        print(_active.summary(), file=sys.stderr)
+    else:
+        _active.to_json(destination)
+
+
+_destination = os.environ.get(PROFILE_ENV_VAR, "")
+if _destination and _destination != "0":
+    _active = Profile()
+    atexit.register(_report, _destination)
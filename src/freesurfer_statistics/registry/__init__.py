@@ -0,0 +1,8 @@
+from freesurfer_statistics.registry.registry import (  # noqa: F401
+    STATS_CLASSES,
+    detect_stats_class,
+    get_stats_class,
+    open_stats,
+    open_stats_buffer,
+    register_stats_class,
+)
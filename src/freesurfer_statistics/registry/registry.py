@@ -0,0 +1,129 @@
+from pathlib import Path
+from typing import List, Union
+
+from freesurfer_statistics.cortical_stats import BAExvivoStats, CorticalStats
+from freesurfer_statistics.freesurfer_stats import FreesurferStats
+from freesurfer_statistics.parsing import SniffedHeader, sniff_stats_buffer, sniff_stats_file
+from freesurfer_statistics.parsing.sniff import SNIFF_SIZE
+from freesurfer_statistics.subcortical_stats import SubCorticalStats, WMParcStats
+from freesurfer_statistics.subfield_stats import SubfieldStats
+
+#: Parser classes, by detection priority (more specific classes first)
+STATS_CLASSES: List[type] = [
+    SubfieldStats,
+    BAExvivoStats,
+    CorticalStats,
+    WMParcStats,
+    SubCorticalStats,
+]
+
+
+def register_stats_class(stats_class: type, first: bool = True) -> type:
+    """
+    Register a parser class (a FreesurferStats subclass implementing *detect*).
+
+    Can be used as a class decorator.
+
+    Parameters
+    ----------
+    stats_class : type
+        The parser class.
+    first : bool, optional
+        Whether to try it before the already registered classes, by default True
+
+    Returns
+    -------
+    type
+        The parser class.
+    """
+    if not issubclass(stats_class, FreesurferStats):
+        raise TypeError(f"{stats_class.__name__} is not a FreesurferStats subclass")
+    if stats_class in STATS_CLASSES:
+        STATS_CLASSES.remove(stats_class)
+    STATS_CLASSES.insert(0 if first else len(STATS_CLASSES), stats_class)
+    return stats_class
+
+
+def detect_stats_class(header: SniffedHeader) -> type:
+    """
+    Find the parser class of a sniffed stats file.
+
+    Parameters
+    ----------
+    header : SniffedHeader
+        The beginning of a stats file.
+
+    Returns
+    -------
+    type
+        The first registered class that detects the file.
+
+    Raises
+    ------
+    ValueError
+        If no registered class detects the file.
+    """
+    for stats_class in STATS_CLASSES:
+        if stats_class.detect(header):
+            return stats_class
+    raise ValueError(f"Could not detect the type of {header.name}")
+
+
+def get_stats_class(stats_file: Union[Path, str], size: int = SNIFF_SIZE) -> type:
+    """
+    Find the parser class of a stats file by sniffing its first *size* bytes.
+
+    Parameters
+    ----------
+    stats_file : Union[Path, str]
+        Path to a Freesurfer stats file.
+    size : int, optional
+        Maximal number of bytes to read, by default SNIFF_SIZE
+
+    Returns
+    -------
+    type
+        The file's parser class.
+    """
+    return detect_stats_class(sniff_stats_file(stats_file, size=size))
+
+
+def open_stats(stats_file: Union[Path, str], **kwargs) -> FreesurferStats:
+    """
+    Open a Freesurfer stats file with the parser class matching its type.
+
+    Parameters
+    ----------
+    stats_file : Union[Path, str]
+        Path to a Freesurfer stats file.
+    **kwargs
+        Passed to the parser class (e.g. check_mtime, float_dtype, cache).
+
+    Returns
+    -------
+    FreesurferStats
+        The opened stats file.
+    """
+    return get_stats_class(stats_file)(stats_file, **kwargs)
+
+
+def open_stats_buffer(stats_file: Union[Path, str], buffer: bytes, **kwargs) -> FreesurferStats:
+    """
+    Open a stats file whose content was already read, with the parser class matching its type.
+
+    Parameters
+    ----------
+    stats_file : Union[Path, str]
+        Path to the Freesurfer stats file.
+    buffer : bytes
+        The file's content.
+    **kwargs
+        Passed to the parser class (e.g. float_dtype).
+
+    Returns
+    -------
+    FreesurferStats
+        The opened stats file (see FreesurferStats.from_buffer).
+    """
+    header = sniff_stats_buffer(Path(stats_file).name, buffer[:SNIFF_SIZE], truncated=len(buffer) > SNIFF_SIZE)
+    return detect_stats_class(header).from_buffer(stats_file, buffer, **kwargs)
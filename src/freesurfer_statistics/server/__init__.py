@@ -0,0 +1,26 @@
+import importlib
+
+#: Public names, imported from their modules on first access (PEP 562),
+#: so that the CLI does not load the HTTP server until "serve" runs
+_LAZY_ATTRIBUTES = {
+    "FILTERS": "freesurfer_statistics.server.server",
+    "FORMATS": "freesurfer_statistics.server.server",
+    "CohortStore": "freesurfer_statistics.server.server",
+    "encode_table": "freesurfer_statistics.server.server",
+    "StatsRequestHandler": "freesurfer_statistics.server.handler",
+    "make_server": "freesurfer_statistics.server.handler",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
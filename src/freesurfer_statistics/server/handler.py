@@ -0,0 +1,107 @@
+import json
+import os
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+from freesurfer_statistics.server.server import DEFAULT_HOST, DEFAULT_PORT, FORMATS, CohortStore
+
+
+class StatsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answer GET requests with a CohortStore (the server's *store*).
+
+    - /query?subject=...&atlas=...&hemisphere=...&region=...&measure=...&format=json|arrow
+      returns the matching measurements; filters may be repeated or comma-separated.
+    - /status returns the store's state (see CohortStore.status).
+    """
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params = {key: [value for values in values for value in values.split(",")] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == "/status":
+                self._respond(200, json.dumps(self.server.store.status()).encode(), FORMATS["json"])
+            elif url.path == "/query":
+                format = params.pop("format", ["json"])[-1]
+                self._respond(200, self.server.store.query_encoded(format, **params), FORMATS[format])
+            else:
+                self._error(404, f"Unknown path {url.path!r}, expected /query or /status")
+        except (ValueError, ImportError) as e:
+            self._error(400, str(e))
+
+    def _respond(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str) -> None:
+        self._respond(status, json.dumps({"error": message}).encode(), FORMATS["json"])
+
+    def address_string(self) -> str:
+        # Unix sockets have no client address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        if not getattr(self.server, "quiet", False):
+            super().log_message(format, *args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    An HTTP server listening on a Unix socket.
+    """
+
+    daemon_threads = True
+
+    def server_bind(self) -> None:
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+        self.server_name, self.server_port = "localhost", 0
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def make_server(
+    store: CohortStore,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[Union[Path, str]] = None,
+    quiet: bool = False,
+) -> socketserver.BaseServer:
+    """
+    Create an HTTP server answering queries from *store* (see StatsRequestHandler).
+
+    Parameters
+    ----------
+    store : CohortStore
+        The loaded cohort.
+    host : str, optional
+        Address to listen on, by default DEFAULT_HOST (local connections only)
+    port : int, optional
+        Port to listen on (0 picks a free one), by default DEFAULT_PORT
+    socket_path : Union[Path, str], optional
+        Path of a Unix socket to listen on instead of *host* and *port*, by default None
+    quiet : bool, optional
+        Whether to skip logging every request, by default False
+
+    Returns
+    -------
+    socketserver.BaseServer
+        The server (call serve_forever to start answering).
+    """
+    if socket_path is not None:
+        server = UnixHTTPServer(str(socket_path), StatsRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), StatsRequestHandler)
+    server.store = store
+    server.quiet = quiet
+    return server
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from freesurfer_statistics.cohort.cohort import DEFAULT_ATLASES, TIDY_COLUMNS, StatsCollection, find_stats_files
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from freesurfer_statistics.cohort.incremental import CohortChanges
+
+#: Columns queries can filter on
+FILTERS = tuple(TIDY_COLUMNS[:-1])
+
+#: Response formats, and their content types
+FORMATS = {"json": "application/json", "arrow": "application/vnd.apache.arrow.stream"}
+
+#: Number of query results (and encoded responses) kept in memory
+QUERY_CACHE_SIZE = 256
+
+#: Default address of the server
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+Filters = Dict[str, Tuple[str, ...]]
+
+logger = logging.getLogger(__name__)
+
+
+def encode_table(data: pd.DataFrame, format: str = "json") -> bytes:
+    """
+    Encode a table as a response body.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The table to encode.
+    format : str, optional
+        "json" (a list of records) or "arrow" (an Arrow IPC stream, requires pyarrow), by default "json"
+
+    Returns
+    -------
+    bytes
+        The encoded table.
+    """
+    if format == "json":
+        return data.to_json(orient="records").encode()
+    if format == "arrow":
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    raise ValueError(f"Unknown format {format!r}, expected one of {tuple(FORMATS)}")
+
+
+class CohortStore:
+    def __init__(
+        self,
+        subjects_dir: Union[Path, str],
+        atlases: Iterable[str] = DEFAULT_ATLASES,
+        n_jobs: int = 1,
+        cache_size: int = QUERY_CACHE_SIZE,
+    ) -> None:
+        """
+        A $SUBJECTS_DIR's measurements, parsed once and kept in memory to answer queries.
+
+        Every stats file's tidy rows are kept separately, so that refreshing
+        only re-parses the files whose size or modification time changed.
+        Query results (and their encoded responses) are cached until the next
+        change.
+
+        Parameters
+        ----------
+        subjects_dir : Union[Path, str]
+            Freesurfer's $SUBJECTS_DIR.
+        atlases : Iterable[str], optional
+            Atlases to load, by default DEFAULT_ATLASES
+        n_jobs : int, optional
+            Number of worker processes parsing (changed) files, by default 1
+        cache_size : int, optional
+            Number of cached query results, by default QUERY_CACHE_SIZE
+        """
+        self.subjects_dir = Path(subjects_dir)
+        self.atlases = tuple(atlases)
+        self.n_jobs = n_jobs
+        self.cache_size = cache_size
+        self.errors: Dict[Path, str] = {}
+        self.version = 0
+        self._signatures: Dict[Path, Tuple[int, int]] = {}
+        self._frames: Dict[Path, pd.DataFrame] = {}
+        self._data: Optional[pd.DataFrame] = None
+        self._queries: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def refresh(self) -> CohortChanges:
+        """
+        Re-parse the new and changed stats files, and drop the deleted ones.
+
+        Returns
+        -------
+        CohortChanges
+            The added, modified and deleted files, and the parsing errors.
+        """
+        # Concurrent refreshes (e.g. the watcher's and an explicit one) would parse, and report, the same changes twice
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> CohortChanges:
+        """
+        Refresh the store (see refresh), holding the refresh lock.
+        """
+        from freesurfer_statistics.cohort.incremental import CohortChanges
+
+        signatures = {}
+        for stats_file in find_stats_files(self.subjects_dir, self.atlases):
+            try:
+                stat = stats_file.stat()
+            except FileNotFoundError:
+                # Deleted since it was listed
+                continue
+            signatures[stats_file] = (stat.st_size, stat.st_mtime_ns)
+        changed = [stats_file for stats_file, signature in signatures.items() if self._signatures.get(stats_file) != signature]
+        deleted = [stats_file for stats_file in self._signatures if stats_file not in signatures]
+        if not changed and not deleted:
+            return CohortChanges([], [], [], {})
+
+        results = list(StatsCollection(changed, n_jobs=self.n_jobs)._iter_results())
+        errors = {stats_file: error for stats_file, _, error in results if error is not None}
+        with self._lock:
+            added = [stats_file for stats_file in changed if stats_file not in self._signatures]
+            modified = [stats_file for stats_file in changed if stats_file in self._frames]
+            for stats_file in deleted:
+                self._signatures.pop(stats_file)
+            for stats_file in deleted + list(errors):
+                self._frames.pop(stats_file, None)
+                self.errors.pop(stats_file, None)
+            for stats_file, data, error in results:
+                # Failed files are remembered too, and only re-parsed once they change again
+                self._signatures[stats_file] = signatures[stats_file]
+                if error is None:
+                    self._frames[stats_file] = data
+                    self.errors.pop(stats_file, None)
+            self.errors.update(errors)
+            self.version += 1
+            self._data = None
+            self._queries.clear()
+        return CohortChanges(
+            added=[stats_file for stats_file in added if stats_file not in errors],
+            modified=[stats_file for stats_file in modified if stats_file not in errors],
+            deleted=deleted + [stats_file for stats_file in modified if stats_file in errors],
+            errors=errors,
+        )
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """
+        Get all the stored measurements (in the stats files' order, with categorical labels).
+
+        Returns
+        -------
+        pd.DataFrame
+            The cohort's measurements, with TIDY_COLUMNS columns.
+        """
+        import pandas as pd
+
+        with self._lock:
+            if self._data is None:
+                frames = [self._frames[stats_file] for stats_file in sorted(self._frames)]
+                data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=TIDY_COLUMNS)
+                self._data = data.astype({column: "category" for column in FILTERS})
+            return self._data
+
+    def _cached(self, key: tuple, compute: Callable[[], object]) -> object:
+        """
+        Get a cached query result, computing (and caching) it if missing.
+        """
+        with self._lock:
+            key = (self.version, *key)
+            if key in self._queries:
+                self._queries.move_to_end(key)
+                return self._queries[key]
+        value = compute()
+        with self._lock:
+            if key[0] == self.version:
+                self._queries[key] = value
+                while len(self._queries) > self.cache_size:
+                    self._queries.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _filters_key(filters: Dict[str, Union[str, Iterable[str]]]) -> Filters:
+        unknown = set(filters) - set(FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown filters {sorted(unknown)}, expected some of {FILTERS}")
+        return {
+            column: (values,) if isinstance(values, str) else tuple(sorted(values))
+            for column, values in sorted(filters.items())
+            if values is not None
+        }
+
+    def query(self, **filters: Union[str, Iterable[str]]) -> pd.DataFrame:
+        """
+        Get the measurements matching every filter (cached until the store changes).
+
+        Parameters
+        ----------
+        **filters : Union[str, Iterable[str]]
+            Accepted values of any of FILTERS' columns, e.g. subject="sub-01", measure=["ThickAvg", "GrayVol"].
+
+        Returns
+        -------
+        pd.DataFrame
+            The matching measurements.
+        """
+        filters = self._filters_key(filters)
+
+        def compute():
+            data = self.data
+            mask = None
+            for column, values in filters.items():
+                matches = data[column].isin(values)
+                mask = matches if mask is None else mask & matches
+            return data if mask is None else data[mask].reset_index(drop=True)
+
+        return self._cached(("frame", *filters.items()), compute)
+
+    def query_encoded(self, format: str = "json", **filters: Union[str, Iterable[str]]) -> bytes:
+        """
+        Get the encoded measurements matching every filter (see query and encode_table), cached as well.
+
+        Parameters
+        ----------
+        format : str, optional
+            Response format, one of FORMATS, by default "json"
+        **filters : Union[str, Iterable[str]]
+            Accepted values of any of FILTERS' columns.
+
+        Returns
+        -------
+        bytes
+            The encoded measurements.
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format!r}, expected one of {tuple(FORMATS)}")
+        key = self._filters_key(filters)
+        return self._cached((format, *key.items()), lambda: encode_table(self.query(**key), format))
+
+    def status(self) -> dict:
+        """
+        Get the store's state: its version, number of files, rows and errors.
+        """
+        with self._lock:
+            return {
+                "subjects_dir": str(self.subjects_dir),
+                "version": self.version,
+                "files": len(self._frames),
+                "rows": len(self.data),
+                "errors": {str(stats_file): error for stats_file, error in self.errors.items()},
+            }
+
+    def watch(self, interval: float = 2.0) -> threading.Thread:
+        """
+        Refresh the store every *interval* seconds, in a background (daemon) thread, until stop is called.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Seconds between two refreshes, by default 2.0
+
+        Returns
+        -------
+        threading.Thread
+            The watcher's thread.
+        """
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    # Keep watching: the next refresh may succeed (e.g. once the $SUBJECTS_DIR is mounted again)
+                    logger.exception("Refreshing %s failed", self.subjects_dir)
+
+        thread = threading.Thread(target=run, name="freesurfer-statistics-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """
+        Stop watching for changes.
+        """
+        self._stop.set()
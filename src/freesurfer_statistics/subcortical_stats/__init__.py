@@ -1 +1 @@
-from freesurfer_statistics.subcortical_stats.subcortical_stats import SubCorticalStats  # noqa: F401
+from freesurfer_statistics.subcortical_stats.subcortical_stats import SubCorticalStats, WMParcStats  # noqa: F401
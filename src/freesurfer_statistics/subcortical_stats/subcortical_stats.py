@@ -1,7 +1,9 @@
 from pathlib import Path
 from typing import Union
 
+from freesurfer_statistics.cache import StatsCache
 from freesurfer_statistics.freesurfer_stats import FreesurferStats
+from freesurfer_statistics.parsing import SniffedHeader
 from freesurfer_statistics.subcortical_stats.format import SpecialHeaders
 
 
@@ -12,5 +14,65 @@ class SubCorticalStats(FreesurferStats):
     #: Special headers
     SPECIAL_HEADERS = SpecialHeaders
 
-    def __init__(self, stats_file: Union[Path, str]) -> None:
-        super().__init__(stats_file)
+    #: Detection
+    GENERATING_PROGRAM = "mri_segstats"
+    IDENTIFYING_COLUMNS = ("SegId",)
+
+    def __init__(
+        self,
+        stats_file: Union[Path, str],
+        check_mtime: bool = True,
+        float_dtype: str = "float64",
+        cache: StatsCache = None,
+        io_backend: str = "stream",
+        parse_dates: bool = True,
+    ) -> None:
+        super().__init__(
+            stats_file,
+            check_mtime=check_mtime,
+            float_dtype=float_dtype,
+            cache=cache,
+            io_backend=io_backend,
+            parse_dates=parse_dates,
+        )
+
+    @classmethod
+    def detect(cls, header: SniffedHeader) -> bool:
+        """
+        Whether the sniffed file is a segmentation's (mri_segstats) stats file.
+
+        Parameters
+        ----------
+        header : SniffedHeader
+            The beginning of a stats file.
+
+        Returns
+        -------
+        bool
+            True for volume-based (mri_segstats) stats files.
+        """
+        return header.headers.get("generating_program") == cls.GENERATING_PROGRAM or any(
+            column in header.columns for column in cls.IDENTIFYING_COLUMNS
+        )
+
+
+class WMParcStats(SubCorticalStats):
+    #: Detection
+    ATLAS_IDENTIFIER = "wmparc"
+
+    @classmethod
+    def detect(cls, header: SniffedHeader) -> bool:
+        """
+        Whether the sniffed file is a white matter parcellation's (wmparc) stats file.
+
+        Parameters
+        ----------
+        header : SniffedHeader
+            The beginning of a stats file.
+
+        Returns
+        -------
+        bool
+            True for wmparc stats files.
+        """
+        return cls.ATLAS_IDENTIFIER in header.name or cls.ATLAS_IDENTIFIER in header.headers.get("SegVolFile", "")
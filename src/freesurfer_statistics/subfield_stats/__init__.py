@@ -0,0 +1 @@
+from freesurfer_statistics.subfield_stats.subfield_stats import SubfieldStats  # noqa: F401
@@ -0,0 +1,11 @@
+SpecialHeaders = dict()
+
+#: Hippocampal subfields / amygdala nuclei volume files are "<structure> <volume>" rows
+DefaultTableColumns = (
+    "TableCol 1 ColHeader StructName",
+    "TableCol 1 FieldName Structure Name",
+    "TableCol 1 Units NA",
+    "TableCol 2 ColHeader Volume_mm3",
+    "TableCol 2 FieldName Volume",
+    "TableCol 2 Units mm^3",
+)
@@ -0,0 +1,77 @@
+import re
+from pathlib import Path
+from typing import Union
+
+from freesurfer_statistics.cache import StatsCache
+from freesurfer_statistics.freesurfer_stats import FreesurferStats
+from freesurfer_statistics.parsing import SniffedHeader
+from freesurfer_statistics.subfield_stats.format import DefaultTableColumns, SpecialHeaders
+
+
+class SubfieldStats(FreesurferStats):
+    #: File format
+    SUFFIXES = (".stats", ".txt")
+
+    #: Headers structure
+    HEADERS_END = "TableCol"
+
+    #: Special headers
+    SPECIAL_HEADERS = SpecialHeaders
+
+    #: Columns format
+    DEFAULT_TABLE_COLUMNS = DefaultTableColumns
+
+    #: Detection
+    NAME_PATTERN = re.compile(r"hippoSfVolumes|hipposubfields|amygNucVolumes|amygdalar-nuclei")
+    HEADER_IDENTIFIER = "segmentHA"
+
+    def __init__(
+        self,
+        stats_file: Union[Path, str],
+        check_mtime: bool = True,
+        float_dtype: str = "float64",
+        cache: StatsCache = None,
+        io_backend: str = "stream",
+        parse_dates: bool = True,
+    ) -> None:
+        super().__init__(
+            stats_file,
+            check_mtime=check_mtime,
+            float_dtype=float_dtype,
+            cache=cache,
+            io_backend=io_backend,
+            parse_dates=parse_dates,
+        )
+
+    @classmethod
+    def detect(cls, header: SniffedHeader) -> bool:
+        """
+        Whether the sniffed file holds hippocampal subfield or amygdala nuclei volumes.
+
+        Parameters
+        ----------
+        header : SniffedHeader
+            The beginning of a stats file.
+
+        Returns
+        -------
+        bool
+            True for segmentHA (hippocampal subfields / amygdala nuclei) volume files.
+        """
+        return bool(cls.NAME_PATTERN.search(header.name)) or cls.HEADER_IDENTIFIER in header.text
+
+    def query_hemisphere(self):
+        """
+        Query the hemisphere of the stats file, from its headers or its name
+        (e.g. "lh.hippoSfVolumes-T1.v21.txt").
+
+        Returns
+        -------
+        str
+            The hemisphere of the stats file.
+        """
+        hemi = self.headers.get("hemi") or next(
+            (part for part in self.path.name.split(".") if part in ("lh", "rh")),
+            None,
+        )
+        return self.STRUCTURE_MAP.get(hemi, "unknown")
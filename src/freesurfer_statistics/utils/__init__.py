@@ -1 +1,8 @@
-from freesurfer_statistics.utils.utils import UNITS_CONVERTER, parse_date, validate_stats_file  # noqa: F401
+from freesurfer_statistics.utils.io import IO_BACKENDS, advise_willneed, hash_file, map_file  # noqa: F401
+from freesurfer_statistics.utils.parallel import parallel_map  # noqa: F401
+from freesurfer_statistics.utils.utils import (  # noqa: F401
+    UNITS_CONVERTER,
+    parse_date,
+    to_datetimes,
+    validate_stats_file,
+)
@@ -0,0 +1,78 @@
+import hashlib
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+#: Available I/O backends for reading stats files
+IO_BACKENDS = ("stream", "mmap")
+
+
+@contextmanager
+def map_file(path: Union[Path, str]) -> Iterator[mmap.mmap]:
+    """
+    Memory-map a file for reading, hinting sequential access where supported.
+
+    Parameters
+    ----------
+    path : Union[Path, str]
+        Path to the file (must not be empty).
+
+    Yields
+    ------
+    mmap.mmap
+        A read-only mapping of the file.
+    """
+    with open(path, "rb") as stream:
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            if hasattr(mapping, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapping.madvise(mmap.MADV_SEQUENTIAL)
+            yield mapping
+
+
+def advise_willneed(paths: Iterable[Union[Path, str]]) -> None:
+    """
+    Hint the OS to start reading files ahead (POSIX_FADV_WILLNEED), where supported.
+
+    Parameters
+    ----------
+    paths : Iterable[Union[Path, str]]
+        Files that are about to be read.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def hash_file(path: Union[Path, str], chunk_size: int = 2**20) -> str:
+    """
+    Hash a file's content (BLAKE2b, 128 bits).
+
+    Parameters
+    ----------
+    path : Union[Path, str]
+        Path to the file.
+    chunk_size : int, optional
+        Number of bytes read at once, by default 1 MiB
+
+    Returns
+    -------
+    str
+        The content's hexadecimal digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as stream:
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,48 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Iterator, Sequence, TypeVar
+
+from freesurfer_statistics.profiling import active_profile, run_profiled
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def parallel_map(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    n_jobs: int = 1,
+    chunksize: int = 1,
+) -> Iterator[R]:
+    """
+    Map *func* over *items* on a process pool, yielding results in order.
+
+    When profiling is enabled, the workers' profiles are merged into the active one.
+
+    Parameters
+    ----------
+    func : Callable[[T], R]
+        A picklable (module-level) function.
+    items : Sequence[T]
+        The function's inputs.
+    n_jobs : int, optional
+        Number of worker processes, by default 1 (run in the current process).
+    chunksize : int, optional
+        Number of items sent to a worker at once, by default 1
+
+    Yields
+    ------
+    R
+        The function's results, in the order of *items*.
+    """
+    if n_jobs == 1 or len(items) < 2:
+        yield from map(func, items)
+        return
+    profile = active_profile()
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        if profile is None:
+            yield from executor.map(func, items, chunksize=chunksize)
+            return
+        for result, worker_profile in executor.map(partial(run_profiled, func), items, chunksize=chunksize):
+            profile.merge(worker_profile)
+            yield result
@@ -1,19 +1,150 @@
+from __future__ import annotations
+
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Union
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple, Union
+
+from freesurfer_statistics.profiling import stage
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+#: Maximal number of distinct (date string, format) pairs kept by parse_date
+DATE_CACHE_SIZE = 4096
+
+#: Fixed-width directives of the fast date parser (in datetime's argument order), and time zones it accepts for %Z
+DATE_DIRECTIVES = {"%Y": 4, "%m": 2, "%d": 2, "%H": 2, "%M": 2, "%S": 2}
+DATE_DEFAULTS = (1900, 1, 1, 0, 0, 0)
+UTC_ZONES = ("UTC", "GMT")
+
+
+@lru_cache(maxsize=64)
+def _compile_date_format(format: str) -> Optional[Tuple[int, Tuple[Optional[slice], ...], Tuple[Tuple[int, str], ...], bool]]:
+    """
+    Compile a fixed-width date format into a slice per datetime argument and literal separators.
+
+    Returns None for formats the fast path does not support (anything but
+    fixed-width numeric directives, literals and a trailing %Z).
+    """
+    directives = list(DATE_DIRECTIVES)
+    slices: List[Optional[slice]] = [None] * len(directives)
+    literals, offset, i = [], 0, 0
+    has_zone = format.endswith("%Z")
+    body = format[:-2] if has_zone else format
+    while i < len(body):
+        directive = body[i : i + 2]
+        if directive in DATE_DIRECTIVES:
+            width = DATE_DIRECTIVES[directive]
+            slices[directives.index(directive)] = slice(offset, offset + width)
+            offset, i = offset + width, i + 2
+        elif body[i] == "%":
+            return None
+        else:
+            literals.append((offset, body[i]))
+            offset, i = offset + 1, i + 1
+    return offset, tuple(slices), tuple(literals), has_zone
+
+
+def _parse_fixed_date(date_str: str, format: str) -> Optional[datetime]:
+    """
+    Parse a date by slicing its fixed-width fields, without strptime's regular expressions.
+
+    Returns None if *format* is not supported or *date_str* does not match it exactly.
+    """
+    compiled = _compile_date_format(format)
+    if compiled is None:
+        return None
+    width, slices, literals, has_zone = compiled
+    if len(date_str) != width and not (has_zone and date_str[width:] in UTC_ZONES):
+        return None
+    for offset, literal in literals:
+        if date_str[offset] != literal:
+            return None
+    args = []
+    for part, default in zip(slices, DATE_DEFAULTS):
+        if part is None:
+            args.append(default)
+            continue
+        value = date_str[part]
+        if not value.isdigit():
+            return None
+        args.append(int(value))
+    try:
+        return datetime(*args)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_date(date_str: str, format: str) -> datetime:
+    """
+    Parse a date string, memoized (see parse_date).
+    """
+    return _parse_fixed_date(date_str, format) or datetime.strptime(date_str, format)
 
 
 def parse_date(date_str: str, format: str) -> datetime:
     """
     Parse a date string from a Freesurfer .stats file.
+
+    Results are memoized in a bounded LRU cache (timestamps of atlases and
+    templates repeat across subjects), and fixed-width numeric formats are
+    parsed by slicing, falling back to datetime.strptime otherwise.
+
+    Parameters
+    ----------
+    date_str : str
+        The date, e.g. "2022/07/18 09:05:27".
+    format : str
+        The date's strptime format, e.g. "%Y/%m/%d %H:%M:%S".
+
+    Returns
+    -------
+    datetime
+        The parsed (naive) date.
+    """
+    with stage("parse_date"):
+        return _parse_date(date_str, format)
+
+
+def to_datetimes(values: Iterable[Optional[str]], format: str) -> pd.Series:
     """
-    return datetime.strptime(date_str, format)
+    Parse a column of date strings at once (e.g. a cohort's headers, read with parse_dates=False).
+
+    Parameters
+    ----------
+    values : Iterable[Optional[str]]
+        Date strings (missing values are kept as NaT).
+    format : str
+        The dates' strptime format.
+
+    Returns
+    -------
+    pd.Series
+        Naive datetimes, as parsed by parse_date (%Z time zones are dropped).
+    """
+    import pandas as pd
+
+    dates = pd.to_datetime(pd.Series(values, dtype=object), format=format)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates
 
 
-UNITS_CONVERTER = {"NA": str, "unitless": float, "mm": float, "MR": float}
+UNITS_CONVERTER = {
+    "NA": str,
+    "unitless": float,
+    "mm": float,
+    "mm^2": float,
+    "mm^3": float,
+    "mm^-1": float,
+    "mm^-2": float,
+    "MR": float,
+}
 
 
-def validate_stats_file(stats_file: Union[Path, str]) -> Path:
+def validate_stats_file(stats_file: Union[Path, str], suffixes: Iterable[str] = (".stats",)) -> Path:
     """
     Validate the stats file as an existing file Freesurfer .stats file.
 
@@ -21,6 +152,8 @@ def validate_stats_file(stats_file: Union[Path, str]) -> Path:
     ----------
     stats_file : Union[Path,str]
         The path to the Freesurfer .stats file.
+    suffixes : Iterable[str], optional
+        Accepted file suffixes, by default (".stats",)
 
     Raises
     ------
@@ -35,6 +168,6 @@ def validate_stats_file(stats_file: Union[Path, str]) -> Path:
     stats_file = Path(stats_file)
     if not stats_file.exists():
         raise FileNotFoundError(f"{stats_file} does not exist")
-    if stats_file.suffix != ".stats":
+    if stats_file.suffix not in suffixes:
         raise ValueError(f"{stats_file} is not a Freesurfer .stats file")
     return stats_file
@@ -0,0 +1,8 @@
+from freesurfer_statistics.validation.validation import (  # noqa: F401
+    EXPECTED_ROWS,
+    Problem,
+    check_stats_file,
+    quarantine,
+    validate_stats_files,
+    write_quarantine_report,
+)
@@ -0,0 +1,240 @@
+import json
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from freesurfer_statistics.cohort.cohort import get_atlas
+from freesurfer_statistics.registry import get_stats_class
+from freesurfer_statistics.utils import advise_willneed, parallel_map
+
+#: Number of regions of the cortical atlases (aseg-like files declare theirs, in an "NRows" line)
+EXPECTED_ROWS = {"aparc": 34, "aparc.a2009s": 74, "aparc.DKTatlas": 31}
+
+#: Names of the checks, as reported
+READABLE_CHECK = "readable"
+HEADER_CHECK = "header"
+COLUMNS_CHECK = "columns"
+ROWS_CHECK = "rows"
+NUMERIC_CHECK = "numeric"
+TRUNCATED_CHECK = "truncated"
+
+#: Text columns' data types (any other column must hold numbers)
+TEXT_DTYPES = ("category", "str")
+
+#: Declared counts in the header
+N_COLUMNS_IDENTIFIER = "NTableCols"
+N_ROWS_IDENTIFIER = "NRows"
+
+
+class Problem(NamedTuple):
+    """
+    A failed check of a stats file.
+
+    Attributes
+    ----------
+    check : str
+        The check's name (e.g. "rows").
+    message : str
+        What is wrong.
+    """
+
+    check: str
+    message: str
+
+
+def _declared_count(comments: Iterable[str], identifier: str) -> Optional[int]:
+    """
+    Read a count declared in the header (e.g. "NRows 41").
+    """
+    for comment in comments:
+        if comment.startswith(identifier):
+            try:
+                return int(comment.split()[1])
+            except (IndexError, ValueError):
+                return -1
+    return None
+
+
+def _ends_with_newline(stats_file: Path) -> bool:
+    with open(stats_file, "rb") as f:
+        f.seek(-1, 2)
+        return f.read(1) == b"\n"
+
+
+def check_stats_file(stats_file: Union[Path, str], expected_rows: Optional[Mapping[str, int]] = None) -> List[Problem]:
+    """
+    Check a stats file's structure, without parsing its table.
+
+    The file is only tokenized (no pandas involved), and checked for:
+
+    - its header's terminator, and "ColHeaders" line;
+    - its "NTableCols" and "TableCol" definitions matching its "ColHeaders";
+    - its number of rows (its "NRows", or the atlas' number of regions), with a value per column;
+    - its numeric columns holding numbers;
+    - its last line being complete (files of crashed runs are cut short).
+
+    Parameters
+    ----------
+    stats_file : Union[Path, str]
+        Path to a Freesurfer .stats file.
+    expected_rows : Mapping[str, int], optional
+        Number of rows per atlas, by default EXPECTED_ROWS
+
+    Returns
+    -------
+    List[Problem]
+        The failed checks (empty if the file is valid).
+    """
+    stats_file = Path(stats_file)
+    expected_rows = EXPECTED_ROWS if expected_rows is None else expected_rows
+    try:
+        stats = get_stats_class(stats_file)(stats_file, check_mtime=False)
+        tokens = stats.tokens
+        if not stats_file.stat().st_size:
+            return [Problem(READABLE_CHECK, "Empty file")]
+    except Exception as e:
+        return [Problem(READABLE_CHECK, f"{type(e).__name__}: {e}")]
+
+    problems = []
+    if tokens.table_columns or not stats.DEFAULT_TABLE_COLUMNS:
+        if not any(comment.startswith(stats.HEADERS_END) for comment in tokens.comments):
+            problems.append(Problem(HEADER_CHECK, f'Missing the header\'s "{stats.HEADERS_END}" lines'))
+        if not tokens.col_headers:
+            problems.append(Problem(HEADER_CHECK, 'Missing the "ColHeaders" line'))
+    schema = stats.schema
+    n_columns = _declared_count(tokens.comments, N_COLUMNS_IDENTIFIER)
+    if n_columns is not None and n_columns != len(schema):
+        problems.append(Problem(COLUMNS_CHECK, f"NTableCols is {n_columns}, but {len(schema)} columns are defined"))
+    if tokens.col_headers and tokens.col_headers != schema.names:
+        problems.append(Problem(COLUMNS_CHECK, f"ColHeaders {tokens.col_headers} do not match the TableCol names {schema.names}"))
+
+    n_rows = _declared_count(tokens.comments, N_ROWS_IDENTIFIER)
+    if n_rows is None:
+        n_rows = expected_rows.get(get_atlas(stats_file))
+    if not tokens.n_rows:
+        problems.append(Problem(ROWS_CHECK, "No data rows"))
+    elif n_rows is not None and tokens.n_rows != n_rows:
+        problems.append(Problem(ROWS_CHECK, f"Expected {n_rows} rows, got {tokens.n_rows}"))
+
+    numeric = [dtype not in TEXT_DTYPES for dtype in stats.get_dtypes(schema).values()]
+    data = tokens.data.decode() if isinstance(tokens.data, bytes) else tokens.data
+    for i, line in enumerate(data.splitlines(), start=1):
+        values = line.split()
+        if len(values) != len(numeric):
+            problems.append(Problem(ROWS_CHECK, f"Row {i} has {len(values)} values, expected {len(numeric)}"))
+            break
+        try:
+            for value, is_numeric in zip(values, numeric):
+                if is_numeric:
+                    float(value)
+        except ValueError:
+            problems.append(Problem(NUMERIC_CHECK, f"Row {i} has a non-numeric value {value!r}"))
+            break
+
+    if not _ends_with_newline(stats_file):
+        problems.append(Problem(TRUNCATED_CHECK, "The last line is incomplete (no final line break)"))
+    return problems
+
+
+def _check_stats_files(stats_files: List[Path], expected_rows: Optional[Mapping[str, int]] = None) -> List[Tuple[Path, List[Problem]]]:
+    """
+    Check a batch of stats files (process pool worker), hinting the OS to read them ahead first.
+    """
+    advise_willneed(stats_files)
+    return [(stats_file, check_stats_file(stats_file, expected_rows)) for stats_file in stats_files]
+
+
+def validate_stats_files(
+    stats_files: Iterable[Union[Path, str]],
+    expected_rows: Optional[Mapping[str, int]] = None,
+    n_jobs: int = 1,
+    chunksize: int = 16,
+) -> Dict[Path, List[Problem]]:
+    """
+    Check a cohort's stats files (see check_stats_file) on a process pool.
+
+    Parameters
+    ----------
+    stats_files : Iterable[Union[Path, str]]
+        Paths to Freesurfer .stats files.
+    expected_rows : Mapping[str, int], optional
+        Number of rows per atlas, by default EXPECTED_ROWS
+    n_jobs : int, optional
+        Number of worker processes, by default 1
+    chunksize : int, optional
+        Number of files sent to a worker at once, by default 16
+
+    Returns
+    -------
+    Dict[Path, List[Problem]]
+        The invalid files, with their problems.
+    """
+    stats_files = [Path(stats_file) for stats_file in stats_files]
+    check = partial(_check_stats_files, expected_rows=expected_rows)
+    batches = [stats_files[i : i + chunksize] for i in range(0, len(stats_files), chunksize)]
+    invalid = {}
+    for results in parallel_map(check, batches, n_jobs=n_jobs):
+        invalid.update({stats_file: problems for stats_file, problems in results if problems})
+    return invalid
+
+
+def write_quarantine_report(report_path: Union[Path, str], invalid: Mapping[Path, List[Problem]], n_checked: int) -> Path:
+    """
+    Write the invalid files of a cohort as a JSON report.
+
+    The report holds the number of checked and quarantined files, and every
+    quarantined file's problems, e.g.
+    {"checked": 3, "quarantined": 1, "files": {"<path>": [{"check": "rows", "message": "..."}]}}.
+
+    Parameters
+    ----------
+    report_path : Union[Path, str]
+        Path to write the report to.
+    invalid : Mapping[Path, List[Problem]]
+        The invalid files, with their problems (see validate_stats_files).
+    n_checked : int
+        Number of checked files.
+
+    Returns
+    -------
+    Path
+        The written report.
+    """
+    report_path = Path(report_path)
+    report = {
+        "checked": n_checked,
+        "quarantined": len(invalid),
+        "files": {str(stats_file): [problem._asdict() for problem in problems] for stats_file, problems in invalid.items()},
+    }
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report_path
+
+
+def quarantine(
+    stats_files: Iterable[Union[Path, str]],
+    report_path: Optional[Union[Path, str]] = None,
+    **kwargs,
+) -> Tuple[List[Path], Dict[Path, List[Problem]]]:
+    """
+    Split a cohort's stats files into valid and invalid ones, before parsing them.
+
+    Parameters
+    ----------
+    stats_files : Iterable[Union[Path, str]]
+        Paths to Freesurfer .stats files.
+    report_path : Union[Path, str], optional
+        Path to write the quarantine report to (see write_quarantine_report), by default None
+    **kwargs
+        Passed to validate_stats_files (expected_rows, n_jobs, chunksize).
+
+    Returns
+    -------
+    Tuple[List[Path], Dict[Path, List[Problem]]]
+        The valid files (in order), and the invalid ones with their problems.
+    """
+    stats_files = [Path(stats_file) for stats_file in stats_files]
+    invalid = validate_stats_files(stats_files, **kwargs)
+    if report_path is not None:
+        write_quarantine_report(report_path, invalid, len(stats_files))
+    return [stats_file for stats_file in stats_files if stats_file not in invalid], invalid
@@ -0,0 +1 @@
+from freesurfer_statistics.writer.writer import format_rows, format_stats, write_stats, write_stats_files  # noqa: F401
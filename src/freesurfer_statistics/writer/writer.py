@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from freesurfer_statistics.parsing import TableSchema, parse_measure
+from freesurfer_statistics.parsing.parser import COLUMN_HEADERS_IDENTIFIER, COLUMNS_IDENTIFIER, MEASURES_IDENTIFIER
+from freesurfer_statistics.utils.parallel import parallel_map
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+    from freesurfer_statistics.freesurfer_stats import FreesurferStats
+
+#: Header lines regenerated from the written tables (rather than copied from the source)
+N_COLUMNS_IDENTIFIER = "NTableCols"
+N_ROWS_IDENTIFIER = "NRows"
+
+#: "TableCol" properties, with their padded names (as written by Freesurfer)
+TABLE_COLUMN_PROPERTIES = (
+    ("name", "ColHeader"),
+    ("field_name", "FieldName"),
+    ("units", "Units    "),
+    ("casted_type", "CastedType"),
+)
+
+#: A write job: (stats, output path[, structural measurements[, whole brain measurements]])
+WriteJob = Tuple
+
+
+def _format_column(values: list, dtype: np.dtype) -> List[str]:
+    """
+    Format a column's values as the shortest strings parsed back to the same values.
+
+    Integral floats are written without their decimal part (e.g. "4495"), like Freesurfer does.
+    """
+    if dtype.kind != "f":
+        return list(map(str, values))
+    if dtype.itemsize == 8:
+        # repr() of (double precision) Python floats is already the shortest round-trip form
+        strings = list(map(repr, values))
+    else:
+        import numpy as np
+
+        strings = np.asarray(values, dtype=dtype).astype(str).tolist()
+    return [string[:-2] if string.endswith(".0") else string for string in strings]
+
+
+def format_rows(data: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Format a table as fixed-width data rows.
+
+    Every column is padded to its widest value: text columns are left-justified
+    and numeric columns right-justified. Floats are written with as many digits
+    as needed to be parsed back exactly.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        The table to format.
+    columns : Sequence[str], optional
+        The columns to write, in order, by default all of them.
+
+    Returns
+    -------
+    List[str]
+        A line per row (without line breaks).
+    """
+    # A single conversion of the whole table is much cheaper than a pandas lookup per column
+    values = dict(zip(data.columns.tolist(), zip(data.to_numpy(dtype=object).T.tolist(), data.dtypes.tolist())))
+    formatted = []
+    for name in values if columns is None else columns:
+        if name not in values:
+            raise KeyError(f"Missing column {name!r}")
+        column, dtype = values[name]
+        strings = _format_column(column, dtype)
+        width = max(map(len, strings), default=0)
+        numeric = dtype.kind in "biuf"
+        formatted.append([string.rjust(width) if numeric else string.ljust(width) for string in strings])
+    return [" ".join(row).rstrip() for row in zip(*formatted)]
+
+
+def _measure_lines(stats: FreesurferStats, data: pd.DataFrame) -> Dict[str, str]:
+    """
+    Format the "Measure" lines of whole brain measurements, by index (structures are taken from the source file).
+    """
+    structures = {measure.index: measure.structure for measure in map(parse_measure, stats.tokens.measures)}
+    columns = dict(zip(data.columns.tolist(), data.to_numpy(dtype=object).T.tolist()))
+    indices, descriptions, units = columns["index"], columns["description"], columns["unit"]
+    values = _format_column(columns["value"], data["value"].dtype)
+    return {
+        index: f"{MEASURES_IDENTIFIER} {structures.get(index, index)}, {index}, {description}, {value}, {unit}"
+        for index, description, value, unit in zip(indices, descriptions, values, units)
+    }
+
+
+@lru_cache(maxsize=256)
+def _table_column_lines(schema: TableSchema) -> Tuple[str, ...]:
+    """
+    Format the "TableCol" lines of a schema (once per atlas, since schemas are interned).
+    """
+    lines = []
+    for column in schema.columns:
+        for attribute, name in TABLE_COLUMN_PROPERTIES:
+            value = getattr(column, attribute)
+            if value is not None:
+                lines.append(f"{COLUMNS_IDENTIFIER} {column.index:2d} {name} {value}".rstrip())
+    return tuple(lines)
+
+
+def format_stats(
+    stats: FreesurferStats,
+    structural_measurements: Optional[pd.DataFrame] = None,
+    whole_brain_measurements: Optional[pd.DataFrame] = None,
+) -> str:
+    """
+    Format a stats file's content.
+
+    The header is the source file's, with its "Measure" lines, "TableCol" block,
+    "NTableCols", "NRows" and "ColHeaders" regenerated from the written tables; any other
+    commented line (e.g. "cmdline", "subjectname") is copied as-is.
+    Derived outputs (e.g. harmonized measurements) are written by passing
+    their tables alongside the stats they were computed from.
+
+    Parameters
+    ----------
+    stats : FreesurferStats
+        The source stats (any object with FreesurferStats' tokens, schema and measurements).
+    structural_measurements : pd.DataFrame, optional
+        The data rows to write, with the columns of stats.structural_measurements, by default the source's.
+    whole_brain_measurements : pd.DataFrame, optional
+        The "Measure" lines to write, with the columns of stats.whole_brain_measurements, by default the source's.
+
+    Returns
+    -------
+    str
+        The stats file's content.
+    """
+    if structural_measurements is None:
+        structural_measurements = stats.structural_measurements
+    if whole_brain_measurements is None:
+        whole_brain_measurements = stats.whole_brain_measurements
+    tokens = stats.tokens
+    converter = getattr(stats, "COLUMNS_CONVERTER", {})
+    names = list(stats.schema.names)
+
+    measures = _measure_lines(stats, whole_brain_measurements)
+    table_columns = _table_column_lines(stats.schema) if tokens.table_columns else ()
+    n_measures = len(tokens.measures)
+    lines: List[str] = []
+    for comment in tokens.comments:
+        if comment.startswith(MEASURES_IDENTIFIER):
+            # Replace every source measure in place, and add new ones after the last
+            n_measures -= 1
+            line = measures.pop(parse_measure(comment[len(MEASURES_IDENTIFIER) :]).index, None)
+            lines += [line] if line else []
+            if not n_measures:
+                lines += measures.values()
+                measures = {}
+        elif comment.startswith(COLUMNS_IDENTIFIER):
+            lines += table_columns
+            table_columns = ()
+        elif comment.startswith(N_COLUMNS_IDENTIFIER):
+            lines.append(f"{N_COLUMNS_IDENTIFIER} {len(names)}")
+        elif comment.startswith(N_ROWS_IDENTIFIER):
+            lines.append(f"{N_ROWS_IDENTIFIER} {len(structural_measurements)}")
+        elif comment.startswith(COLUMN_HEADERS_IDENTIFIER):
+            lines.append(f"{COLUMN_HEADERS_IDENTIFIER} {' '.join(names)}")
+        else:
+            lines.append(comment)
+    header = [f"# {line}" for line in [*lines, *measures.values(), *table_columns]]
+    rows = format_rows(structural_measurements, [converter.get(name, name) for name in names])
+    return "\n".join(header + rows) + "\n"
+
+
+def write_stats(
+    stats: FreesurferStats,
+    path: Union[Path, str],
+    structural_measurements: Optional[pd.DataFrame] = None,
+    whole_brain_measurements: Optional[pd.DataFrame] = None,
+) -> Path:
+    """
+    Write a stats file (see format_stats).
+
+    Parameters
+    ----------
+    stats : FreesurferStats
+        The source stats.
+    path : Union[Path, str]
+        Path to write to (parent directories are created if missing).
+    structural_measurements : pd.DataFrame, optional
+        The data rows to write, by default the source's.
+    whole_brain_measurements : pd.DataFrame, optional
+        The "Measure" lines to write, by default the source's.
+
+    Returns
+    -------
+    Path
+        The written file.
+    """
+    path = Path(path)
+    content = format_stats(stats, structural_measurements, whole_brain_measurements)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+def _write_stats_job(job: WriteJob) -> Tuple[Path, Optional[str]]:
+    """
+    Write a single stats file, returning the error instead of raising it (to keep the pool going).
+    """
+    try:
+        return write_stats(*job), None
+    except Exception as e:
+        return Path(job[1]), f"{type(e).__name__}: {e}"
+
+
+def write_stats_files(
+    jobs: Iterable[WriteJob],
+    n_jobs: int = 1,
+    chunksize: int = 16,
+) -> Tuple[List[Path], Dict[Path, str]]:
+    """
+    Write many stats files (e.g. a synthetic or harmonized cohort) on a process pool.
+
+    Parameters
+    ----------
+    jobs : Iterable[WriteJob]
+        The write_stats arguments of every file: (stats, path[, structural_measurements[, whole_brain_measurements]]).
+    n_jobs : int, optional
+        Number of worker processes, by default 1 (write in the current process).
+    chunksize : int, optional
+        Number of files sent to a worker at once, by default 16
+
+    Returns
+    -------
+    Tuple[List[Path], Dict[Path, str]]
+        The written files, and the files that failed to write, with their errors.
+    """
+    jobs: Sequence[WriteJob] = list(jobs)
+    written, errors = [], {}
+    for path, error in parallel_map(_write_stats_job, jobs, n_jobs, chunksize):
+        if error is None:
+            written.append(path)
+        else:
+            errors[path] = error
+    return written, errors
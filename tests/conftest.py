@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def cortical_stats_file() -> Path:
+    return DATA_DIR / "lh.aparc.stats"
+
+
+@pytest.fixture
+def subcortical_stats_file() -> Path:
+    return DATA_DIR / "aseg.stats"
+
+
+@pytest.fixture
+def subfield_stats_file(tmp_path) -> Path:
+    path = tmp_path / "lh.hippoSfVolumes-T1.v21.txt"
+    path.write_text("Hippocampal_tail 512.3\nsubiculum-body 250.1\nWhole_hippocampus 3512.0\n")
+    return path
+
+
+@pytest.fixture
+def subjects_dir(tmp_path, cortical_stats_file, subcortical_stats_file) -> Path:
+    for subject in ["sub-01", "sub-02", "sub-03"]:
+        stats_dir = tmp_path / subject / "stats"
+        stats_dir.mkdir(parents=True)
+        for name, source in [
+            ("lh.aparc.stats", cortical_stats_file),
+            ("rh.aparc.stats", cortical_stats_file),
+            ("aseg.stats", subcortical_stats_file),
+        ]:
+            content = source.read_text().replace("sub-01", subject)
+            if name.startswith("rh."):
+                content = content.replace("# hemi lh", "# hemi rh")
+            (stats_dir / name).write_text(content)
+    return tmp_path
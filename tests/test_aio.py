@@ -0,0 +1,41 @@
+import asyncio
+
+import pandas as pd
+
+from freesurfer_statistics.aio import iter_many_async, load_many_async
+from freesurfer_statistics.cohort import find_stats_files, load_cohort
+from freesurfer_statistics.cortical_stats import CorticalStats
+
+
+def test_load_many_async(subjects_dir):
+    stats_files = find_stats_files(subjects_dir, atlases=["aparc", "aseg"])
+    bad_file = subjects_dir / "sub-01" / "stats" / "lh.aparc.stats"
+    bad_file.write_text(bad_file.read_text() + "truncated row\n")
+    for n_jobs in [1, 2]:
+        data, errors = asyncio.run(load_many_async(stats_files, concurrency=4, n_jobs=n_jobs))
+        expected, expected_errors = load_cohort(stats_files, n_jobs=1)
+        assert list(errors) == list(expected_errors) == [bad_file]
+        pd.testing.assert_frame_equal(data, expected, check_categorical=False)
+
+
+def test_iter_many_async_stops_early(subjects_dir):
+    async def first():
+        async for result in iter_many_async(find_stats_files(subjects_dir), concurrency=2, n_jobs=1):
+            return result
+
+    stats_file, data, error = asyncio.run(first())
+    assert error is None and len(data)
+
+
+def test_from_buffer_skips_the_filesystem(cortical_stats_file, tmp_path):
+    stats_file = tmp_path / "lh.aparc.stats"
+    stats_file.write_bytes(cortical_stats_file.read_bytes())
+    stats = CorticalStats.from_buffer(stats_file, stats_file.read_bytes())
+    stats_file.unlink()
+    assert len(stats.structural_measurements) == 34
+
+
+def test_from_buffer_without_a_file(cortical_stats_file, tmp_path):
+    stats = CorticalStats.from_buffer(tmp_path / "missing" / "lh.aparc.stats", cortical_stats_file.read_bytes())
+    assert stats.headers["subjectname"] == "sub-01"
+    assert len(stats.structural_measurements) == 34
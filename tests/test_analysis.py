@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from freesurfer_statistics.analysis import asymmetry_index, group_means, normalize_icv, read_icv, zscore
+from freesurfer_statistics.cohort import CohortArray, StatsCollection, find_stats_files
+
+
+@pytest.fixture
+def array(subjects_dir):
+    tidy = StatsCollection.from_subjects_dir(subjects_dir, atlases=["aparc", "aseg"], n_jobs=1).tidy
+    tidy.loc[tidy["subject"] == "sub-02", "value"] *= 2
+    return CohortArray.from_tidy(tidy)
+
+
+def test_zscore(array):
+    scores = zscore(array)
+    thickness = scores.get(region=("aparc", "left", "bankssts"), measure="ThickAvg")
+    np.testing.assert_allclose(thickness, [-0.57735, 1.154701, -0.57735], rtol=1e-5)
+    assert np.isnan(scores.get(region=("aseg", "subcortex", "Left-Thalamus"), measure="ThickAvg")).all()
+    mean, std = array.values[0], np.full(array.shape[1:], 2.0)
+    np.testing.assert_allclose(zscore(array, mean=mean, std=std).values[1], array.values[1] / 4)
+
+
+def test_asymmetry_index(array):
+    asymmetry = asymmetry_index(array)
+    assert asymmetry.shape == (3, 34, len(array.measures))
+    assert asymmetry.regions[0] == ("aparc", "asymmetry", "bankssts")
+    assert np.nanmax(np.abs(asymmetry.values)) == 0
+
+
+def test_normalize_icv(array, subjects_dir):
+    icv = read_icv(find_stats_files(subjects_dir, atlases=["aseg"]))
+    assert icv == {subject: 1604063.617829 for subject in ["sub-01", "sub-02", "sub-03"]}
+    normalized = normalize_icv(array, icv)
+    region = ("aseg", "subcortex", "Left-Thalamus")
+    assert normalized.get("sub-01", region, "Volume_mm3") == pytest.approx(20629.2 / 1604063.617829)
+    assert normalized.get("sub-01", region, "normMean") == array.get("sub-01", region, "normMean")
+
+
+def test_group_means(array):
+    means = group_means(array, {"sub-01": "a", "sub-02": "a", "sub-03": "b"})
+    assert means.subjects == ("a", "b")
+    np.testing.assert_allclose(means.values[0], array.values[0] * 1.5)
+    np.testing.assert_array_equal(means.values[1], array.values[2])
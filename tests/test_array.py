@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from freesurfer_statistics.cohort import CohortArray, StatsCollection
+
+
+@pytest.fixture
+def collection(subjects_dir):
+    return StatsCollection.from_subjects_dir(subjects_dir, atlases=["aparc", "aseg"], n_jobs=1)
+
+
+def _sorted(data):
+    data = data.astype({column: str for column in data.columns if column != "value"})
+    return data.sort_values(list(data.columns[:-1])).reset_index(drop=True)
+
+
+def test_tidy_round_trip(collection):
+    array = CohortArray.from_tidy(collection.tidy)
+    assert array.shape == (3, 34 * 2 + 41, len(array.measures))
+    pd.testing.assert_frame_equal(_sorted(array.to_tidy()), _sorted(collection.tidy))
+
+
+def test_duplicated_measurements(collection):
+    tidy = collection.tidy
+    with pytest.raises(ValueError, match="duplicated"):
+        CohortArray.from_tidy(pd.concat([tidy, tidy.iloc[[0]]], ignore_index=True))
+
+
+def test_wide_round_trip(collection):
+    array = CohortArray.from_wide(collection.wide, float_dtype="float32")
+    assert array.values.dtype == np.float32
+    wide = array.to_wide()
+    expected = collection.wide
+    pd.testing.assert_frame_equal(wide, expected[wide.columns].astype("float32"), check_names=False)
+
+
+def test_views(collection):
+    array = CohortArray.from_tidy(collection.tidy)
+    left = array.select("aparc", "left", measures="ThickAvg")
+    assert left.shape == (3, 34, 1)
+    assert np.shares_memory(left.values, array.values)
+    assert np.shares_memory(array.get(subject="sub-02", measure="Volume_mm3"), array.values)
+    assert array[1:, :10].subjects == ("sub-02", "sub-03")
+    region = ("aparc", "left", "bankssts")
+    assert array.get("sub-01", region, "ThickAvg") == 3.164
+    assert array.astype("float32").nbytes == array.nbytes // 2
@@ -0,0 +1,41 @@
+from freesurfer_statistics.cache import StatsCache
+from freesurfer_statistics.cohort import StatsCollection
+from freesurfer_statistics.cortical_stats import CorticalStats
+
+
+def test_warm_cache_skips_parsing(cortical_stats_file, tmp_path, monkeypatch):
+    cache = StatsCache(tmp_path / "cache")
+    cold = CorticalStats(cortical_stats_file, cache=cache)
+    expected = cold.structural_measurements
+    assert len(cache) == 1
+
+    warm = CorticalStats(cortical_stats_file, cache=cache)
+    monkeypatch.setattr(warm, "_iter_lines", lambda: 1 / 0)
+    assert warm.structural_measurements.equals(expected)
+    assert warm.headers == cold.headers
+    assert warm.whole_brain_measurements.equals(cold.whole_brain_measurements)
+
+
+def test_cache_eviction(subjects_dir, tmp_path):
+    cache = StatsCache(tmp_path / "cache", max_entries=4)
+    StatsCollection.from_subjects_dir(subjects_dir, n_jobs=1, cache=cache).load()
+    assert len(cache) == 4
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_keyed_by_float_dtype(cortical_stats_file, tmp_path):
+    cache = StatsCache(tmp_path / "cache")
+    assert CorticalStats(cortical_stats_file, cache=cache).structural_measurements["ThickAvg"].dtype == "float64"
+    data = CorticalStats(cortical_stats_file, cache=cache, float_dtype="float32").structural_measurements
+    assert data["ThickAvg"].dtype == "float32"
+
+
+def test_corrupt_entry_is_a_miss(cortical_stats_file, tmp_path):
+    cache = StatsCache(tmp_path / "cache")
+    expected = CorticalStats(cortical_stats_file, cache=cache).structural_measurements
+    (entry,) = (tmp_path / "cache").glob(f"*{StatsCache.ENTRY_SUFFIX}")
+    # an entry pickled against a class that no longer exists
+    entry.write_bytes(b"cbuiltins\nMissing\n.")
+    assert CorticalStats(cortical_stats_file, cache=cache).structural_measurements.equals(expected)
+    assert len(cache) == 1
@@ -0,0 +1,48 @@
+from freesurfer_statistics.cohort import StatsCollection, find_stats_files, load_cohort, load_headers
+from freesurfer_statistics.cortical_stats import CorticalStats
+
+
+def test_find_stats_files(subjects_dir):
+    stats_files = find_stats_files(subjects_dir, atlases=["aparc", "aseg"])
+    assert len(stats_files) == 9
+    assert find_stats_files(subjects_dir, atlases=["aparc.a2009s"]) == []
+
+
+def test_load_cohort_tidy(subjects_dir):
+    data, errors = load_cohort(subjects_dir, n_jobs=2, chunksize=2)
+    assert not errors
+    assert set(data["subject"]) == {"sub-01", "sub-02", "sub-03"}
+    assert set(data["hemisphere"]) == {"left", "right", "subcortex"}
+    assert "SegId" not in set(data["measure"])
+
+
+def test_load_cohort_wide(subjects_dir):
+    data, _ = load_cohort(subjects_dir, n_jobs=1, wide=True)
+    assert data.shape[0] == 3
+    assert ("aparc", "left", "insula", "ThickAvg") in data.columns
+
+
+def test_parse_errors_are_collected(subjects_dir):
+    broken = subjects_dir / "sub-02" / "stats" / "lh.aparc.stats"
+    broken.write_text(broken.read_text().replace("2022/07/18-09:05:33-GMT", "corrupted"))
+    collection = StatsCollection.from_subjects_dir(subjects_dir, n_jobs=1)
+    data = collection.tidy
+    assert list(collection.errors) == [broken]
+    assert len(data.groupby(["subject", "hemisphere"])) == 8
+
+
+def test_load_cohort_mmap(subjects_dir):
+    streamed = StatsCollection.from_subjects_dir(subjects_dir, n_jobs=1).tidy
+    mapped = StatsCollection.from_subjects_dir(subjects_dir, n_jobs=2, chunksize=4, io_backend="mmap").tidy
+    assert mapped.equals(streamed)
+
+
+def test_load_headers(subjects_dir):
+    stats_files = find_stats_files(subjects_dir, atlases=["aparc", "aseg"])
+    data, errors = load_headers(stats_files, n_jobs=2)
+    assert not errors
+    assert len(data) == len(stats_files)
+    assert str(data["CreationTime"].dtype).startswith("datetime64")
+    stats = CorticalStats(stats_files[0])
+    assert data.loc[stats_files[0], "CreationTime"] == stats.headers["CreationTime"]
+    assert data["SegVolFileTimeStamp"].notna().sum() == 3
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from freesurfer_statistics.cli import main
+from freesurfer_statistics.cortical_stats import CorticalStats
+from freesurfer_statistics.export import read_table
+
+
+@pytest.mark.parametrize(
+    "format, suffix, module",
+    [("parquet", ".parquet", "pyarrow"), ("feather", ".feather", "pyarrow"), ("hdf5", ".h5", "tables")],
+)
+def test_export_roundtrip(cortical_stats_file, tmp_path, format, suffix, module):
+    pytest.importorskip(module)
+    stats = CorticalStats(cortical_stats_file)
+    path = stats.export(tmp_path / f"lh.aparc{suffix}", format=format)
+    data, headers, whole_brain = read_table(path)
+    assert data.equals(stats.structural_measurements)
+    assert headers == stats.headers
+    assert whole_brain.equals(stats.whole_brain_measurements)
+
+
+def test_main_metadata_with_dates(cortical_stats_file, tmp_path):
+    metadata = tmp_path / "lh.aparc.json"
+    args = ["-i", str(cortical_stats_file), "-o", str(tmp_path / "lh.aparc.csv"), "-om", str(metadata), "-q"]
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert json.loads(metadata.read_text())["CreationTime"] == "2022-07-18T09:05:33"
+
+
+def test_main_combined_parquet(subjects_dir, tmp_path):
+    pytest.importorskip("pyarrow")
+    output_file = tmp_path / "cohort.parquet"
+    result = CliRunner().invoke(main, ["-s", str(subjects_dir), "-c", "-f", "parquet", "-o", str(output_file), "-q"])
+    assert result.exit_code == 0, result.output
+    data, _, _ = read_table(output_file)
+    assert set(data["subject"]) == {"sub-01", "sub-02", "sub-03"}
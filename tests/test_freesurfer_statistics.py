@@ -1,6 +1,57 @@
+import pandas as pd
+from click.testing import CliRunner
+
 from freesurfer_statistics.cli import main
 
 
 def test_main():
     short_help = main.get_short_help_str()
     assert short_help == "Console script for freesurfer_stats."
+
+
+def test_main_single_file(cortical_stats_file, tmp_path):
+    output_file = tmp_path / "lh.aparc.csv"
+    result = CliRunner().invoke(main, ["-i", str(cortical_stats_file), "-o", str(output_file), "-q"])
+    assert result.exit_code == 0, result.output
+    assert len(pd.read_csv(output_file, index_col=0)) == 34
+
+
+def test_main_subjects_dir(subjects_dir):
+    result = CliRunner().invoke(main, ["-s", str(subjects_dir), "-a", "aparc", "-a", "aseg", "-j", "2"])
+    assert result.exit_code == 0, result.output
+    assert len(list(subjects_dir.glob("*/stats/*.csv"))) == 9
+
+
+def test_main_combined(subjects_dir, tmp_path):
+    output_file = tmp_path / "cohort.csv"
+    pattern = str(subjects_dir / "*" / "stats" / "?h.aparc.stats")
+    result = CliRunner().invoke(main, ["-g", pattern, "--combined", "-o", str(output_file)])
+    assert result.exit_code == 0, result.output
+    assert set(pd.read_csv(output_file)["subject"]) == {"sub-01", "sub-02", "sub-03"}
+
+
+def test_main_reports_failures(subjects_dir):
+    broken = subjects_dir / "sub-02" / "stats" / "aseg.stats"
+    broken.write_text(broken.read_text() + "truncated row\n")
+    result = CliRunner().invoke(main, ["-s", str(subjects_dir), "-q"])
+    assert result.exit_code == 1
+    assert "1 of 9 files failed" in result.output
+
+
+def test_main_metadata_only(subjects_dir):
+    result = CliRunner().invoke(main, ["-s", str(subjects_dir), "--metadata-only", "-q"])
+    assert result.exit_code == 0, result.output
+    assert len(list(subjects_dir.glob("*/stats/*.json"))) == 9
+    assert not list(subjects_dir.glob("*/stats/*.csv"))
+
+
+def test_main_subfield_file(subfield_stats_file):
+    source = subfield_stats_file.read_text()
+    result = CliRunner().invoke(main, ["-i", str(subfield_stats_file), "-q"])
+    assert result.exit_code == 0, result.output
+    assert subfield_stats_file.read_text() == source
+    assert len(pd.read_csv(subfield_stats_file.with_suffix(".csv"), index_col=0)) == 3
+
+    result = CliRunner().invoke(main, ["-i", str(subfield_stats_file), "-o", str(subfield_stats_file), "-q"])
+    assert result.exit_code == 1 and "Refusing to overwrite" in result.output
+    assert subfield_stats_file.read_text() == source
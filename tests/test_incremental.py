@@ -0,0 +1,69 @@
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from freesurfer_statistics.cli import main
+from freesurfer_statistics.cohort import IncrementalCohort, find_stats_files, load_cohort
+
+pytest.importorskip("pyarrow")
+
+
+def _touch(path, content=None):
+    if content is not None:
+        path.write_text(content)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_refresh(subjects_dir, tmp_path):
+    atlases = ["aparc", "aseg"]
+    store = IncrementalCohort(tmp_path / "cohort", n_jobs=1)
+    changes = store.refresh(find_stats_files(subjects_dir, atlases))
+    assert len(changes.added) == 9 and not changes.modified and not changes.deleted
+    expected, _ = load_cohort(subjects_dir, atlases=atlases, n_jobs=1)
+    assert len(store.load()) == len(expected)
+
+    aseg = subjects_dir / "sub-02" / "stats" / "aseg.stats"
+    _touch(subjects_dir / "sub-01" / "stats" / "lh.aparc.stats")
+    _touch(aseg, aseg.read_text().replace("Left-Thalamus", "Left-Thalamus-Proper"))
+    (subjects_dir / "sub-03" / "stats" / "rh.aparc.stats").unlink()
+    changes = store.refresh(find_stats_files(subjects_dir, atlases))
+    assert changes.added == [] and changes.modified == [aseg]
+    assert [path.name for path in changes.deleted] == ["rh.aparc.stats"]
+    assert len(store) == 8
+
+    data = store.load()
+    assert "Left-Thalamus-Proper" in set(data["region"])
+    assert len(data[(data["subject"] == "sub-03") & (data["hemisphere"] == "right")]) == 0
+    expected, _ = load_cohort(subjects_dir, atlases=atlases, n_jobs=1)
+    assert len(data) == len(expected)
+
+
+def test_refresh_after_crash(subjects_dir, tmp_path, monkeypatch):
+    atlases = ["aparc", "aseg"]
+    stats_files = find_stats_files(subjects_dir, atlases)
+    store = IncrementalCohort(tmp_path / "cohort", n_jobs=1)
+    store.refresh(stats_files[:3])
+
+    # Crash after the partitions are written, before the manifest is
+    connect = store._connect
+    calls = []
+    monkeypatch.setattr(store, "_connect", lambda: connect() if calls.append(None) or len(calls) == 1 else 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        store.refresh(stats_files)
+    monkeypatch.undo()
+
+    changes = store.refresh(stats_files + [subjects_dir / "sub-04" / "stats" / "aseg.stats"])
+    assert len(changes.added) == 6 and not changes.deleted
+    expected, _ = load_cohort(subjects_dir, atlases=atlases, n_jobs=1)
+    assert len(store.load()) == len(expected)
+
+
+def test_cli_incremental(subjects_dir, tmp_path):
+    args = ["-s", str(subjects_dir), "-a", "aseg", "-c", "--incremental", "-o", str(tmp_path / "cohort")]
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0
+    assert "3 added, 0 modified, 0 deleted" in result.output
+    result = CliRunner().invoke(main, args)
+    assert "0 added, 0 modified, 0 deleted" in result.output
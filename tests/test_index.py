@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from freesurfer_statistics import MetadataIndex
+from freesurfer_statistics.cortical_stats import CorticalStats
+from freesurfer_statistics.index import index as index_module
+
+
+def test_scan_headers(cortical_stats_file, monkeypatch):
+    stats = CorticalStats(cortical_stats_file)
+    lines = []
+    iter_lines = stats._iter_lines
+    monkeypatch.setattr(stats, "_iter_lines", lambda: (lines.append(line) or line for line in iter_lines()))
+    assert stats.scan_headers().data == ""
+    assert stats.headers["subjectname"] == "sub-01"
+    assert len(stats.whole_brain_measurements) == 10
+    assert len(stats.table_columns) == 10
+    assert not any(line.startswith("bankssts") for line in lines[:-1])
+    assert len(lines) < len(cortical_stats_file.read_text().splitlines())
+
+
+def test_metadata_index(subjects_dir, tmp_path, monkeypatch):
+    index = MetadataIndex(tmp_path / "index.sqlite")
+    assert not index.update_subjects_dir(subjects_dir, atlases=["aparc", "aseg"])
+    assert len(index) == 9
+    assert len(index.find(subject="sub-02")) == 3
+    assert len(index.find(version="7.1", atlas="aparc", created_after=datetime(2022, 7, 1))) == 6
+    assert not index.find(version="7.2")
+    assert not index.find(created_after=datetime(2023, 1, 1))
+    rows = index.query("SELECT COUNT(*) AS n FROM measures WHERE name = 'eTIV'")
+    assert rows[0]["n"] == 9
+    assert index.to_frame()["creation_time"].notna().all()
+
+    scanned = []
+    scan = index_module._scan_stats_file
+    monkeypatch.setattr(index_module, "_scan_stats_file", lambda stats_file: scanned.append(stats_file) or scan(stats_file))
+    (subjects_dir / "sub-03" / "stats" / "aseg.stats").unlink()
+    index.update_subjects_dir(subjects_dir, atlases=["aparc", "aseg"])
+    assert not scanned
+    assert len(index) == 8
+
+
+def test_update_deleted_file(subjects_dir, tmp_path):
+    index = MetadataIndex(tmp_path / "index.sqlite")
+    stats_files = sorted(subjects_dir.glob("*/stats/*.stats"))
+    assert not index.update(stats_files)
+    stats_files[0].unlink()
+    errors = index.update(stats_files)
+    assert list(errors) == [stats_files[0]]
+    assert len(index) == len(stats_files) - 1
+    assert stats_files[0] not in index.find(subject=stats_files[0].parent.parent.name)
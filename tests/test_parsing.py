@@ -0,0 +1,108 @@
+import os
+import shutil
+from datetime import datetime
+
+from freesurfer_statistics.cortical_stats import CorticalStats
+from freesurfer_statistics.parsing import parse_stats_lines
+from freesurfer_statistics.subcortical_stats import SubCorticalStats
+from freesurfer_statistics.utils import parse_date
+from freesurfer_statistics.utils.utils import _parse_fixed_date
+
+
+def test_parse_stats_lines(cortical_stats_file):
+    tokens = parse_stats_lines(cortical_stats_file.read_text().splitlines())
+    assert len(tokens.table_columns) == 30
+    assert len(tokens.measures) == 10
+    assert tokens.col_headers[0] == "StructName"
+    assert tokens.n_rows == 34
+
+
+def test_file_is_read_once(cortical_stats_file, monkeypatch):
+    stats = CorticalStats(cortical_stats_file)
+    calls = []
+    iter_lines = stats._iter_lines
+    monkeypatch.setattr(stats, "_iter_lines", lambda: calls.append(1) or iter_lines())
+    stats.headers
+    stats.table_columns
+    stats.structural_measurements
+    stats.whole_brain_measurements
+    stats.hemisphere
+    assert len(calls) == 1
+
+
+def test_subcortical_measurements(subcortical_stats_file):
+    stats = SubCorticalStats(subcortical_stats_file)
+    assert stats.hemisphere == "subcortex"
+    assert stats.structural_measurements.shape == (41, 10)
+    assert "Region" in stats.structural_measurements.columns
+
+
+def test_reload_on_modification(cortical_stats_file, tmp_path):
+    path = tmp_path / cortical_stats_file.name
+    shutil.copy(cortical_stats_file, path)
+    stats = CorticalStats(path)
+    assert stats.headers["subjectname"] == "sub-01"
+    path.write_text(path.read_text().replace("subjectname sub-01", "subjectname sub-02"))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert stats.is_stale
+    assert stats.headers["subjectname"] == "sub-02"
+    assert not stats.is_stale
+
+
+def test_whole_brain_measurements(cortical_stats_file, subcortical_stats_file):
+    cortical = CorticalStats(cortical_stats_file).whole_brain_measurements
+    assert cortical["value"].dtype == "float64"
+    assert cortical["index"].dtype == "category"
+    assert cortical.loc[cortical["index"] == "eTIV", "value"].item() == 1604063.617829
+    subcortical = SubCorticalStats(subcortical_stats_file).whole_brain_measurements
+    assert len(subcortical) == 14
+    assert list(subcortical.columns) == ["index", "description", "unit", "value"]
+
+
+def test_schema_is_shared(cortical_stats_file, subjects_dir):
+    first = CorticalStats(cortical_stats_file)
+    second = CorticalStats(subjects_dir / "sub-02" / "stats" / "rh.aparc.stats")
+    assert first.schema is second.schema
+    assert first.schema.names[:2] == ("StructName", "NumVert")
+    assert first.schema.units[1] == "unitless"
+    assert list(first.table_columns.index) == list(range(1, 11))
+    assert first.table_columns.loc[3, "FieldName"] == "Surface Area"
+
+
+def test_measurements_dtypes(subcortical_stats_file):
+    stats = SubCorticalStats(subcortical_stats_file, float_dtype="float32")
+    dtypes = stats.structural_measurements.dtypes
+    assert dtypes["Region"] == "category"
+    assert dtypes["SegId"] == "int32"
+    assert dtypes["NVoxels"] == "int32"
+    assert dtypes["Volume_mm3"] == "float32"
+
+
+def test_mmap_backend(subcortical_stats_file, cortical_stats_file):
+    for path, stats_class in [(subcortical_stats_file, SubCorticalStats), (cortical_stats_file, CorticalStats)]:
+        streamed = stats_class(path)
+        mapped = stats_class(path, io_backend="mmap")
+        assert isinstance(mapped.tokens.data, bytes)
+        assert mapped.tokens.n_rows == streamed.tokens.n_rows
+        assert mapped.tokens._replace(data=None) == streamed.tokens._replace(data=None)
+        assert mapped.structural_measurements.equals(streamed.structural_measurements)
+        assert mapped.headers == streamed.headers
+
+
+def test_stream_backend_skips_stat(cortical_stats_file, monkeypatch):
+    stats = CorticalStats(cortical_stats_file, check_mtime=False)
+    monkeypatch.setattr(type(stats.path), "stat", lambda *args, **kwargs: 1 / 0)
+    assert len(stats.structural_measurements) == 34
+
+
+def test_parse_date(cortical_stats_file):
+    for date_str, format in [
+        ("2022/07/18-09:05:33-GMT", "%Y/%m/%d-%H:%M:%S-%Z"),
+        ("2022/07/18 08:40:07", "%Y/%m/%d %H:%M:%S"),
+        ("2022/7/18 08:40:07", "%Y/%m/%d %H:%M:%S"),
+        ("18 Jul 2022", "%d %b %Y"),
+    ]:
+        assert parse_date(date_str, format) == datetime.strptime(date_str, format)
+    assert _parse_fixed_date("2022/7/18 08:40:07", "%Y/%m/%d %H:%M:%S") is None
+    assert CorticalStats(cortical_stats_file, parse_dates=False).headers["CreationTime"] == "2022/07/18-09:05:33-GMT"
@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from freesurfer_statistics import CorticalStats, profile
+from freesurfer_statistics.cli import main
+from freesurfer_statistics.cohort import StatsCollection
+from freesurfer_statistics.profiling import PROFILE_ENV_VAR, active_profile
+
+
+def test_profile_stages(cortical_stats_file):
+    assert active_profile() is None
+    with profile() as run_profile:
+        stats = CorticalStats(cortical_stats_file)
+        stats.headers
+        stats.structural_measurements
+    assert active_profile() is None
+    assert run_profile.n_files == 1
+    assert run_profile.bytes_read == cortical_stats_file.stat().st_size
+    assert {"io", "headers", "parse_date", "table_columns", "read_csv"} <= set(run_profile.seconds)
+    assert run_profile.calls["parse_date"] == 2
+
+
+def test_profile_workers(subjects_dir):
+    with profile() as run_profile:
+        StatsCollection.from_subjects_dir(subjects_dir, atlases=["aparc", "aseg"], n_jobs=2).load()
+    assert run_profile.n_files == 9
+    assert run_profile.calls["read_csv"] == 9
+
+
+def test_cli_profile(subjects_dir, tmp_path):
+    output = tmp_path / "profile.json"
+    args = ["-s", str(subjects_dir), "-c", "-o", str(tmp_path / "cohort.csv"), "-j", "2", "-q"]
+    result = CliRunner().invoke(main, args + ["--profile", "--profile-json", str(output)])
+    assert result.exit_code == 0
+    assert "9 files" in result.output
+    report = json.loads(output.read_text())
+    assert report["n_files"] == 9
+    assert report["stages"]["read_csv"]["calls"] == 9
+
+
+def test_profile_env_var_reports_once(tmp_path):
+    script = tmp_path / "spawn_worker.py"
+    script.write_text(
+        "import multiprocessing\n"
+        "import freesurfer_statistics.profiling\n"
+        "if __name__ == '__main__':\n"
+        "    process = multiprocessing.get_context('spawn').Process(target=print)\n"
+        "    process.start()\n"
+        "    process.join()\n"
+    )
+    env = {**os.environ, PROFILE_ENV_VAR: "1"}
+    result = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, env=env, check=True)
+    assert result.stderr.count("MiB read") == 1, result.stderr
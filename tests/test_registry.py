@@ -0,0 +1,57 @@
+import pytest
+
+import freesurfer_statistics
+from freesurfer_statistics.cohort import StatsCollection
+from freesurfer_statistics.cohort.cohort import get_atlas
+from freesurfer_statistics.cortical_stats import BAExvivoStats, CorticalStats
+from freesurfer_statistics.subcortical_stats import SubCorticalStats, WMParcStats
+from freesurfer_statistics.subfield_stats import SubfieldStats
+
+
+@pytest.fixture
+def stats_dir(tmp_path, cortical_stats_file, subcortical_stats_file, subfield_stats_file):
+    cortical = cortical_stats_file.read_text()
+    subcortical = subcortical_stats_file.read_text()
+    (tmp_path / "lh.aparc.stats").write_text(cortical)
+    (tmp_path / "lh.BA_exvivo.stats").write_text(cortical.replace("lh.aparc.annot", "lh.BA_exvivo.annot"))
+    (tmp_path / "aseg.stats").write_text(subcortical)
+    (tmp_path / "wmparc.stats").write_text(subcortical.replace("mri/aseg.mgz", "mri/wmparc.mgz"))
+    # a misleading name: detection relies on the header, not the file name
+    (tmp_path / "renamed.stats").write_text(cortical)
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "name, stats_class",
+    [
+        ("lh.aparc.stats", CorticalStats),
+        ("lh.BA_exvivo.stats", BAExvivoStats),
+        ("aseg.stats", SubCorticalStats),
+        ("wmparc.stats", WMParcStats),
+        ("lh.hippoSfVolumes-T1.v21.txt", SubfieldStats),
+        ("renamed.stats", CorticalStats),
+    ],
+)
+def test_open_detects_type(stats_dir, name, stats_class):
+    stats = freesurfer_statistics.open(stats_dir / name)
+    assert type(stats) is stats_class
+
+
+def test_subfield_volumes(stats_dir):
+    stats = freesurfer_statistics.open(stats_dir / "lh.hippoSfVolumes-T1.v21.txt")
+    assert stats.hemisphere == "left"
+    assert list(stats.structural_measurements.columns) == ["Region", "Volume_mm3"]
+    assert stats.structural_measurements["Volume_mm3"].sum() == pytest.approx(4274.4)
+
+
+def test_subfield_atlas(subfield_stats_file):
+    assert get_atlas(subfield_stats_file) == "hippoSfVolumes-T1.v21"
+    assert get_atlas("lh.aparc.a2009s.stats") == "aparc.a2009s" and get_atlas("aseg.stats") == "aseg"
+    assert StatsCollection([subfield_stats_file]).tidy["atlas"].unique().tolist() == ["hippoSfVolumes-T1.v21"]
+
+
+def test_undetectable_file(tmp_path):
+    path = tmp_path / "unknown.stats"
+    path.write_text("# Title Something else\nfoo bar\n")
+    with pytest.raises(ValueError, match="Could not detect"):
+        freesurfer_statistics.open(path)
@@ -0,0 +1,166 @@
+import http.client
+import json
+import socket
+import socketserver
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+from click.testing import CliRunner
+
+from freesurfer_statistics.cli import main
+from freesurfer_statistics.server import CohortStore, make_server
+
+
+@pytest.fixture
+def store(subjects_dir):
+    store = CohortStore(subjects_dir, atlases=["aparc", "aseg"])
+    store.refresh()
+    return store
+
+
+@pytest.fixture
+def server(store):
+    server = make_server(store, port=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def get(url):
+    with urlopen(url) as response:
+        return response.headers["Content-Type"], response.read()
+
+
+def test_query(store):
+    assert store.status()["files"] == 9 and not store.errors
+    data = store.query(subject="sub-02", hemisphere="left", measure=["ThickAvg", "GrayVol"])
+    assert len(data) == 2 * 34 and set(data["measure"]) == {"ThickAvg", "GrayVol"}
+    assert store.query(subject="sub-02", measure=["GrayVol", "ThickAvg"], hemisphere="left") is data
+    assert len(store.query()) == len(store.data)
+    with pytest.raises(ValueError, match="Unknown filters"):
+        store.query(structure="Left-Hippocampus")
+
+
+def test_refresh(store, subjects_dir):
+    version = store.version
+    assert store.refresh() == ([], [], [], {})
+    stats_file = subjects_dir / "sub-01" / "stats" / "lh.aparc.stats"
+    stats_file.write_text(stats_file.read_text().replace(" 3.164 ", " 9.999 ", 1))
+    (subjects_dir / "sub-03" / "stats" / "aseg.stats").unlink()
+    changes = store.refresh()
+    assert changes.modified == [stats_file] and [path.parent.parent.name for path in changes.deleted] == ["sub-03"]
+    assert store.version == version + 1 and store.status()["files"] == 8
+    values = store.query(subject="sub-01", hemisphere="left", measure="ThickAvg")["value"]
+    assert 9.999 in values.tolist()
+
+
+def test_watch(store, subjects_dir):
+    version = store.version
+    store.watch(interval=0.01)
+    try:
+        (subjects_dir / "sub-02" / "stats" / "rh.aparc.stats").write_text("# Not a stats file\n")
+        deadline = time.monotonic() + 10
+        while store.version == version and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        store.stop()
+    assert store.version == version + 1 and len(store.errors) == 1
+
+
+def test_watch_survives_errors(store, monkeypatch, caplog):
+    refresh = store.refresh
+    calls = []
+
+    def flaky_refresh():
+        calls.append(None)
+        if len(calls) == 1:
+            raise OSError("Stale file handle")
+        return refresh()
+
+    monkeypatch.setattr(store, "refresh", flaky_refresh)
+    store.watch(interval=0.01)
+    try:
+        deadline = time.monotonic() + 10
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        store.stop()
+    assert len(calls) >= 2 and "Stale file handle" in caplog.text
+
+
+def test_concurrent_refreshes(store, subjects_dir):
+    version = store.version
+    stats_file = subjects_dir / "sub-01" / "stats" / "lh.aparc.stats"
+    stats_file.write_text(stats_file.read_text().replace(" 3.164 ", " 9.999 ", 1))
+    changes = []
+    threads = [threading.Thread(target=lambda: changes.append(store.refresh())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(len(change.modified) for change in changes) == [0, 0, 0, 1]
+    assert store.version == version + 1
+
+
+def test_http(server):
+    content_type, body = get(f"{server}/query?subject=sub-01,sub-03&atlas=aseg&region=Left-Hippocampus")
+    records = json.loads(body)
+    assert content_type == "application/json" and len(records) == 2 * 7
+    assert {record["subject"] for record in records} == {"sub-01", "sub-03"}
+    assert json.loads(get(f"{server}/status")[1])["files"] == 9
+    for path in ["/query?measure=ThickAvg&format=xml", "/query?structure=Left-Hippocampus"]:
+        with pytest.raises(HTTPError, match="400"):
+            get(server + path)
+
+
+def test_http_arrow(server):
+    pa = pytest.importorskip("pyarrow")
+    content_type, body = get(f"{server}/query?subject=sub-02&measure=ThickAvg&format=arrow")
+    table = pa.ipc.open_stream(body).read_all()
+    assert content_type == "application/vnd.apache.arrow.stream" and table.num_rows == 2 * 34
+
+
+def test_unix_socket(store, tmp_path):
+    socket_path = tmp_path / "stats.sock"
+    server = make_server(store, socket_path=socket_path, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        connection = http.client.HTTPConnection("localhost")
+        connection.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.sock.connect(str(socket_path))
+        connection.request("GET", "/query?subject=sub-01&atlas=aparc&hemisphere=right&measure=SurfArea")
+        assert len(json.loads(connection.getresponse().read())) == 34
+        connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert not socket_path.exists()
+
+
+def test_cli_serve(subjects_dir, monkeypatch):
+    statuses = []
+    serve_forever = socketserver.BaseServer.serve_forever
+
+    def serve_once(server):
+        # Answer a request, then stop as on Ctrl+C
+        thread = threading.Thread(target=serve_forever, args=(server,))
+        thread.start()
+        try:
+            statuses.append(json.loads(get(f"http://127.0.0.1:{server.server_address[1]}/status")[1]))
+        finally:
+            server.shutdown()
+            thread.join()
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(socketserver.BaseServer, "serve_forever", serve_once)
+    args = ["serve", "-s", str(subjects_dir), "-a", "aparc", "-a", "aseg", "--port", "0", "--poll-interval", "0", "-q"]
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert "Loaded 9 stats files (0 failed)" in result.output and "Serving on http://127.0.0.1:" in result.output
+    assert statuses[0]["files"] == 9
@@ -0,0 +1,53 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["pandas", "numpy"]
+
+
+#: Modules only needed by some commands (serve, --validate, --incremental and the shared memory transport)
+COMMAND_MODULES = [
+    "http.server",
+    "freesurfer_statistics.server.handler",
+    "freesurfer_statistics.validation",
+    "freesurfer_statistics.cohort.incremental",
+    "freesurfer_statistics.cohort.transport",
+]
+
+
+def _imported_modules(code: str, modules: list = HEAVY_MODULES) -> set:
+    check = f"{code}\nimport sys\nprint(' '.join(name for name in {modules!r} if name in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import freesurfer_statistics",
+        "from freesurfer_statistics.cli import main",
+        "from freesurfer_statistics import CorticalStats",
+    ],
+)
+def test_import_is_lightweight(code):
+    assert not _imported_modules(code)
+
+
+def test_cli_defers_command_modules():
+    assert not _imported_modules("from freesurfer_statistics.cli import main", COMMAND_MODULES)
+
+
+def test_headers_do_not_import_pandas(cortical_stats_file):
+    code = f"from freesurfer_statistics import CorticalStats\nCorticalStats({str(cortical_stats_file)!r}).headers"
+    assert not _imported_modules(code)
+
+
+def test_lazy_attributes():
+    import freesurfer_statistics
+    from freesurfer_statistics.cohort import StatsCollection
+
+    assert freesurfer_statistics.StatsCollection is StatsCollection
+    assert "load_cohort" in dir(freesurfer_statistics)
+    with pytest.raises(AttributeError):
+        freesurfer_statistics.missing
@@ -0,0 +1,27 @@
+from freesurfer_statistics.cohort import find_stats_files, iter_cohort
+from freesurfer_statistics.cortical_stats import CorticalStats
+from freesurfer_statistics.subcortical_stats import SubCorticalStats
+
+
+def test_iter_rows_matches_table(subcortical_stats_file):
+    stats = SubCorticalStats(subcortical_stats_file)
+    rows = list(stats.iter_rows())
+    assert len(rows) == 41
+    assert rows[0]._fields == tuple(stats.structural_measurements.columns)
+    assert isinstance(rows[0].SegId, int)
+    assert rows[0].Region == stats.structural_measurements["Region"][0]
+    assert rows[0].Volume_mm3 == stats.structural_measurements["Volume_mm3"][0]
+    assert type(rows[0]) is type(next(SubCorticalStats(subcortical_stats_file).iter_rows()))
+
+
+def test_iter_measures(cortical_stats_file):
+    stats = CorticalStats(cortical_stats_file)
+    measures = list(stats.iter_measures())
+    assert [measure.value for measure in measures] == list(stats.whole_brain_measurements["value"])
+    assert measures[-1].index == "eTIV"
+
+
+def test_iter_cohort(subjects_dir):
+    stats_files = find_stats_files(subjects_dir, atlases=["aparc", "aseg"])
+    assert sum(1 for _ in iter_cohort(stats_files)) == 3 * (34 + 34 + 41)
+    assert sum(1 for _ in iter_cohort(stats_files, measures=True)) == 3 * (10 + 10 + 14)
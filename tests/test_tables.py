@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from freesurfer_statistics.cli import aparcstats2table_command, asegstats2table_command
+from freesurfer_statistics.cohort import aparcstats2table, asegstats2table
+from freesurfer_statistics.cortical_stats import CorticalStats
+
+SUBJECTS = ["sub-01", "sub-02", "sub-03"]
+
+
+def test_aparcstats2table(subjects_dir):
+    table, errors = aparcstats2table(SUBJECTS, "lh", subjects_dir, meas="thickness", n_jobs=2, chunksize=1)
+    stats = CorticalStats(subjects_dir / "sub-02" / "stats" / "lh.aparc.stats")
+    assert not errors and table.index.name == "lh.aparc.thickness" and list(table.index) == SUBJECTS
+    assert list(table.columns[-3:]) == ["lh_MeanThickness_thickness", "BrainSegVolNotVent", "eTIV"]
+    assert table.loc["sub-02", "lh_bankssts_thickness"] == stats.structural_measurements["ThickAvg"][0]
+    assert table.loc["sub-02", "lh_MeanThickness_thickness"] == 2.49215
+
+    table, _ = aparcstats2table(SUBJECTS, "rh", subjects_dir, meas="volume")
+    assert table.columns[0] == "rh_bankssts_volume" and table.columns[-1] == "eTIV"
+    with pytest.raises(ValueError, match="Unknown measure"):
+        aparcstats2table(SUBJECTS, "lh", subjects_dir, meas="GrayVol")
+
+
+def test_asegstats2table(subjects_dir):
+    table, _ = asegstats2table(SUBJECTS, subjects_dir)
+    assert table.index.name == "Measure:volume" and table.columns[-1] == "EstimatedTotalIntraCranialVol"
+    assert "Left-Hippocampus" in table.columns and "BrainSegVol" in table.columns
+
+    table, _ = asegstats2table(SUBJECTS, subjects_dir, meas="std")
+    assert table.shape == (3, 41)
+
+
+def test_missing_subjects(subjects_dir):
+    with pytest.raises(ValueError, match="sub-04"):
+        asegstats2table(SUBJECTS + ["sub-04"], subjects_dir)
+    table, errors = asegstats2table(SUBJECTS + ["sub-04"], subjects_dir, skip=True)
+    assert list(table.index) == SUBJECTS and [path.parent.parent.name for path in errors] == ["sub-04"]
+
+
+def test_cli(subjects_dir, tmp_path):
+    tablefile = tmp_path / "lh.aparc.area.tsv"
+    result = CliRunner().invoke(
+        aparcstats2table_command,
+        ["--sd", str(subjects_dir), "-s", "sub-01", "-s", "sub-02", "--hemi", "lh", "-t", str(tablefile)],
+    )
+    assert result.exit_code == 0, result.output
+    table = pd.read_csv(tablefile, sep="\t", index_col=0)
+    assert table.index.name == "lh.aparc.area" and table.columns[-3] == "lh_WhiteSurfArea_area"
+
+    subjects_file = tmp_path / "subjects.txt"
+    subjects_file.write_text("sub-01\nsub-04\n")
+    args = ["--subjectsfile", str(subjects_file), "-t", str(tmp_path / "aseg.csv"), "-d", "comma"]
+    result = CliRunner().invoke(asegstats2table_command, args, env={"SUBJECTS_DIR": str(subjects_dir)})
+    assert result.exit_code == 1 and "--skip" in result.output
+    result = CliRunner().invoke(asegstats2table_command, args + ["--skip"], env={"SUBJECTS_DIR": str(subjects_dir)})
+    assert result.exit_code == 0 and len(pd.read_csv(tmp_path / "aseg.csv")) == 1
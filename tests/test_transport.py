@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from freesurfer_statistics.cohort import StatsCollection, find_stats_files, pack_stats_files, unpack_batches
+from freesurfer_statistics.profiling import profile
+
+#: Where POSIX shared memory blocks live (on Linux)
+SHARED_MEMORY_DIR = "/dev/shm"
+
+
+def _labels_as_str(data):
+    return data.astype({column: str for column in data.columns if column != "value"})
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_same_as_pickle(subjects_dir, n_jobs):
+    (subjects_dir / "sub-02" / "stats" / "aseg.stats").write_text("# Title Segmentation Statistics\n")
+    expected = StatsCollection.from_subjects_dir(subjects_dir, n_jobs=1)
+    collection = StatsCollection.from_subjects_dir(subjects_dir, n_jobs=n_jobs, chunksize=2, transport="shared_memory")
+    pd.testing.assert_frame_equal(_labels_as_str(collection.tidy), _labels_as_str(expected.tidy))
+    assert collection.errors == expected.errors
+    assert (collection.tidy["region"].dtype, collection.tidy["subject"].dtype) == ("category", "category")
+    wide = collection.wide
+    assert wide.columns.tolist() == expected.wide.columns.tolist() and wide.index.tolist() == expected.wide.index.tolist()
+    np.testing.assert_array_equal(wide.to_numpy(), expected.wide.to_numpy())
+
+
+def test_pack_stats_files(subjects_dir):
+    stats_files = find_stats_files(subjects_dir, atlases=["aparc"])
+    batch = pack_stats_files(stats_files)
+    assert len(batch.files) == 6 and len(batch.layouts) == 2
+    assert {layout.hemisphere for layout in batch.layouts} == {"left", "right"}
+
+    with profile() as run_profile:
+        data, errors = unpack_batches([batch])
+    assert not errors and len(data) == 6 * batch.layouts[0].size
+    assert run_profile.calls["assemble"] == 2
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=batch.name)
+
+
+def test_unknown_transport(subjects_dir):
+    with pytest.raises(ValueError, match="Unknown transport"):
+        StatsCollection([], transport="arrow")
+
+
+def test_no_leaked_blocks_across_processes(subjects_dir):
+    code = (
+        "from freesurfer_statistics.cohort import StatsCollection\n"
+        f"StatsCollection.from_subjects_dir({str(subjects_dir)!r}, n_jobs=2, chunksize=1, transport='shared_memory').load()\n"
+    )
+    result = subprocess.run([sys.executable, "-W", "error::UserWarning", "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0 and "resource_tracker" not in result.stderr, result.stderr
+
+
+@pytest.mark.skipif(not os.path.isdir(SHARED_MEMORY_DIR), reason="Lists Linux shared memory blocks")
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_failed_load_releases_blocks(subjects_dir, n_jobs):
+    def fail(stats_file, error):
+        raise RuntimeError("callback failed")
+
+    before = set(os.listdir(SHARED_MEMORY_DIR))
+    collection = StatsCollection.from_subjects_dir(subjects_dir, n_jobs=n_jobs, chunksize=1, transport="shared_memory")
+    with pytest.raises(RuntimeError, match="callback failed"):
+        collection.load(callback=fail)
+    assert set(os.listdir(SHARED_MEMORY_DIR)) <= before
+
+
+@pytest.mark.skipif(not os.path.isdir(SHARED_MEMORY_DIR), reason="Lists Linux shared memory blocks")
+def test_interrupted_load_releases_blocks(subjects_dir):
+    def interrupt(stats_file, error):
+        raise KeyboardInterrupt
+
+    before = set(os.listdir(SHARED_MEMORY_DIR))
+    collection = StatsCollection.from_subjects_dir(subjects_dir, n_jobs=1, transport="shared_memory")
+    with pytest.raises(KeyboardInterrupt):
+        collection.load(callback=interrupt)
+    assert set(os.listdir(SHARED_MEMORY_DIR)) <= before
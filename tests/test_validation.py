@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from freesurfer_statistics.cli import main
+from freesurfer_statistics.validation import check_stats_file, quarantine
+
+
+def _checks(path):
+    return {problem.check for problem in check_stats_file(path)}
+
+
+def test_valid_files(cortical_stats_file, subcortical_stats_file):
+    assert check_stats_file(cortical_stats_file) == []
+    assert check_stats_file(subcortical_stats_file) == []
+
+
+@pytest.mark.parametrize(
+    "source, corrupt, checks",
+    [
+        ("cortical_stats_file", lambda text: text[: text.index("# NTableCols") + 5], {"header", "rows", "truncated"}),
+        ("cortical_stats_file", lambda text: text[: text.rindex("\n", 0, -1) + 20], {"rows", "truncated"}),
+        ("cortical_stats_file", lambda text: text.replace(" 6611   4495 ", " 6611 "), {"rows"}),
+        ("cortical_stats_file", lambda text: text.replace(" 3.164 ", " 3,164 "), {"numeric"}),
+        ("cortical_stats_file", lambda text: text.replace("NTableCols 10", "NTableCols 11"), {"columns"}),
+        ("subcortical_stats_file", lambda text: text.replace("NRows 41", "NRows 42"), {"rows"}),
+        ("subcortical_stats_file", lambda text: text.replace("normRange  \n", "\n"), {"columns"}),
+        ("subcortical_stats_file", lambda text: "", {"readable"}),
+    ],
+)
+def test_corrupt_files(request, tmp_path, source, corrupt, checks):
+    source = request.getfixturevalue(source)
+    path = tmp_path / source.name
+    path.write_text(corrupt(source.read_text()))
+    assert _checks(path) == checks
+
+
+def test_quarantine(subjects_dir, tmp_path):
+    stats_files = sorted(subjects_dir.glob("*/stats/*.stats"))
+    truncated = subjects_dir / "sub-02" / "stats" / "aseg.stats"
+    truncated.write_text(truncated.read_text()[:-200])
+    report = tmp_path / "quarantine.json"
+
+    valid, invalid = quarantine(stats_files, report, n_jobs=2, chunksize=2)
+    assert list(invalid) == [truncated] and valid == [path for path in stats_files if path != truncated]
+    content = json.loads(report.read_text())
+    assert content["checked"] == 9 and content["quarantined"] == 1
+    assert {problem["check"] for problem in content["files"][str(truncated)]} == {"rows", "truncated"}
+
+    output = tmp_path / "cohort.csv"
+    args = ["-s", str(subjects_dir), "-a", "aparc", "-a", "aseg", "-c", "-o", str(output), "-q"]
+    result = CliRunner().invoke(main, args + ["--quarantine-report", str(report)])
+    assert result.exit_code == 1 and "1 of 9 files failed" in result.output
+    assert output.exists() and json.loads(report.read_text())["quarantined"] == 1
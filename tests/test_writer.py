@@ -0,0 +1,46 @@
+import pandas.testing as pdt
+import pytest
+
+from freesurfer_statistics.cortical_stats import CorticalStats
+from freesurfer_statistics.registry import get_stats_class
+from freesurfer_statistics.subcortical_stats import SubCorticalStats
+from freesurfer_statistics.writer import format_stats, write_stats, write_stats_files
+
+
+@pytest.mark.parametrize("stats_class, stats_file", [(CorticalStats, "cortical_stats_file"), (SubCorticalStats, "subcortical_stats_file")])
+def test_round_trip(request, tmp_path, stats_class, stats_file):
+    stats_file = request.getfixturevalue(stats_file)
+    source = stats_class(stats_file)
+    written = stats_class(write_stats(source, tmp_path / "sub-01" / "stats" / stats_file.name))
+    assert written.headers == source.headers
+    pdt.assert_frame_equal(written.table_columns, source.table_columns)
+    pdt.assert_frame_equal(written.whole_brain_measurements, source.whole_brain_measurements)
+    pdt.assert_frame_equal(written.structural_measurements, source.structural_measurements)
+    assert format_stats(written) == format_stats(source)
+
+
+def test_derived_measurements(tmp_path, subcortical_stats_file):
+    source = SubCorticalStats(subcortical_stats_file)
+    data = source.structural_measurements.iloc[:5].copy()
+    data["Volume_mm3"] *= 1 / 3
+    whole_brain = source.whole_brain_measurements.copy()
+    whole_brain["value"] = 1.5
+
+    written = SubCorticalStats(write_stats(source, tmp_path / "aseg.stats", data, whole_brain))
+    assert "NRows 5" in written.tokens.comments
+    pdt.assert_frame_equal(written.structural_measurements, data.reset_index(drop=True), check_categorical=False)
+    assert (written.whole_brain_measurements["value"] == 1.5).all()
+
+
+def test_write_stats_files(subjects_dir):
+    output_dir = subjects_dir / "derivatives"
+    sources = [get_stats_class(path)(path) for path in sorted(subjects_dir.glob("*/stats/*.stats"))]
+    jobs = [(stats, output_dir / stats.path.relative_to(subjects_dir)) for stats in sources]
+    invalid = output_dir / "invalid.stats"
+    jobs.append((sources[0], invalid, sources[0].structural_measurements.drop(columns="Region")))
+
+    written, errors = write_stats_files(jobs, n_jobs=2, chunksize=2)
+    assert written == [path for _, path, *_ in jobs[:-1]]
+    assert list(errors) == [invalid] and "KeyError" in errors[invalid]
+    for stats, path in jobs[:-1]:
+        assert path.read_text() == format_stats(stats)